@@ -234,13 +234,18 @@ class APIClient:
         return self._make_request("DELETE", f"/api/transformations/{transformation_id}")
 
     def execute_transformation(
-        self, transformation_id: str, input_text: str, model_id: str
+        self,
+        transformation_id: str,
+        input_text: str,
+        model_id: str,
+        bypass_cache: bool = False,
     ) -> Union[Dict[Any, Any], List[Dict[Any, Any]]]:
         """Execute a transformation on input text."""
         data = {
             "transformation_id": transformation_id,
             "input_text": input_text,
             "model_id": model_id,
+            "bypass_cache": bypass_cache,
         }
         # Use configured timeout for transformation operations
         return self._make_request(
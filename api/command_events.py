@@ -0,0 +1,168 @@
+"""
+Push command status transitions to clients as Server-Sent Events.
+
+A SurrealDB LIVE query on the command table delivers every change to a
+command record; only status transitions are forwarded. If the live query
+cannot be established (e.g. an HTTP database URL), the stream falls back to
+polling the database so clients see the same events either way.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+
+from fastapi import Request
+from loguru import logger
+
+from open_notebook.database.repository import (
+    db_connection,
+    ensure_record_id,
+    parse_record_ids,
+    repo_query,
+)
+
+# Seconds between keep-alive comments when no event was sent
+HEARTBEAT_INTERVAL = 15.0
+# Seconds between polls when live queries are unavailable
+POLL_INTERVAL = 2.0
+
+ACTIVE_STATUSES = ("new", "running")
+
+
+def _event(cmd: Dict[str, Any]) -> Dict[str, Any]:
+    args = cmd.get("args")
+    if not isinstance(args, dict):
+        args = {}
+    return {
+        "type": "status",
+        "command_id": str(cmd["id"]),
+        "command": cmd.get("name"),
+        "status": cmd.get("status"),
+        "source_id": cmd.get("source_id") or args.get("source_id"),
+        "error_message": cmd.get("error_message") or None,
+    }
+
+
+class _StatusTracker:
+    """Remembers the last status per command and yields only transitions."""
+
+    def __init__(self, command_ids: Optional[List[str]]):
+        self.command_ids: Optional[Set[str]] = set(command_ids) if command_ids else None
+        self.last: Dict[str, Optional[str]] = {}
+
+    def transition(self, cmd: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(cmd, dict) or "id" not in cmd:
+            return None
+        cmd_id = str(cmd["id"])
+        if self.command_ids is not None and cmd_id not in self.command_ids:
+            return None
+        status = cmd.get("status")
+        if status is None or self.last.get(cmd_id) == status:
+            return None
+        self.last[cmd_id] = status
+        return _event(cmd)
+
+
+async def _live_events(queue: asyncio.Queue, tracker: _StatusTracker) -> None:
+    async with db_connection() as db:
+        query_uuid = await db.live("command")
+        try:
+            notifications = await db.subscribe_live(query_uuid)
+            await queue.put({"type": "ready", "mode": "live"})
+            async for cmd in notifications:
+                event = tracker.transition(parse_record_ids(cmd))
+                if event:
+                    await queue.put(event)
+        finally:
+            try:
+                await db.kill(query_uuid)
+            except Exception as e:
+                logger.debug(f"Failed to kill live query {query_uuid}: {e}")
+
+
+async def _polled_events(queue: asyncio.Queue, tracker: _StatusTracker) -> None:
+    await queue.put({"type": "ready", "mode": "polling"})
+    while True:
+        if tracker.command_ids is not None:
+            rows = await repo_query(
+                """
+                SELECT id, name, status, error_message, args.source_id AS source_id
+                FROM $ids
+                """,
+                {"ids": [ensure_record_id(i) for i in tracker.command_ids]},
+            )
+        else:
+            # Active commands, plus those seen active before so completions show up
+            watched = [
+                ensure_record_id(cmd_id)
+                for cmd_id, status in tracker.last.items()
+                if status in ACTIVE_STATUSES
+            ]
+            rows = await repo_query(
+                """
+                SELECT id, name, status, error_message, args.source_id AS source_id
+                FROM command WHERE status IN $active OR id IN $watched
+                """,
+                {"active": list(ACTIVE_STATUSES), "watched": watched},
+            )
+        for row in rows or []:
+            event = tracker.transition(row)
+            if event:
+                await queue.put(event)
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def _produce(queue: asyncio.Queue, tracker: _StatusTracker) -> None:
+    try:
+        await _live_events(queue, tracker)
+    except Exception as e:
+        logger.warning(f"Live query on command table unavailable, polling: {e}")
+        await _polled_events(queue, tracker)
+
+
+async def stream_command_events(
+    request: Request, command_ids: Optional[List[str]] = None
+) -> AsyncGenerator[str, None]:
+    """
+    Stream command status transitions as SSE until the client disconnects.
+
+    Args:
+        request: Incoming request, used to detect client disconnects
+        command_ids: Restrict the stream to these commands (all commands if None)
+    """
+    tracker = _StatusTracker(command_ids)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    # Current status of explicitly watched commands, so clients start in sync
+    if command_ids:
+        try:
+            rows = await repo_query(
+                """
+                SELECT id, name, status, error_message, args.source_id AS source_id
+                FROM $ids
+                """,
+                {"ids": [ensure_record_id(i) for i in command_ids]},
+            )
+            for row in rows or []:
+                event = tracker.transition(row)
+                if event:
+                    yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.warning(f"Failed to load initial command statuses: {e}")
+
+    producer = asyncio.create_task(_produce(queue, tracker))
+    try:
+        while not await request.is_disconnected():
+            if producer.done() and queue.empty():
+                error = producer.exception() if not producer.cancelled() else None
+                message = str(error) if error else "Command event stream ended"
+                yield f"data: {json.dumps({'type': 'error', 'message': message})}\n\n"
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+    finally:
+        producer.cancel()
@@ -29,6 +29,7 @@ class CommandService:
                 module_name,  # This is actually the app name (e.g., "open_notebook")
                 command_name,  # Command name (e.g., "process_text")
                 command_args,  # Input data
+                context=context,  # e.g. {"lane": "bulk"} for low-priority work
             )
             # Convert RecordID to string if needed
             if not cmd_id:
@@ -32,7 +32,14 @@ from api.routers import (
     video,
 )
 from api.routers import commands as commands_router
+from api.streaming import stream_stats
 from open_notebook.database.async_migrate import AsyncMigrationManager
+from open_notebook.graphs.checkpoint_store import (
+    checkpoint_compactor,
+    checkpoint_stats,
+    convert_checkpoint_file,
+)
+from open_notebook.utils.offload import loop_lag_monitor
 
 # Import commands to register them in the API process
 try:
@@ -72,12 +79,22 @@ async def lifespan(app: FastAPI):
         # Fail fast - don't start the API with an outdated database schema
         raise RuntimeError(f"Failed to run database migrations: {str(e)}") from e
 
+    try:
+        # Before any chat opens the checkpoint file: the conversion locks it
+        await convert_checkpoint_file()
+    except Exception as e:
+        logger.warning(f"Checkpoint file conversion failed: {e}")
+
     logger.success("API initialization completed successfully")
+    loop_lag_monitor.start()
+    checkpoint_compactor.start()
 
     # Yield control to the application
     yield
 
     # Shutdown: cleanup if needed
+    loop_lag_monitor.stop()
+    checkpoint_compactor.stop()
     logger.info("API shutdown complete")
 
 
@@ -174,3 +191,21 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/api/loop-lag")
+async def loop_lag():
+    """Event loop lag of the API process and how much CPU-bound work was offloaded."""
+    return loop_lag_monitor.stats()
+
+
+@app.get("/api/chat-checkpoints")
+async def chat_checkpoints():
+    """Size of the chat history store, checkpoint write latency and last compaction."""
+    return await checkpoint_stats()
+
+
+@app.get("/api/stream-stats")
+async def stream_statistics():
+    """Completed and client-cancelled LLM streams and the tokens wasted on them."""
+    return stream_stats()
@@ -31,12 +31,15 @@ class NotebookResponse(BaseModel):
 # Search models
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query")
-    type: Literal["text", "vector"] = Field("text", description="Search type")
+    type: Literal["text", "vector", "hybrid"] = Field(
+        "text",
+        description="Search type: BM25 text, vector, or hybrid (both fused by rank)",
+    )
     limit: int = Field(100, description="Maximum number of results", le=1000)
     search_sources: bool = Field(True, description="Include sources in search")
     search_notes: bool = Field(True, description="Include notes in search")
     minimum_score: float = Field(
-        0.2, description="Minimum score for vector search", ge=0, le=1
+        0.2, description="Minimum score for vector (and hybrid) search", ge=0, le=1
     )
 
 
@@ -51,6 +54,9 @@ class AskRequest(BaseModel):
     strategy_model: str = Field(..., description="Model ID for query strategy")
     answer_model: str = Field(..., description="Model ID for individual answers")
     final_answer_model: str = Field(..., description="Model ID for final answer")
+    search_type: Literal["vector", "hybrid"] = Field(
+        "vector", description="Retrieval used for each search in the strategy"
+    )
 
 
 class AskResponse(BaseModel):
@@ -143,6 +149,9 @@ class TransformationExecuteRequest(BaseModel):
     )
     input_text: str = Field(..., description="Text to transform")
     model_id: str = Field(..., description="Model ID to use for the transformation")
+    bypass_cache: bool = Field(
+        False, description="Call the model even if a cached result exists"
+    )
 
 
 class TransformationExecuteResponse(BaseModel):
@@ -151,6 +160,7 @@ class TransformationExecuteResponse(BaseModel):
     output: str = Field(..., description="Transformed text")
     transformation_id: str = Field(..., description="ID of the transformation used")
     model_id: str = Field(..., description="Model ID used")
+    cached: bool = Field(False, description="Whether the output came from the cache")
 
 
 # Default Prompt API models
@@ -250,6 +260,40 @@ class RebuildStatusResponse(BaseModel):
     error_message: Optional[str] = None
 
 
+# Shadow re-indexing (embedding model switch) API models
+class ShadowReindexRequest(BaseModel):
+    target_model: str = Field(..., description="ID of the new embedding model")
+    batch_size: int = Field(
+        16, ge=1, le=500, description="Items embedded per backfill batch"
+    )
+    batch_delay: float = Field(
+        1.0,
+        ge=0,
+        description="Seconds to pause between batches so interactive embedding jobs are not starved",
+    )
+    auto_cutover: bool = Field(
+        False, description="Cut over automatically once coverage reaches 100%"
+    )
+
+
+class ShadowCoverage(BaseModel):
+    notes: RebuildProgress
+    insights: RebuildProgress
+    sources: RebuildProgress
+    overall: RebuildProgress
+
+
+class ShadowReindexStatusResponse(BaseModel):
+    status: str = Field(
+        ..., description="Migration status: idle, backfilling, ready, failed"
+    )
+    target_model: Optional[str] = None
+    current_model: Optional[str] = None
+    command_id: Optional[str] = None
+    coverage: Optional[ShadowCoverage] = None
+    error_message: Optional[str] = None
+
+
 # Settings API models
 class SettingsResponse(BaseModel):
     default_content_processing_engine_doc: Optional[str] = None
@@ -320,6 +364,52 @@ class SourceCreate(BaseModel):
         return self
 
 
+class SourceBatchItem(BaseModel):
+    type: str = Field(..., description="Source type: link, upload, or text")
+    url: Optional[str] = Field(None, description="URL for link type")
+    file_path: Optional[str] = Field(None, description="File path for upload type")
+    content: Optional[str] = Field(None, description="Text content for text type")
+    title: Optional[str] = Field(None, description="Source title")
+    notebooks: Optional[List[str]] = Field(
+        None, description="Notebook IDs for this item (default: the batch notebooks)"
+    )
+    transformations: Optional[List[str]] = Field(
+        None,
+        description="Transformation IDs for this item (default: the batch transformations)",
+    )
+    embed: Optional[bool] = Field(
+        None, description="Whether to embed this item (default: the batch setting)"
+    )
+    delete_source: bool = Field(
+        False, description="Whether to delete the file after processing"
+    )
+
+
+class SourceBatchCreate(BaseModel):
+    items: List[SourceBatchItem] = Field(..., description="Sources to create")
+    notebooks: List[str] = Field(
+        default_factory=list, description="Notebook IDs to add every source to"
+    )
+    transformations: List[str] = Field(
+        default_factory=list, description="Transformation IDs to apply to every source"
+    )
+    embed: bool = Field(False, description="Whether to embed content for vector search")
+
+
+class SourceBatchResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    source_id: Optional[str] = None
+    command_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SourceBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[SourceBatchResult]
+    processing_time: float
+
+
 class SourceUpdate(BaseModel):
     title: Optional[str] = Field(None, description="Source title")
     topics: Optional[List[str]] = Field(None, description="Source topics")
@@ -383,6 +473,9 @@ class ContextResponse(BaseModel):
     sources: List[Dict[str, Any]] = Field(..., description="Source context data")
     notes: List[Dict[str, Any]] = Field(..., description="Note context data")
     total_tokens: Optional[int] = Field(None, description="Estimated token count")
+    context_version: Optional[str] = Field(
+        None, description="Changes whenever an included item's context changes"
+    )
 
 
 # Insights API models
@@ -418,6 +511,30 @@ class SourceStatusResponse(BaseModel):
     command_id: Optional[str] = Field(None, description="Command ID if available")
 
 
+class SourceStatusBatchRequest(BaseModel):
+    source_ids: List[str] = Field(
+        default_factory=list, description="Source IDs to report status for"
+    )
+    command_ids: List[str] = Field(
+        default_factory=list, description="Command IDs to report status for"
+    )
+
+
+class CommandStatusSummary(BaseModel):
+    command_id: str
+    status: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class SourceStatusBatchResponse(BaseModel):
+    sources: Dict[str, SourceStatusResponse] = Field(
+        default_factory=dict, description="Status per requested source ID"
+    )
+    commands: Dict[str, CommandStatusSummary] = Field(
+        default_factory=dict, description="Status per requested command ID"
+    )
+
+
 # Error response
 class ErrorResponse(BaseModel):
     error: str
@@ -3,20 +3,26 @@ import json
 import traceback
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 from loguru import logger
 from pydantic import BaseModel, Field
 
+from api.streaming import record_wasted, stream_sse
 from open_notebook.database.repository import ensure_record_id, repo_query
 from open_notebook.domain.notebook import ChatSession, Note, Notebook, Source
 from open_notebook.exceptions import (
     NotFoundError,
 )
 from open_notebook.graphs.chat import get_graph as get_chat_graph
-from open_notebook.utils.graph_utils import get_session_message_count
+from open_notebook.utils import clean_thinking_content
+from open_notebook.utils.context_snapshot import build_notebook_context
+from open_notebook.utils.graph_utils import (
+    backfill_session_activity,
+    delete_session_history,
+)
 
 router = APIRouter()
 
@@ -53,6 +59,12 @@ class ChatSessionResponse(BaseModel):
     message_count: Optional[int] = Field(
         None, description="Number of messages in session"
     )
+    last_message_preview: Optional[str] = Field(
+        None, description="Beginning of the last message in session"
+    )
+    last_activity: Optional[str] = Field(
+        None, description="Timestamp of the last chat turn"
+    )
     model_override: Optional[str] = Field(
         None, description="Model override for this session"
     )
@@ -89,6 +101,9 @@ class BuildContextResponse(BaseModel):
     context: Dict[str, Any] = Field(..., description="Built context data")
     token_count: int = Field(..., description="Estimated token count")
     char_count: int = Field(..., description="Character count")
+    context_version: Optional[str] = Field(
+        None, description="Changes whenever an included item's context changes"
+    )
 
 
 class SuccessResponse(BaseModel):
@@ -108,13 +123,11 @@ async def get_sessions(notebook_id: str = Query(..., description="Notebook ID"))
         # Get sessions for this notebook
         sessions_list = await notebook.get_chat_sessions()
 
-        chat_graph = await get_chat_graph()
         results = []
         for session in sessions_list:
-            session_id = str(session.id)
-
-            # Get message count from LangGraph state
-            msg_count = await get_session_message_count(chat_graph, session_id)
+            # Sessions from before activity tracking are backfilled once
+            if session.message_count is None:
+                await backfill_session_activity(await get_chat_graph(), session)
 
             results.append(
                 ChatSessionResponse(
@@ -123,7 +136,11 @@ async def get_sessions(notebook_id: str = Query(..., description="Notebook ID"))
                     notebook_id=notebook_id,
                     created=str(session.created),
                     updated=str(session.updated),
-                    message_count=msg_count,
+                    message_count=session.message_count,
+                    last_message_preview=session.last_message_preview,
+                    last_activity=str(session.last_activity)
+                    if session.last_activity
+                    else None,
                     model_override=getattr(session, "model_override", None),
                 )
             )
@@ -152,6 +169,7 @@ async def create_session(request: CreateSessionRequest):
             title=request.title
             or f"Chat Session {asyncio.get_event_loop().time():.0f}",
             model_override=request.model_override,
+            message_count=0,
         )
         await session.save()
 
@@ -165,6 +183,8 @@ async def create_session(request: CreateSessionRequest):
             created=str(session.created),
             updated=str(session.updated),
             message_count=0,
+            last_message_preview=None,
+            last_activity=None,
             model_override=session.model_override,
         )
     except NotFoundError:
@@ -240,6 +260,8 @@ async def get_session(session_id: str):
             created=str(session.created),
             updated=str(session.updated),
             message_count=len(messages),
+            last_message_preview=session.last_message_preview,
+            last_activity=str(session.last_activity) if session.last_activity else None,
             messages=messages,
             model_override=getattr(session, "model_override", None),
         )
@@ -287,9 +309,8 @@ async def update_session(session_id: str, request: UpdateSessionRequest):
         )
         notebook_id = notebook_query[0]["out"] if notebook_query else None
 
-        chat_graph = await get_chat_graph()
-        # Get message count from LangGraph state
-        msg_count = await get_session_message_count(chat_graph, full_session_id)
+        if session.message_count is None:
+            await backfill_session_activity(await get_chat_graph(), session)
 
         return ChatSessionResponse(
             id=session.id or "",
@@ -297,7 +318,9 @@ async def update_session(session_id: str, request: UpdateSessionRequest):
             notebook_id=notebook_id,
             created=str(session.created),
             updated=str(session.updated),
-            message_count=msg_count,
+            message_count=session.message_count,
+            last_message_preview=session.last_message_preview,
+            last_activity=str(session.last_activity) if session.last_activity else None,
             model_override=session.model_override,
         )
     except NotFoundError:
@@ -322,6 +345,7 @@ async def delete_session(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found")
 
         await session.delete()
+        await delete_session_history(full_session_id)
 
         return SuccessResponse(success=True, message="Session deleted successfully")
     except NotFoundError:
@@ -332,9 +356,14 @@ async def delete_session(session_id: str):
 
 
 async def stream_chat_response(
-    session_id: str, message: str, context: Dict[str, Any], model_override: Optional[str] = None
-) -> AsyncGenerator[str, None]:
-    """Stream the chat response as Server-Sent Events."""
+    session_id: str,
+    message: str,
+    context: Dict[str, Any],
+    model_override: Optional[str] = None,
+    session: Optional[ChatSession] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Stream the chat response as events (sent as SSE by stream_sse)."""
+    ai_content: List[str] = []
     try:
         chat_graph = await get_chat_graph()
         # Get current state
@@ -342,23 +371,28 @@ async def stream_chat_response(
             config=RunnableConfig(configurable={"thread_id": session_id})
         )
 
-        # Prepare state for execution
-        state_values = current_state.values if current_state else {}
-        state_values["messages"] = state_values.get("messages", [])
-        state_values["context"] = context
-        state_values["model_override"] = model_override
+        # Messages before this turn
+        previous_count = len(
+            (current_state.values if current_state else {}).get("messages", [])
+        )
 
-        # Add user message to state
+        # Only the keys this turn changes: passing the whole previous state
+        # would write back values (e.g. a summary stored meanwhile) it loaded
         user_message = HumanMessage(content=message)
-        state_values["messages"].append(user_message)
+        graph_input = {
+            "messages": [user_message],
+            "context": context,
+            "model_override": model_override,
+        }
 
         # Send user message event
         user_event = {"type": "user_message", "content": message, "timestamp": None}
-        yield f"data: {json.dumps(user_event)}\n\n"
+        yield user_event
 
         # Execute chat graph with streaming - use astream_events for granular token streaming
+        usage = None
         async for event in chat_graph.astream_events(
-            input=state_values,
+            input=graph_input,
             config=RunnableConfig(
                 configurable={"thread_id": session_id, "model_id": model_override}
             ),
@@ -370,21 +404,40 @@ async def stream_chat_response(
             if kind == "on_chat_model_stream":
                 content = event["data"]["chunk"].content
                 if content:
+                    ai_content.append(content)
                     ai_event = {
                         "type": "ai_message",
                         "content": content,
                         "timestamp": None,
                     }
-                    yield f"data: {json.dumps(ai_event)}\n\n"
+                    yield ai_event
 
+            # The final graph output carries the token usage of the turn
+            elif kind == "on_chain_end" and event["name"] == "LangGraph":
+                output = event["data"].get("output")
+                if isinstance(output, dict) and output.get("usage"):
+                    usage = output["usage"]
+
+        if usage:
+            yield {"type": "usage", **usage}
+
+        # The turn added the user message and one AI reply to the history
+        if session:
+            reply = clean_thinking_content("".join(map(str, ai_content)))
+            await session.record_activity(previous_count + 2, reply or message)
+
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client disconnected (see api.streaming)
+        record_wasted("chat", "".join(map(str, ai_content)))
+        raise
     except Exception as e:
         logger.error(f"Error in chat streaming: {str(e)}")
         error_event = {"type": "error", "message": str(e)}
-        yield f"data: {json.dumps(error_event)}\n\n"
+        yield error_event
 
 
 @router.post("/chat/execute")
-async def execute_chat(request: ExecuteChatRequest):
+async def execute_chat(request: ExecuteChatRequest, http_request: Request):
     """Execute a chat request with streaming response."""
     try:
         # Verify session exists
@@ -412,11 +465,16 @@ async def execute_chat(request: ExecuteChatRequest):
 
         # Return streaming response
         return StreamingResponse(
-            stream_chat_response(
-                session_id=full_session_id,
-                message=request.message,
-                context=request.context,
-                model_override=model_override,
+            stream_sse(
+                http_request,
+                "chat",
+                stream_chat_response(
+                    session_id=full_session_id,
+                    message=request.message,
+                    context=request.context,
+                    model_override=model_override,
+                    session=session,
+                ),
             ),
             media_type="text/plain",
             headers={
@@ -449,97 +507,16 @@ async def build_context(request: BuildContextRequest):
         if not notebook:
             raise HTTPException(status_code=404, detail="Notebook not found")
 
-        context_data: dict[str, list[dict[str, str]]] = {"sources": [], "notes": []}
-        total_content = ""
-
-        # Process context configuration if provided
-        if request.context_config:
-            # Process sources
-            for source_id, status in request.context_config.get("sources", {}).items():
-                if "not in" in status:
-                    continue
-
-                try:
-                    # Add table prefix if not present
-                    full_source_id = (
-                        source_id
-                        if source_id.startswith("source:")
-                        else f"source:{source_id}"
-                    )
-
-                    try:
-                        source = await Source.get(full_source_id)
-                    except Exception:
-                        continue
-
-                    if "insights" in status:
-                        source_context = await source.get_context(context_size="short")
-                        context_data["sources"].append(source_context)
-                        total_content += str(source_context)
-                    elif "full content" in status:
-                        source_context = await source.get_context(context_size="long")
-                        context_data["sources"].append(source_context)
-                        total_content += str(source_context)
-                except Exception as e:
-                    logger.warning(f"Error processing source {source_id}: {str(e)}")
-                    continue
-
-            # Process notes
-            for note_id, status in request.context_config.get("notes", {}).items():
-                if "not in" in status:
-                    continue
-
-                try:
-                    # Add table prefix if not present
-                    full_note_id = (
-                        note_id if note_id.startswith("note:") else f"note:{note_id}"
-                    )
-                    note = await Note.get(full_note_id)
-                    if not note:
-                        continue
-
-                    if "full content" in status:
-                        note_context = note.get_context(context_size="long")
-                        context_data["notes"].append(note_context)
-                        total_content += str(note_context)
-                except Exception as e:
-                    logger.warning(f"Error processing note {note_id}: {str(e)}")
-                    continue
-        else:
-            # Default behavior - include all sources and notes with short context
-            sources = await notebook.get_sources()
-            for source in sources:
-                try:
-                    source_context = await source.get_context(context_size="short")
-                    context_data["sources"].append(source_context)
-                    total_content += str(source_context)
-                except Exception as e:
-                    logger.warning(f"Error processing source {source.id}: {str(e)}")
-                    continue
-
-            notes = await notebook.get_notes()
-            for note in notes:
-                try:
-                    note_context = note.get_context(context_size="short")
-                    context_data["notes"].append(note_context)
-                    total_content += str(note_context)
-                except Exception as e:
-                    logger.warning(f"Error processing note {note.id}: {str(e)}")
-                    continue
-
-        # Calculate character and token counts
-        char_count = len(total_content)
-        # Use token count utility if available
-        try:
-            from open_notebook.utils import token_count
-
-            estimated_tokens = token_count(total_content) if total_content else 0
-        except ImportError:
-            # Fallback to simple estimation
-            estimated_tokens = char_count // 4
+        # Rendered item contexts come from snapshots; only changed items are rebuilt
+        context = await build_notebook_context(
+            request.notebook_id, request.context_config or None
+        )
 
         return BuildContextResponse(
-            context=context_data, token_count=estimated_tokens, char_count=char_count
+            context={"sources": context.sources, "notes": context.notes},
+            token_count=context.total_tokens,
+            char_count=context.char_count,
+            context_version=context.version,
         )
     except HTTPException:
         raise
@@ -1,11 +1,14 @@
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from loguru import logger
 from pydantic import BaseModel, Field
 from surreal_commands import registry
 
+from api.command_events import stream_command_events
 from api.command_service import CommandService
+from open_notebook.database.command_queue import get_lane_stats, get_queue_stats
 
 router = APIRouter()
 
@@ -119,6 +122,70 @@ async def cancel_command_job(job_id: str):
         )
 
 
+@router.get("/commands/events")
+async def stream_command_status_events(
+    request: Request,
+    command_ids: Optional[str] = Query(
+        None, description="Comma-separated command IDs to watch (default: all)"
+    ),
+):
+    """
+    Server-Sent Events stream of command status transitions.
+
+    Each event is a JSON object with type "status", command_id, command,
+    status, source_id (for source commands) and error_message. Backed by a
+    SurrealDB live query, with a polling fallback.
+    """
+    ids = (
+        [
+            cid if cid.startswith("command:") else f"command:{cid}"
+            for cid in (c.strip() for c in command_ids.split(","))
+            if cid
+        ]
+        if command_ids
+        else None
+    )
+    return StreamingResponse(
+        stream_command_events(request, ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
+
+
+@router.get("/commands/queue/stats")
+async def get_command_queue_stats():
+    """
+    Queue depth (queued/running) per command, how many submissions were
+    coalesced into an already queued job for the same record, and how many
+    attempts failed with a retryable error (transaction conflicts counted
+    separately).
+    """
+    try:
+        return await get_queue_stats()
+
+    except Exception as e:
+        logger.error(f"Error fetching command queue stats: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch command queue stats"
+        )
+
+
+@router.get("/commands/lanes")
+async def get_command_lanes():
+    """
+    Per-lane (interactive/bulk) queue depth, age of the oldest waiting job, and
+    queue wait times of jobs started during the last hour.
+    """
+    try:
+        return await get_lane_stats()
+
+    except Exception as e:
+        logger.error(f"Error fetching command lane stats: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch command lane stats"
+        )
+
+
 @router.get("/commands/registry/debug")
 async def debug_registry():
     """Debug endpoint to see what commands are registered"""
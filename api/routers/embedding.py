@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from loguru import logger
 
-from api.command_service import CommandService
 from api.models import EmbedRequest, EmbedResponse
 from open_notebook.ai.models import model_manager
+from open_notebook.database.command_queue import submit_coalesced
 from open_notebook.domain.notebook import Note, Source
 
 router = APIRouter()
@@ -46,7 +46,8 @@ async def embed_content(embed_request: EmbedRequest):
                     command_name = "embed_note"
                     command_input = {"note_id": item_id}
 
-                command_id = await CommandService.submit_command_job(
+                # Merged into an already queued job for the same item, if any
+                command_id = await submit_coalesced(
                     "open_notebook",
                     command_name,
                     command_input,
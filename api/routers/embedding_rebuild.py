@@ -9,8 +9,20 @@ from api.models import (
     RebuildResponse,
     RebuildStats,
     RebuildStatusResponse,
+    ShadowCoverage,
+    ShadowReindexRequest,
+    ShadowReindexStatusResponse,
 )
-from open_notebook.database.repository import repo_query
+from open_notebook.ai.models import DefaultModels, Model
+from open_notebook.database.command_queue import submit_coalesced
+from open_notebook.database.repository import repo_query, repo_upsert
+from open_notebook.domain.embedding_migration import (
+    EmbeddingMigration,
+    cutover_shadow_embeddings,
+    discard_shadow_embeddings,
+    get_shadow_coverage,
+)
+from open_notebook.exceptions import InvalidInputError
 
 router = APIRouter()
 
@@ -190,3 +202,182 @@ async def get_rebuild_status(command_id: str):
         raise HTTPException(
             status_code=500, detail=f"Failed to get rebuild status: {str(e)}"
         )
+
+
+def _progress(done: int, total: int) -> RebuildProgress:
+    done = min(done, total)
+    return RebuildProgress(
+        processed=done,
+        total=total,
+        percentage=round((done / total * 100) if total > 0 else 100.0, 2),
+    )
+
+
+async def _shadow_status() -> ShadowReindexStatusResponse:
+    migration = await EmbeddingMigration.get_instance()
+    defaults = await DefaultModels.get_instance()
+
+    response = ShadowReindexStatusResponse(
+        status=migration.status,
+        target_model=migration.target_model,
+        current_model=defaults.default_embedding_model,
+        command_id=migration.command_id,
+        error_message=migration.error_message,
+    )
+
+    if migration.is_active or migration.status == "failed":
+        coverage = await get_shadow_coverage()
+        response.coverage = ShadowCoverage(
+            notes=_progress(coverage["notes_done"], coverage["notes_total"]),
+            insights=_progress(coverage["insights_done"], coverage["insights_total"]),
+            sources=_progress(coverage["sources_done"], coverage["sources_total"]),
+            overall=_progress(coverage["done"], coverage["total"]),
+        )
+
+    return response
+
+
+@router.post("/shadow", response_model=ShadowReindexStatusResponse)
+async def start_shadow_reindex(request: ShadowReindexRequest):
+    """
+    Start (or resume) a zero-downtime switch to a new embedding model.
+
+    Vectors from the target model are written to shadow storage in throttled
+    background batches while search keeps using the current vectors. Once
+    coverage reaches 100%, call POST /shadow/cutover (or set auto_cutover).
+    Returns 409 while the previous backfill job is still queued or running.
+    """
+    try:
+        # Import commands to ensure they're registered
+        import commands.embedding_commands  # noqa: F401
+
+        try:
+            model = await Model.get(request.target_model)
+        except Exception:
+            raise HTTPException(
+                status_code=404, detail=f"Model {request.target_model} not found"
+            )
+        if model.type != "embedding":
+            raise HTTPException(
+                status_code=400,
+                detail=f"Model {request.target_model} is not an embedding model",
+            )
+
+        defaults = await DefaultModels.get_instance()
+        if defaults.default_embedding_model == request.target_model:
+            raise HTTPException(
+                status_code=400,
+                detail="Target model is already the default embedding model",
+            )
+
+        migration = await EmbeddingMigration.get_instance()
+        if migration.is_active and migration.target_model != request.target_model:
+            raise HTTPException(
+                status_code=409,
+                detail=(
+                    f"A migration to {migration.target_model} is already in progress. "
+                    "Cancel it before starting a new one."
+                ),
+            )
+
+        if migration.command_id:
+            try:
+                previous = await get_command_status(migration.command_id)
+                pending = previous.status in ("new", "running")
+            except ValueError:
+                # The command record is gone
+                pending = False
+            if pending:
+                raise HTTPException(
+                    status_code=409,
+                    detail=(
+                        f"Shadow re-index {migration.command_id} is still "
+                        f"{previous.status.value}"
+                    ),
+                )
+
+        await migration.patch(
+            {
+                "status": "backfilling",
+                "target_model": request.target_model,
+                "error_message": None,
+            }
+        )
+
+        # Re-indexing everything is bulk work: keep it behind interactive jobs
+        command_id = await submit_coalesced(
+            "open_notebook",
+            "shadow_reindex_embeddings",
+            {
+                "target_model": request.target_model,
+                "batch_size": request.batch_size,
+                "batch_delay": request.batch_delay,
+                "auto_cutover": request.auto_cutover,
+            },
+            lane="bulk",
+        )
+        # Merge only the command id so a fast worker's status update is not overwritten
+        await repo_upsert(
+            "open_notebook", EmbeddingMigration.record_id, {"command_id": command_id}
+        )
+
+        logger.info(
+            f"Submitted shadow re-index to {request.target_model}: {command_id}"
+        )
+        return await _shadow_status()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to start shadow re-index: {e}")
+        logger.exception(e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to start shadow re-index: {str(e)}"
+        )
+
+
+@router.get("/shadow/status", response_model=ShadowReindexStatusResponse)
+async def get_shadow_reindex_status():
+    """Get the embedding model migration state and shadow coverage."""
+    try:
+        return await _shadow_status()
+    except Exception as e:
+        logger.error(f"Failed to get shadow re-index status: {e}")
+        logger.exception(e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get shadow re-index status: {str(e)}"
+        )
+
+
+@router.post("/shadow/cutover", response_model=ShadowReindexStatusResponse)
+async def cutover_shadow_reindex(force: bool = False):
+    """
+    Atomically promote shadow vectors and make the target the default embedding model.
+
+    Requires 100% coverage unless **force** is set.
+    """
+    try:
+        await cutover_shadow_embeddings(force=force)
+        return await _shadow_status()
+    except InvalidInputError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to cut over embeddings: {e}")
+        logger.exception(e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to cut over embeddings: {str(e)}"
+        )
+
+
+@router.delete("/shadow", response_model=ShadowReindexStatusResponse)
+async def cancel_shadow_reindex():
+    """Cancel the embedding model migration and discard all shadow vectors."""
+    try:
+        await discard_shadow_embeddings()
+        return await _shadow_status()
+    except Exception as e:
+        logger.error(f"Failed to cancel shadow re-index: {e}")
+        logger.exception(e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to cancel shadow re-index: {str(e)}"
+        )
@@ -11,7 +11,8 @@ from api.models import (
     ModelResponse,
     ProviderAvailabilityResponse,
 )
-from open_notebook.ai.models import DefaultModels, Model
+from open_notebook.ai.models import DefaultModels, Model, model_manager
+from open_notebook.ai.rate_limit import get_rate_limit_stats
 from open_notebook.exceptions import InvalidInputError
 
 router = APIRouter()
@@ -166,6 +167,7 @@ async def delete_model(model_id: str):
             raise HTTPException(status_code=404, detail="Model not found")
 
         await model.delete()
+        model_manager.evict(model_id)
 
         return {"message": "Model deleted successfully"}
     except HTTPException:
@@ -247,6 +249,41 @@ async def update_default_models(defaults_data: DefaultModelsResponse):
         )
 
 
+@router.get("/models/pool-stats")
+async def get_model_pool_stats():
+    """
+    Get warm model instance and HTTP connection pool statistics for this process.
+
+    Useful for tuning provider connection reuse: shows registry hit/miss counts,
+    evictions, and per-provider open/idle connections.
+    """
+    try:
+        return model_manager.pool_stats()
+    except Exception as e:
+        logger.error(f"Error fetching model pool stats: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching model pool stats: {str(e)}"
+        )
+
+
+@router.get("/models/rate-limits")
+async def get_model_rate_limits():
+    """
+    Get shared provider rate limiter statistics.
+
+    Per provider/model: calls admitted, calls that had to queue, total/avg/max
+    queue wait in seconds, remaining bucket capacity and callers currently
+    waiting in this process. Counters are shared by the API and workers.
+    """
+    try:
+        return get_rate_limit_stats()
+    except Exception as e:
+        logger.error(f"Error fetching rate limit stats: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching rate limit stats: {str(e)}"
+        )
+
+
 @router.get("/models/providers", response_model=ProviderAvailabilityResponse)
 async def get_provider_availability():
     """Get provider availability based on environment variables."""
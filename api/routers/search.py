@@ -1,13 +1,16 @@
+import asyncio
 import json
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator, Dict, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from api.models import AskRequest, AskResponse, SearchRequest, SearchResponse
+from api.streaming import record_wasted, stream_sse
 from open_notebook.ai.models import Model, model_manager
-from open_notebook.domain.notebook import text_search, vector_search
+from open_notebook.domain.notebook import hybrid_search, text_search, vector_search
 from open_notebook.exceptions import DatabaseOperationError, InvalidInputError
 from open_notebook.graphs.ask import graph as ask_graph
 
@@ -16,16 +19,26 @@ router = APIRouter()
 
 @router.post("/search", response_model=SearchResponse)
 async def search_knowledge_base(search_request: SearchRequest):
-    """Search the knowledge base using text or vector search."""
+    """Search the knowledge base using text, vector or hybrid search."""
     try:
-        if search_request.type == "vector":
+        if search_request.type in ("vector", "hybrid"):
             # Check if embedding model is available for vector search
             if not await model_manager.get_embedding_model():
                 raise HTTPException(
                     status_code=400,
-                    detail="Vector search requires an embedding model. Please configure one in the Models section.",
+                    detail=f"{search_request.type.capitalize()} search requires an embedding model. Please configure one in the Models section.",
                 )
 
+        if search_request.type == "hybrid":
+            # BM25 + vector in one round trip, fused with reciprocal-rank fusion
+            results = await hybrid_search(
+                keyword=search_request.query,
+                results=search_request.limit,
+                source=search_request.search_sources,
+                note=search_request.search_notes,
+                minimum_score=search_request.minimum_score,
+            )
+        elif search_request.type == "vector":
             results = await vector_search(
                 keyword=search_request.query,
                 results=search_request.limit,
@@ -58,57 +71,156 @@ async def search_knowledge_base(search_request: SearchRequest):
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+def _stream_text(content: Any) -> str:
+    """Extract plain text from a streamed message chunk's content."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return ""
+
+
 async def stream_ask_response(
-    question: str, strategy_model: Model, answer_model: Model, final_answer_model: Model
-) -> AsyncGenerator[str, None]:
-    """Stream the ask response as Server-Sent Events."""
+    question: str,
+    strategy_model: Model,
+    answer_model: Model,
+    final_answer_model: Model,
+    search_type: str = "vector",
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Stream the ask response as events (sent as SSE by stream_sse).
+
+    Uses astream_events so sub-answers are sent as each parallel
+    provide_answer finishes and final-answer tokens are sent as they are
+    generated. Every event carries elapsed_ms (since the request started);
+    node completion events also carry duration_ms, and the complete event
+    summarizes per-stage timings.
+    """
+    # Generated text sent so far (sub-answers and final answer tokens)
+    generated: List[str] = []
     try:
         final_answer = None
+        start_time = time.perf_counter()
+        node_starts: Dict[str, float] = {}
+        timings: Dict[str, float] = {}
 
-        async for chunk in ask_graph.astream(
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - start_time) * 1000, 1)
+
+        def node_duration_ms(run_id: str) -> float:
+            started = node_starts.pop(run_id, start_time)
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        async for event in ask_graph.astream_events(
             input=dict(question=question),  # type: ignore[arg-type]
             config=dict(
                 configurable=dict(
                     strategy_model=strategy_model.id,
                     answer_model=answer_model.id,
                     final_answer_model=final_answer_model.id,
+                    search_type=search_type,
                 )
             ),
-            stream_mode="updates",
+            version="v2",
         ):
-            if "agent" in chunk:
-                strategy_data = {
-                    "type": "strategy",
-                    "reasoning": chunk["agent"]["strategy"].reasoning,
-                    "searches": [
-                        {"term": search.term, "instructions": search.instructions}
-                        for search in chunk["agent"]["strategy"].searches
-                    ],
-                }
-                yield f"data: {json.dumps(strategy_data)}\n\n"
-
-            elif "provide_answer" in chunk:
-                for answer in chunk["provide_answer"]["answers"]:
-                    answer_data = {"type": "answer", "content": answer}
-                    yield f"data: {json.dumps(answer_data)}\n\n"
-
-            elif "write_final_answer" in chunk:
-                final_answer = chunk["write_final_answer"]["final_answer"]
-                final_data = {"type": "final_answer", "content": final_answer}
-                yield f"data: {json.dumps(final_data)}\n\n"
+            kind = event["event"]
+            name = event.get("name")
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chain_start" and name == node:
+                node_starts[event["run_id"]] = time.perf_counter()
+
+            elif kind == "on_chat_model_stream" and node == "write_final_answer":
+                content = _stream_text(event["data"]["chunk"].content)
+                if content:
+                    generated.append(content)
+                    if "first_token_ms" not in timings:
+                        timings["first_token_ms"] = elapsed_ms()
+                    token_data = {
+                        "type": "final_answer_token",
+                        "content": content,
+                        "elapsed_ms": elapsed_ms(),
+                    }
+                    yield token_data
+
+            elif kind == "on_chain_end" and name == node:
+                output = event["data"].get("output") or {}
+                duration_ms = node_duration_ms(event["run_id"])
+
+                if name == "agent":
+                    timings["strategy_ms"] = duration_ms
+                    strategy_data = {
+                        "type": "strategy",
+                        "reasoning": output["strategy"].reasoning,
+                        "searches": [
+                            {"term": search.term, "instructions": search.instructions}
+                            for search in output["strategy"].searches
+                        ],
+                        "duration_ms": duration_ms,
+                        "elapsed_ms": elapsed_ms(),
+                    }
+                    yield strategy_data
+
+                elif name == "retrieve":
+                    timings["retrieval_ms"] = duration_ms
+                    retrieval_data = {
+                        "type": "retrieval",
+                        "results": [len(r) for r in output.get("retrieved", [])],
+                        "duration_ms": duration_ms,
+                        "elapsed_ms": elapsed_ms(),
+                    }
+                    yield retrieval_data
+
+                elif name == "provide_answer":
+                    # Parallel sub-answers: the stage lasts as long as the slowest one
+                    timings["answers_ms"] = max(
+                        timings.get("answers_ms", 0), duration_ms
+                    )
+                    for answer in output.get("answers", []):
+                        generated.append(str(answer))
+                        answer_data = {
+                            "type": "answer",
+                            "content": answer,
+                            "duration_ms": duration_ms,
+                            "elapsed_ms": elapsed_ms(),
+                        }
+                        yield answer_data
+
+                elif name == "write_final_answer":
+                    timings["final_answer_ms"] = duration_ms
+                    final_answer = output.get("final_answer")
+                    final_data = {
+                        "type": "final_answer",
+                        "content": final_answer,
+                        "duration_ms": duration_ms,
+                        "elapsed_ms": elapsed_ms(),
+                    }
+                    yield final_data
 
         # Send completion signal
-        completion_data = {"type": "complete", "final_answer": final_answer}
-        yield f"data: {json.dumps(completion_data)}\n\n"
+        timings["total_ms"] = elapsed_ms()
+        completion_data = {
+            "type": "complete",
+            "final_answer": final_answer,
+            "timings": timings,
+        }
+        yield completion_data
 
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client disconnected (see api.streaming)
+        record_wasted("ask", "".join(generated))
+        raise
     except Exception as e:
         logger.error(f"Error in ask streaming: {str(e)}")
         error_data = {"type": "error", "message": str(e)}
-        yield f"data: {json.dumps(error_data)}\n\n"
+        yield error_data
 
 
 @router.post("/search/ask")
-async def ask_knowledge_base(ask_request: AskRequest):
+async def ask_knowledge_base(ask_request: AskRequest, request: Request):
     """Ask the knowledge base a question using AI models."""
     try:
         # Validate models exist
@@ -141,8 +253,16 @@ async def ask_knowledge_base(ask_request: AskRequest):
 
         # For streaming response
         return StreamingResponse(
-            stream_ask_response(
-                ask_request.question, strategy_model, answer_model, final_answer_model
+            stream_sse(
+                request,
+                "ask",
+                stream_ask_response(
+                    ask_request.question,
+                    strategy_model,
+                    answer_model,
+                    final_answer_model,
+                    ask_request.search_type,
+                ),
             ),
             media_type="text/plain",
         )
@@ -195,6 +315,7 @@ async def ask_knowledge_base_simple(ask_request: AskRequest):
                     strategy_model=strategy_model.id,
                     answer_model=answer_model.id,
                     final_answer_model=final_answer_model.id,
+                    search_type=ask_request.search_type,
                 )
             ),
             stream_mode="updates",
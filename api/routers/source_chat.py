@@ -1,21 +1,26 @@
 import asyncio
 import json
-from typing import AsyncGenerator, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, HTTPException, Path, Request
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 from loguru import logger
 from pydantic import BaseModel, Field
 
+from api.streaming import record_wasted, stream_sse
 from open_notebook.database.repository import ensure_record_id, repo_query
 from open_notebook.domain.notebook import ChatSession, Source
 from open_notebook.exceptions import (
     NotFoundError,
 )
 from open_notebook.graphs.source_chat import get_source_chat_graph
-from open_notebook.utils.graph_utils import get_session_message_count
+from open_notebook.utils import clean_thinking_content
+from open_notebook.utils.graph_utils import (
+    backfill_session_activity,
+    delete_session_history,
+)
 
 router = APIRouter()
 
@@ -64,6 +69,12 @@ class SourceChatSessionResponse(BaseModel):
     message_count: Optional[int] = Field(
         None, description="Number of messages in session"
     )
+    last_message_preview: Optional[str] = Field(
+        None, description="Beginning of the last message in session"
+    )
+    last_activity: Optional[str] = Field(
+        None, description="Timestamp of the last chat turn"
+    )
 
 class SourceChatSessionWithMessagesResponse(SourceChatSessionResponse):
     messages: List[ChatMessage] = Field(
@@ -105,6 +116,7 @@ async def create_source_chat_session(
         session = ChatSession(
             title=request.title or f"Source Chat {asyncio.get_event_loop().time():.0f}",
             model_override=request.model_override,
+            message_count=0,
         )
         await session.save()
 
@@ -119,6 +131,8 @@ async def create_source_chat_session(
             created=str(session.created),
             updated=str(session.updated),
             message_count=0,
+            last_message_preview=None,
+            last_activity=None,
         )
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Source not found")
@@ -143,42 +157,38 @@ async def get_source_chat_sessions(source_id: str = Path(..., description="Sourc
         if not source:
             raise HTTPException(status_code=404, detail="Source not found")
 
-        # Get sessions that refer to this source - first get relations, then sessions
-        relations = await repo_query(
-            "SELECT in FROM refers_to WHERE out = $source_id",
+        # Sessions that refer to this source, newest first, in one query
+        result = await repo_query(
+            """
+            SELECT * FROM (SELECT VALUE in FROM refers_to WHERE out = $source_id)
+            ORDER BY created DESC
+            """,
             {"source_id": ensure_record_id(full_source_id)},
         )
 
         sessions = []
-        for relation in relations:
-            session_id_raw = relation.get("in")
-            if session_id_raw:
-                session_id = str(session_id_raw)
-
-                session_result = await repo_query(f"SELECT * FROM {session_id_raw}")
-                if session_result and len(session_result) > 0:
-                    session_data = session_result[0]
-
-                    source_chat_graph = await get_source_chat_graph()
-                    # Get message count from LangGraph state
-                    msg_count = await get_session_message_count(
-                        source_chat_graph, session_id
-                    )
-
-                    sessions.append(
-                        SourceChatSessionResponse(
-                            id=session_data.get("id") or "",
-                            title=session_data.get("title") or "Untitled Session",
-                            source_id=source_id,
-                            model_override=session_data.get("model_override"),
-                            created=str(session_data.get("created")),
-                            updated=str(session_data.get("updated")),
-                            message_count=msg_count,
-                        )
-                    )
+        for session_data in result or []:
+            session = ChatSession(**session_data)
+            # Sessions from before activity tracking are backfilled once
+            if session.message_count is None:
+                await backfill_session_activity(await get_source_chat_graph(), session)
+
+            sessions.append(
+                SourceChatSessionResponse(
+                    id=session.id or "",
+                    title=session.title or "Untitled Session",
+                    source_id=source_id,
+                    model_override=session.model_override,
+                    created=str(session.created),
+                    updated=str(session.updated),
+                    message_count=session.message_count,
+                    last_message_preview=session.last_message_preview,
+                    last_activity=str(session.last_activity)
+                    if session.last_activity
+                    else None,
+                )
+            )
 
-        # Sort sessions by created date (newest first)
-        sessions.sort(key=lambda x: x.created, reverse=True)
         return sessions
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Source not found")
@@ -273,6 +283,8 @@ async def get_source_chat_session(
             created=str(session.created),
             updated=str(session.updated),
             message_count=len(messages),
+            last_message_preview=session.last_message_preview,
+            last_activity=str(session.last_activity) if session.last_activity else None,
             messages=messages,
             context_indicators=context_indicators,
         )
@@ -336,9 +348,8 @@ async def update_source_chat_session(
 
         await session.save()
 
-        source_chat_graph = await get_source_chat_graph()
-        # Get message count from LangGraph state
-        msg_count = await get_session_message_count(source_chat_graph, full_session_id)
+        if session.message_count is None:
+            await backfill_session_activity(await get_source_chat_graph(), session)
 
         return SourceChatSessionResponse(
             id=session.id or "",
@@ -347,7 +358,9 @@ async def update_source_chat_session(
             model_override=getattr(session, "model_override", None),
             created=str(session.created),
             updated=str(session.updated),
-            message_count=msg_count,
+            message_count=session.message_count,
+            last_message_preview=session.last_message_preview,
+            last_activity=str(session.last_activity) if session.last_activity else None,
         )
     except NotFoundError:
         raise HTTPException(status_code=404, detail="Source or session not found")
@@ -400,6 +413,7 @@ async def delete_source_chat_session(
             )
 
         await session.delete()
+        await delete_session_history(full_session_id)
 
         return SuccessResponse(
             success=True, message="Source chat session deleted successfully"
@@ -414,9 +428,14 @@ async def delete_source_chat_session(
 
 
 async def stream_source_chat_response(
-    session_id: str, source_id: str, message: str, model_override: Optional[str] = None
-) -> AsyncGenerator[str, None]:
-    """Stream the source chat response as Server-Sent Events."""
+    session_id: str,
+    source_id: str,
+    message: str,
+    model_override: Optional[str] = None,
+    session: Optional[ChatSession] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Stream the source chat response as events (sent as SSE by stream_sse)."""
+    ai_content: List[str] = []
     try:
         source_chat_graph = await get_source_chat_graph()
         # Get current state
@@ -424,25 +443,30 @@ async def stream_source_chat_response(
             config=RunnableConfig(configurable={"thread_id": session_id})
         )
 
-        # Prepare state for execution
-        state_values = current_state.values if current_state else {}
-        state_values["messages"] = state_values.get("messages", [])
-        state_values["source_id"] = source_id
-        state_values["model_override"] = model_override
+        # Messages before this turn
+        previous_count = len(
+            (current_state.values if current_state else {}).get("messages", [])
+        )
 
-        # Add user message to state
+        # Only the keys this turn changes: passing the whole previous state
+        # would write back values (e.g. a summary stored meanwhile) it loaded
         user_message = HumanMessage(content=message)
-        state_values["messages"].append(user_message)
+        graph_input = {
+            "messages": [user_message],
+            "source_id": source_id,
+            "model_override": model_override,
+        }
 
         # Send user message event
         user_event = {"type": "user_message", "content": message, "timestamp": None}
-        yield f"data: {json.dumps(user_event)}\n\n"
+        yield user_event
 
         # Execute source chat graph with streaming - use astream_events for granular token streaming
         context_indicators = None
-        
+        usage = None
+
         async for event in source_chat_graph.astream_events(
-            input=state_values,
+            input=graph_input,
             config=RunnableConfig(
                 configurable={"thread_id": session_id, "model_id": model_override}
             ),
@@ -454,12 +478,13 @@ async def stream_source_chat_response(
             if kind == "on_chat_model_stream":
                 content = event["data"]["chunk"].content
                 if content:
+                    ai_content.append(content)
                     ai_event = {
                         "type": "ai_message",
                         "content": content,
                         "timestamp": None,
                     }
-                    yield f"data: {json.dumps(ai_event)}\n\n"
+                    yield ai_event
             
             # Extract context indicators from chain updates
             elif kind == "on_chain_end" and event["name"] == "LangGraph":
@@ -467,6 +492,8 @@ async def stream_source_chat_response(
                  output = event["data"].get("output")
                  if output and isinstance(output, dict) and "context_indicators" in output:
                      context_indicators = output["context_indicators"]
+                 if isinstance(output, dict) and output.get("usage"):
+                     usage = output["usage"]
 
         # Stream context indicators if available
         if context_indicators:
@@ -474,21 +501,35 @@ async def stream_source_chat_response(
                 "type": "context_indicators",
                 "data": context_indicators,
             }
-            yield f"data: {json.dumps(context_event)}\n\n"
+            yield context_event
+
+        # Token usage of the turn (prompt includes the source context)
+        if usage:
+            yield {"type": "usage", **usage}
+
+        # The turn added the user message and one AI reply to the history
+        if session:
+            reply = clean_thinking_content("".join(map(str, ai_content)))
+            await session.record_activity(previous_count + 2, reply or message)
 
         # Send completion signal
         completion_event = {"type": "complete"}
-        yield f"data: {json.dumps(completion_event)}\n\n"
+        yield completion_event
 
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client disconnected (see api.streaming)
+        record_wasted("source_chat", "".join(map(str, ai_content)))
+        raise
     except Exception as e:
         logger.error(f"Error in source chat streaming: {str(e)}")
         error_event = {"type": "error", "message": str(e)}
-        yield f"data: {json.dumps(error_event)}\n\n"
+        yield error_event
 
 
 @router.post("/sources/{source_id}/chat/sessions/{session_id}/messages")
 async def send_message_to_source_chat(
     request: SendMessageRequest,
+    http_request: Request,
     source_id: str = Path(..., description="Source ID"),
     session_id: str = Path(..., description="Session ID"),
 ):
@@ -539,11 +580,16 @@ async def send_message_to_source_chat(
 
         # Return streaming response
         return StreamingResponse(
-            stream_source_chat_response(
-                session_id=full_session_id,
-                source_id=full_source_id,
-                message=request.message,
-                model_override=model_override,
+            stream_sse(
+                http_request,
+                "source_chat",
+                stream_source_chat_response(
+                    session_id=full_session_id,
+                    source_id=full_source_id,
+                    message=request.message,
+                    model_override=model_override,
+                    session=session,
+                ),
             ),
             media_type="text/plain",
             headers={
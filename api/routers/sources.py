@@ -1,7 +1,18 @@
 import asyncio
 import os
+import time
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from fastapi import (
     APIRouter,
@@ -10,26 +21,38 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
     UploadFile,
 )
 from fastapi.responses import FileResponse, Response
 from loguru import logger
-from surreal_commands import execute_command_sync
+from surreal_commands import execute_command_sync, submit_command
 
 from api.command_service import CommandService
 from api.models import (
     AssetModel,
+    CommandStatusSummary,
     CreateSourceInsightRequest,
+    SourceBatchCreate,
+    SourceBatchItem,
+    SourceBatchResponse,
+    SourceBatchResult,
     SourceCreate,
     SourceInsightResponse,
     SourceListResponse,
     SourceResponse,
+    SourceStatusBatchRequest,
+    SourceStatusBatchResponse,
     SourceStatusResponse,
     SourceUpdate,
 )
 from commands.source_commands import SourceProcessingInput
 from open_notebook.config import UPLOADS_FOLDER
-from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.database.repository import (
+    ensure_record_id,
+    repo_insert,
+    repo_query,
+)
 from open_notebook.domain.notebook import Notebook, Source
 from open_notebook.domain.transformation import Transformation
 from open_notebook.exceptions import InvalidInputError
@@ -84,6 +107,42 @@ async def save_uploaded_file(upload_file: UploadFile) -> str:
         raise
 
 
+def build_content_state(
+    source_data: Union[SourceCreate, SourceBatchItem],
+    uploaded_file_path: Optional[str] = None,
+) -> dict[str, Any]:
+    """Build the content_state for process_source, validating required fields."""
+    content_state: dict[str, Any] = {}
+
+    if source_data.type == "link":
+        if not source_data.url:
+            raise HTTPException(status_code=400, detail="URL is required for link type")
+        content_state["url"] = source_data.url
+    elif source_data.type == "upload":
+        # Use uploaded file path or provided file_path (backward compatibility)
+        final_file_path = uploaded_file_path or source_data.file_path
+        if not final_file_path:
+            raise HTTPException(
+                status_code=400,
+                detail="File upload or file_path is required for upload type",
+            )
+        content_state["file_path"] = final_file_path
+        content_state["delete_source"] = source_data.delete_source
+    elif source_data.type == "text":
+        if not source_data.content:
+            raise HTTPException(
+                status_code=400, detail="Content is required for text type"
+            )
+        content_state["content"] = source_data.content
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid source type. Must be link, upload, or text",
+        )
+
+    return content_state
+
+
 def parse_source_form_data(
     type: str = Form(...),
     notebook_id: Optional[str] = Form(None),
@@ -308,35 +367,7 @@ async def create_source(
                 )
 
         # Prepare content_state for processing
-        content_state: dict[str, Any] = {}
-
-        if source_data.type == "link":
-            if not source_data.url:
-                raise HTTPException(
-                    status_code=400, detail="URL is required for link type"
-                )
-            content_state["url"] = source_data.url
-        elif source_data.type == "upload":
-            # Use uploaded file path or provided file_path (backward compatibility)
-            final_file_path = file_path or source_data.file_path
-            if not final_file_path:
-                raise HTTPException(
-                    status_code=400,
-                    detail="File upload or file_path is required for upload type",
-                )
-            content_state["file_path"] = final_file_path
-            content_state["delete_source"] = source_data.delete_source
-        elif source_data.type == "text":
-            if not source_data.content:
-                raise HTTPException(
-                    status_code=400, detail="Content is required for text type"
-                )
-            content_state["content"] = source_data.content
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid source type. Must be link, upload, or text",
-            )
+        content_state = build_content_state(source_data, file_path)
 
         # Validate transformations exist
         transformation_ids = source_data.transformations or []
@@ -558,6 +589,317 @@ async def create_source_json(source_data: SourceCreate):
     return await create_source(form_data)
 
 
+# Items created and submitted per bulk step of the batch ingestion pipeline
+SOURCE_BATCH_CHUNK_SIZE = 100
+# Concurrent process_source submissions during batch ingestion
+SOURCE_BATCH_SUBMIT_CONCURRENCY = 8
+# Chunks in flight while the request body is still being read
+SOURCE_BATCH_MAX_PENDING_CHUNKS = 2
+
+
+class _BatchEntry(NamedTuple):
+    position: int
+    title: Optional[str]
+    content_state: Dict[str, Any]
+    notebooks: List[str]
+    transformations: List[str]
+    embed: bool
+
+
+class _SourceBatchIngest:
+    """
+    Pipelined bulk source creation.
+
+    Items arrive in chunks; each chunk is validated against notebook and
+    transformation IDs (looked up once per distinct ID for the whole batch),
+    created with a single INSERT, linked to notebooks with a single
+    INSERT RELATION and then submitted for processing under a concurrency cap.
+    """
+
+    def __init__(self, defaults: SourceBatchCreate):
+        self.defaults = defaults
+        # (table, ID) -> whether the ID names an existing record of that table
+        self.known: Dict[Tuple[str, str], bool] = {}
+        self.results: List[SourceBatchResult] = []
+        self.submit_semaphore = asyncio.Semaphore(SOURCE_BATCH_SUBMIT_CONCURRENCY)
+
+    def fail(self, index: int, error: str) -> None:
+        self.results.append(SourceBatchResult(index=index, error=error))
+
+    async def _check_ids(self, table: str, ids: Set[str]) -> None:
+        unknown = [i for i in ids if (table, i) not in self.known]
+        if not unknown:
+            return
+        # IDs of another table (e.g. a transformation given as a notebook) never match
+        candidates = [i for i in unknown if i.startswith(f"{table}:")]
+        found: Set[str] = set()
+        if candidates:
+            existing = await repo_query(
+                "SELECT VALUE id FROM $ids",
+                {"ids": [ensure_record_id(i) for i in candidates]},
+            )
+            found = {str(i) for i in existing or []}
+        for i in unknown:
+            self.known[(table, i)] = i in found
+
+    async def _submit(self, command_input: SourceProcessingInput) -> str:
+        async with self.submit_semaphore:
+            # Bulk imports go to the low-priority lane so interactive work stays fast
+            command_id = await asyncio.to_thread(
+                submit_command,
+                "open_notebook",
+                "process_source",
+                command_input.model_dump(),
+                context={"lane": "bulk"},
+            )
+            return str(command_id)
+
+    async def add_chunk(self, chunk: List[Tuple[int, Dict[str, Any]]]) -> None:
+        # 1. Validate items and resolve batch-wide defaults
+        entries: List[_BatchEntry] = []
+        for index, raw in chunk:
+            try:
+                item = SourceBatchItem.model_validate(raw)
+                content_state = build_content_state(item)
+            except HTTPException as e:
+                self.fail(index, str(e.detail))
+                continue
+            except Exception as e:
+                self.fail(index, str(e))
+                continue
+            entries.append(
+                _BatchEntry(
+                    position=index,
+                    title=item.title,
+                    content_state=content_state,
+                    notebooks=self.defaults.notebooks
+                    if item.notebooks is None
+                    else item.notebooks,
+                    transformations=self.defaults.transformations
+                    if item.transformations is None
+                    else item.transformations,
+                    embed=self.defaults.embed if item.embed is None else item.embed,
+                )
+            )
+
+        try:
+            await self._check_ids("notebook", {i for e in entries for i in e.notebooks})
+            await self._check_ids(
+                "transformation", {i for e in entries for i in e.transformations}
+            )
+        except Exception as e:
+            for entry in entries:
+                self.fail(
+                    entry.position, f"Failed to validate notebooks/transformations: {e}"
+                )
+            return
+
+        accepted: List[_BatchEntry] = []
+        for entry in entries:
+            missing = [
+                i for i in entry.notebooks if not self.known[("notebook", i)]
+            ] + [
+                i
+                for i in entry.transformations
+                if not self.known[("transformation", i)]
+            ]
+            if missing:
+                self.fail(entry.position, f"Not found: {', '.join(missing)}")
+            else:
+                accepted.append(entry)
+        if not accepted:
+            return
+
+        # 2. Create all sources and notebook references with two bulk inserts
+        try:
+            created = await repo_insert(
+                "source",
+                [{"title": e.title or "Processing...", "topics": []} for e in accepted],
+            )
+            source_ids = [str(record["id"]) for record in created]
+            edges = [
+                {"in": ensure_record_id(source_id), "out": ensure_record_id(nb)}
+                for source_id, entry in zip(source_ids, accepted)
+                for nb in entry.notebooks
+            ]
+            if edges:
+                await repo_query(
+                    "INSERT RELATION INTO reference $edges", {"edges": edges}
+                )
+        except Exception as e:
+            logger.error(f"Bulk source insert failed: {e}")
+            for entry in accepted:
+                self.fail(entry.position, f"Failed to create source: {e}")
+            return
+
+        # 3. Submit processing under the concurrency cap
+        outcomes = await asyncio.gather(
+            *[
+                self._submit(
+                    SourceProcessingInput(
+                        source_id=source_id,
+                        content_state=entry.content_state,
+                        notebook_ids=entry.notebooks,
+                        transformations=entry.transformations,
+                        embed=entry.embed,
+                    )
+                )
+                for source_id, entry in zip(source_ids, accepted)
+            ],
+            return_exceptions=True,
+        )
+
+        submitted = []
+        orphaned = []
+        for source_id, entry, outcome in zip(source_ids, accepted, outcomes):
+            if isinstance(outcome, BaseException):
+                orphaned.append(ensure_record_id(source_id))
+                self.fail(entry.position, f"Failed to queue processing: {outcome}")
+                continue
+            submitted.append(
+                {
+                    "source": ensure_record_id(source_id),
+                    "command": ensure_record_id(outcome),
+                }
+            )
+            self.results.append(
+                SourceBatchResult(
+                    index=entry.position, source_id=source_id, command_id=outcome
+                )
+            )
+
+        # 4. Link sources to their commands and drop sources that were never queued
+        try:
+            if submitted:
+                await repo_query(
+                    "FOR $row IN $rows { UPDATE $row.source SET command = $row.command; };",
+                    {"rows": submitted},
+                )
+            if orphaned:
+                await repo_query("DELETE $ids", {"ids": orphaned})
+        except Exception as e:
+            logger.warning(f"Failed to finalize batch chunk: {e}")
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, parsed line) from a streamed NDJSON body; bad lines yield the error."""
+    import json
+
+    buffer = b""
+    index = 0
+
+    def parse(line: bytes) -> Any:
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            return ValueError(f"Invalid JSON: {e}")
+
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, parse(line)
+                index += 1
+    if buffer.strip():
+        yield index, parse(buffer)
+
+
+@router.post("/sources/batch", response_model=SourceBatchResponse)
+async def create_sources_batch(
+    request: Request,
+    notebooks: Optional[List[str]] = Query(
+        None, description="NDJSON only: notebook IDs to add every source to"
+    ),
+    transformations: Optional[List[str]] = Query(
+        None, description="NDJSON only: transformation IDs to apply to every source"
+    ),
+    embed: bool = Query(False, description="NDJSON only: embed every source"),
+):
+    """
+    Create many sources at once and queue them for background processing.
+
+    Accepts either a JSON SourceBatchCreate body or a streamed NDJSON body
+    (Content-Type: application/x-ndjson) with one SourceBatchItem per line and
+    batch-wide defaults as query parameters. NDJSON items are created and
+    queued while the rest of the body is still arriving.
+
+    Processing always runs asynchronously in the bulk priority lane. Items
+    that fail validation are reported per index; the others are still created.
+    """
+    start_time = time.time()
+    try:
+        import commands.source_commands  # noqa: F401
+
+        content_type = request.headers.get("content-type", "")
+        is_ndjson = "ndjson" in content_type or "jsonlines" in content_type
+
+        if is_ndjson:
+            defaults = SourceBatchCreate(
+                items=[],
+                notebooks=notebooks or [],
+                transformations=transformations or [],
+                embed=embed,
+            )
+            items: AsyncIterator[Tuple[int, Any]] = _iter_ndjson(request)
+        else:
+            try:
+                defaults = SourceBatchCreate.model_validate(await request.json())
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid batch: {e}")
+
+            async def _iter_items() -> AsyncIterator[Tuple[int, Any]]:
+                for index, item in enumerate(defaults.items):
+                    yield index, item.model_dump()
+
+            items = _iter_items()
+
+        ingest = _SourceBatchIngest(defaults)
+        pending: Set[asyncio.Task] = set()
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+
+        async def flush() -> None:
+            nonlocal chunk
+            if not chunk:
+                return
+            pending.add(asyncio.create_task(ingest.add_chunk(chunk)))
+            chunk = []
+            if len(pending) >= SOURCE_BATCH_MAX_PENDING_CHUNKS:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                pending.difference_update(done)
+
+        async for index, item in items:
+            if isinstance(item, Exception):
+                ingest.fail(index, str(item))
+                continue
+            chunk.append((index, item))
+            if len(chunk) >= SOURCE_BATCH_CHUNK_SIZE:
+                await flush()
+        await flush()
+        if pending:
+            await asyncio.gather(*pending)
+
+        results = sorted(ingest.results, key=lambda r: r.index)
+        created = sum(1 for r in results if r.source_id)
+        logger.info(
+            f"Batch source ingestion: {created} created, {len(results) - created} failed"
+        )
+        return SourceBatchResponse(
+            created=created,
+            failed=len(results) - created,
+            results=results,
+            processing_time=time.time() - start_time,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating sources in batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error creating sources: {str(e)}")
+
+
 async def _resolve_source_file(source_id: str) -> tuple[str, str]:
     source = await Source.get(source_id)
     if not source:
@@ -687,6 +1029,108 @@ async def download_source_file(source_id: str):
         raise HTTPException(status_code=500, detail="Failed to download source file")
 
 
+def _status_message(status: Optional[str]) -> str:
+    """Descriptive message for a source processing status."""
+    if status == "completed":
+        return "Source processing completed successfully"
+    elif status == "failed":
+        return "Source processing failed"
+    elif status == "running":
+        return "Source processing in progress"
+    elif status in ("queued", "new"):
+        return "Source processing queued"
+    elif status == "unknown":
+        return "Source processing status unknown"
+    return f"Source processing status: {status}"
+
+
+@router.post("/sources/status", response_model=SourceStatusBatchResponse)
+async def get_source_status_batch(request: SourceStatusBatchRequest):
+    """
+    Get processing status for many sources and/or commands in one query.
+
+    Meant to replace per-source polling of /sources/{id}/status. IDs that do
+    not exist are omitted from the response. For push updates instead of
+    polling, use GET /commands/events.
+    """
+    try:
+        if not request.source_ids and not request.command_ids:
+            return SourceStatusBatchResponse()
+
+        result = await repo_query(
+            """
+            RETURN {
+                sources: (SELECT id, command AS command_id, command.status AS status,
+                    command.error_message AS error_message,
+                    command.result.execution_metadata AS execution_metadata
+                    FROM $source_ids),
+                commands: (SELECT id, status, error_message FROM $command_ids)
+            }
+            """,
+            {
+                "source_ids": [
+                    ensure_record_id(
+                        sid if sid.startswith("source:") else f"source:{sid}"
+                    )
+                    for sid in request.source_ids
+                ],
+                "command_ids": [
+                    ensure_record_id(
+                        cid if cid.startswith("command:") else f"command:{cid}"
+                    )
+                    for cid in request.command_ids
+                ],
+            },
+        )
+        # RETURN yields the object itself rather than a list of rows
+        row: Dict[str, Any] = (
+            result if isinstance(result, dict) else result[0] if result else {}
+        )
+
+        sources = {}
+        for item in row.get("sources") or []:
+            if not item.get("command_id"):
+                sources[item["id"]] = SourceStatusResponse(
+                    status=None,
+                    message="Legacy source (completed before async processing)",
+                    processing_info=None,
+                    command_id=None,
+                )
+                continue
+
+            # A command reference that no longer resolves has no status
+            status = item.get("status") or "unknown"
+            execution_metadata = item.get("execution_metadata") or {}
+            sources[item["id"]] = SourceStatusResponse(
+                status=status,
+                message=_status_message(status),
+                processing_info={
+                    "status": status,
+                    "started_at": execution_metadata.get("started_at"),
+                    "completed_at": execution_metadata.get("completed_at"),
+                    "error": item.get("error_message") or None,
+                },
+                command_id=str(item["command_id"]),
+            )
+
+        commands = {
+            item["id"]: CommandStatusSummary(
+                command_id=item["id"],
+                status=item.get("status"),
+                error_message=item.get("error_message") or None,
+            )
+            for item in row.get("commands") or []
+        }
+
+        return SourceStatusBatchResponse(sources=sources, commands=commands)
+
+    except Exception as e:
+        logger.error(f"Error fetching batch source status: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error fetching source status: {str(e)}"
+        )
+
+
 @router.get("/sources/{source_id}/status", response_model=SourceStatusResponse)
 async def get_source_status(source_id: str):
     """Get processing status for a source."""
@@ -710,23 +1154,9 @@ async def get_source_status(source_id: str):
             status = await source.get_status()
             processing_info = await source.get_processing_progress()
 
-            # Generate descriptive message based on status
-            if status == "completed":
-                message = "Source processing completed successfully"
-            elif status == "failed":
-                message = "Source processing failed"
-            elif status == "running":
-                message = "Source processing in progress"
-            elif status == "queued":
-                message = "Source processing queued"
-            elif status == "unknown":
-                message = "Source processing status unknown"
-            else:
-                message = f"Source processing status: {status}"
-
             return SourceStatusResponse(
                 status=status,
-                message=message,
+                message=_status_message(status),
                 processing_info=processing_info,
                 command_id=str(source.command) if source.command else None,
             )
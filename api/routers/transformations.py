@@ -98,13 +98,19 @@ async def execute_transformation(execute_request: TransformationExecuteRequest):
                 input_text=execute_request.input_text,
                 transformation=transformation,
             ),
-            config=dict(configurable={"model_id": execute_request.model_id}),
+            config=dict(
+                configurable={
+                    "model_id": execute_request.model_id,
+                    "bypass_cache": execute_request.bypass_cache,
+                }
+            ),
         )
 
         return TransformationExecuteResponse(
             output=result["output"],
             transformation_id=execute_request.transformation_id,
             model_id=execute_request.model_id,
+            cached=result.get("cached", False),
         )
 
     except HTTPException:
@@ -0,0 +1,251 @@
+"""
+Server-Sent Events output of the chat and ask streams.
+
+The streams yield event dicts; stream_sse() turns them into SSE frames for a
+StreamingResponse.
+
+Coalescing: models stream a chunk per token or two, and writing each as its
+own frame meant thousands of JSON encodes and tiny writes per answer. The
+first token of a stream is still sent at once (time to first token is
+unchanged), but later token events (ai_message, final_answer_token) are
+buffered and sent as one event with the concatenated content when
+SSE_FLUSH_INTERVAL_MS has passed since the first buffered token, when
+SSE_FLUSH_BYTES of content are buffered, or before any other event. Frames
+are encoded with orjson when it is installed.
+
+Cancellation: a StreamingResponse generator is only resumed when the
+previous frame has been sent, so after the browser closes the tab the streams
+kept running the graph (and the provider call) to the end, spending tokens
+and rate-limit capacity on replies nobody reads. stream_sse() watches the
+request for http.disconnect and then cancels the stream where it is waiting,
+which cancels the graph run and closes the in-flight provider HTTP request
+(providers stop generating when the connection closes). The interrupted turn
+is not checkpointed, as if it had never been sent. Streams report the text
+they had generated when cancelled with record_wasted().
+
+stream_stats() returns frame and byte rates and cancellation counts.
+
+Configuration (environment variables):
+- SSE_FLUSH_INTERVAL_MS: longest time a token is buffered (default 40, 0 sends
+  every token as it arrives)
+- SSE_FLUSH_BYTES: buffered content that triggers a flush (default 2048)
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, AsyncIterator, Deque, Dict, List, Optional
+
+from fastapi import Request
+from loguru import logger
+
+from open_notebook.config import env_int
+from open_notebook.utils import token_count
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+DEFAULT_FLUSH_INTERVAL_MS = 40
+DEFAULT_FLUSH_BYTES = 2048
+
+# Token events whose content may be concatenated into one frame
+COALESCED_EVENTS = {"ai_message", "final_answer_token"}
+
+# Stream name -> totals over all its streams
+_stats: Dict[str, Dict[str, float]] = {}
+# Per-stream figures of the most recent streams
+_recent: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+
+def _counters(name: str) -> Dict[str, float]:
+    return _stats.setdefault(
+        name,
+        {
+            "completed": 0,
+            "cancelled": 0,
+            "wasted_tokens": 0,
+            "events": 0,
+            "frames": 0,
+            "bytes": 0,
+            "seconds": 0.0,
+        },
+    )
+
+
+def record_wasted(name: str, text: str) -> None:
+    """Count the tokens a cancelled stream generated for nobody."""
+    if text:
+        _counters(name)["wasted_tokens"] += token_count(text)
+
+
+def _rate(amount: float, seconds: float) -> Optional[float]:
+    return round(amount / seconds, 1) if seconds > 0 else None
+
+
+def stream_stats() -> Dict[str, Any]:
+    """Totals per stream name and figures of the most recent streams."""
+    streams = {}
+    for name, counters in _stats.items():
+        streams[name] = {
+            **counters,
+            "seconds": round(counters["seconds"], 3),
+            "frames_per_second": _rate(counters["frames"], counters["seconds"]),
+            "bytes_per_second": _rate(counters["bytes"], counters["seconds"]),
+        }
+    return {"streams": streams, "recent": list(_recent)}
+
+
+def encode_event(event: Dict[str, Any]) -> bytes:
+    """SSE frame of an event."""
+    if orjson is not None:
+        data = orjson.dumps(event, default=str)
+    else:
+        data = json.dumps(event, default=str).encode("utf-8")
+    return b"data: " + data + b"\n\n"
+
+
+class _TokenBuffer:
+    """Token events waiting to be sent as one."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self.event: Optional[Dict[str, Any]] = None
+        self.parts: List[str] = []
+        self.size = 0
+        self.deadline = 0.0
+
+    def __bool__(self) -> bool:
+        return self.event is not None
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.event["type"] if self.event else None
+
+    def add(self, event: Dict[str, Any], interval: float) -> None:
+        if self.event is None:
+            self.deadline = time.monotonic() + interval
+        # The latest event's other fields (e.g. elapsed_ms) are kept
+        self.event = event
+        content = event.get("content") or ""
+        self.parts.append(content)
+        self.size += len(content.encode("utf-8"))
+
+    def take(self) -> Dict[str, Any]:
+        event = {**(self.event or {}), "content": "".join(self.parts)}
+        self._reset()
+        return event
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def stream_sse(
+    request: Request, name: str, events: AsyncGenerator[Dict[str, Any], None]
+) -> AsyncIterator[bytes]:
+    """
+    SSE frames of a stream's events until the stream ends or the client leaves.
+
+    Args:
+        request: Request being answered, watched for http.disconnect
+        name: Stream name for the statistics (e.g. "chat")
+        events: Event dicts; cancelled if the client disconnects
+    """
+    interval = env_int("SSE_FLUSH_INTERVAL_MS", DEFAULT_FLUSH_INTERVAL_MS) / 1000
+    max_bytes = env_int("SSE_FLUSH_BYTES", DEFAULT_FLUSH_BYTES)
+    started = time.monotonic()
+    figures = {"events": 0, "frames": 0, "bytes": 0}
+    buffer = _TokenBuffer()
+    first_token_sent = False
+
+    def frame(event: Dict[str, Any]) -> bytes:
+        data = encode_event(event)
+        figures["frames"] += 1
+        figures["bytes"] += len(data)
+        return data
+
+    disconnected = asyncio.create_task(_wait_for_disconnect(request))
+    pending: Optional[asyncio.Future] = None
+    completed = False
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(events.__anext__())
+            timeout = max(0.0, buffer.deadline - time.monotonic()) if buffer else None
+            await asyncio.wait(
+                {pending, disconnected},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not pending.done():
+                if disconnected.done():
+                    # Throws CancelledError into the stream at its current await
+                    pending.cancel()
+                    await asyncio.wait({pending})
+                    pending = None
+                    logger.info(f"Client disconnected, cancelled {name} stream")
+                    return
+                # The flush window ended before the next event
+                yield frame(buffer.take())
+                continue
+
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                pending = None
+                completed = True
+                if buffer:
+                    yield frame(buffer.take())
+                return
+            pending = None
+            figures["events"] += 1
+
+            if (
+                event.get("type") in COALESCED_EVENTS
+                and isinstance(event.get("content"), str)
+                and interval > 0
+            ):
+                if buffer and buffer.type != event["type"]:
+                    yield frame(buffer.take())
+                if first_token_sent:
+                    buffer.add(event, interval)
+                    if buffer.size >= max_bytes:
+                        yield frame(buffer.take())
+                    continue
+                first_token_sent = True
+            elif buffer:
+                yield frame(buffer.take())
+            yield frame(event)
+    finally:
+        disconnected.cancel()
+        if pending is not None and not pending.done():
+            # The response itself was cancelled while the stream was running
+            pending.cancel()
+        elif pending is None or not pending.cancelled():
+            # Closing a suspended stream raises GeneratorExit at its yield
+            await events.aclose()
+
+        seconds = time.monotonic() - started
+        counters = _counters(name)
+        counters["completed" if completed else "cancelled"] += 1
+        counters["seconds"] += seconds
+        for key, value in figures.items():
+            counters[key] += value
+        _recent.append(
+            {
+                "name": name,
+                "completed": completed,
+                **figures,
+                "seconds": round(seconds, 3),
+                "frames_per_second": _rate(figures["frames"], seconds),
+                "bytes_per_second": _rate(figures["bytes"], seconds),
+            }
+        )
@@ -5,6 +5,7 @@ from .embedding_commands import (
     embed_note_command,
     embed_source_command,
     rebuild_embeddings_command,
+    shadow_reindex_embeddings_command,
 )
 from .source_commands import process_source_command
 
@@ -14,6 +15,7 @@ __all__ = [
     "embed_insight_command",
     "embed_source_command",
     "rebuild_embeddings_command",
+    "shadow_reindex_embeddings_command",
     # Other commands
     "process_source_command",
 ]
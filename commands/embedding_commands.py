@@ -1,15 +1,39 @@
+import asyncio
 import time
-from typing import Dict, List, Literal, Optional
+import uuid
+from typing import AsyncIterator, Dict, List, Literal, Optional
 
 from loguru import logger
 from pydantic import BaseModel
-from surreal_commands import CommandInput, CommandOutput, command, submit_command
+from surreal_commands import CommandInput, CommandOutput, command
 
 from open_notebook.ai.models import model_manager
+from open_notebook.database.command_queue import record_retry, submit_coalesced
 from open_notebook.database.repository import ensure_record_id, repo_insert, repo_query
+from open_notebook.database.write_lock import record_write_lock
+from open_notebook.domain.embedding_migration import (
+    EmbeddingMigration,
+    cutover_shadow_embeddings,
+    get_shadow_coverage,
+    get_shadow_target_model,
+)
 from open_notebook.domain.notebook import Note, Source, SourceInsight
-from open_notebook.utils.chunking import ContentType, chunk_text, detect_content_type
-from open_notebook.utils.embedding import generate_embedding, generate_embeddings
+from open_notebook.utils.chunking import (
+    CHUNK_SIZE,
+    STREAM_SECTION_SIZE,
+    ContentType,
+    aiter_chunks,
+    detect_content_type,
+)
+from open_notebook.utils.embedding import (
+    generate_embedding,
+    generate_embeddings,
+    get_chunking_config,
+)
+from open_notebook.utils.offload import run_offloaded
+
+# Chunks embedded (one API call) and inserted per round trip when embedding a source
+EMBED_WINDOW_SIZE = 64
 
 
 def full_model_dump(model):
@@ -93,6 +117,118 @@ class EmbedSourceOutput(CommandOutput):
     error_message: Optional[str] = None
 
 
+class ShadowReindexInput(CommandInput):
+    """Input for backfilling shadow embeddings with a new embedding model."""
+
+    target_model: str
+    batch_size: int = 16
+    batch_delay: float = 1.0
+    auto_cutover: bool = False
+
+
+class ShadowReindexOutput(CommandOutput):
+    """Output from shadow re-indexing command."""
+
+    success: bool
+    target_model: str
+    notes_processed: int = 0
+    insights_processed: int = 0
+    sources_processed: int = 0
+    failed_items: int = 0
+    coverage: float = 0.0
+    cut_over: bool = False
+    processing_time: float
+    error_message: Optional[str] = None
+
+
+async def generate_shadow_embedding(
+    text: str, content_type: Optional[ContentType] = None
+) -> Optional[List[float]]:
+    """
+    Embed text with the migration target model if a model switch is in progress.
+
+    Failures are logged and swallowed so live embedding never depends on the
+    target model; the shadow backfill picks up anything left uncovered.
+    """
+    shadow_model = await get_shadow_target_model()
+    if not shadow_model:
+        return None
+
+    try:
+        return await generate_embedding(
+            text, content_type=content_type, model_id=shadow_model
+        )
+    except Exception as e:
+        logger.warning(
+            f"Shadow embedding with model {shadow_model} failed: {e}. "
+            "The shadow backfill will pick it up."
+        )
+        return None
+
+
+async def _iter_windows(
+    chunks: AsyncIterator[str], size: int = EMBED_WINDOW_SIZE
+) -> AsyncIterator[List[str]]:
+    """Group a chunk stream into lists of at most size chunks."""
+    window: List[str] = []
+    async for chunk in chunks:
+        window.append(chunk)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+async def _embed_chunk_records(
+    source_id: str,
+    chunks: List[str],
+    first_order: int,
+    model_id: Optional[str] = None,
+    attempt: Optional[str] = None,
+) -> List[Dict]:
+    """Embed one window of chunks and build its chunk embedding records."""
+    embeddings = await generate_embeddings(chunks, model_id=model_id)
+    if len(embeddings) != len(chunks):
+        raise ValueError(
+            f"Embedding count mismatch: got {len(embeddings)} embeddings "
+            f"for {len(chunks)} chunks"
+        )
+    return [
+        {
+            "source": ensure_record_id(source_id),
+            "order": first_order + idx,
+            "content": chunk,
+            "embedding": embedding,
+            **({"attempt": attempt} if attempt else {}),
+        }
+        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings))
+    ]
+
+
+async def write_source_shadow_embeddings(
+    source_id: str,
+    text: str,
+    model_id: str,
+    content_type: Optional[ContentType] = None,
+) -> int:
+    """Replace the shadow chunk embeddings of a source using the given model."""
+    await repo_query(
+        "DELETE source_embedding_shadow WHERE source = $source_id",
+        {"source_id": ensure_record_id(source_id)},
+    )
+    config = await get_chunking_config(model_id)
+    chunk_stream = aiter_chunks(text, content_type=content_type, config=config)
+    total = 0
+    async for window in _iter_windows(chunk_stream):
+        records = await _embed_chunk_records(source_id, window, total, model_id)
+        await repo_insert("source_embedding_shadow", records)
+        total += len(window)
+    if total == 0:
+        raise ValueError("No chunks created after splitting text")
+    return total
+
+
 @command(
     "embed_note",
     app="open_notebook",
@@ -115,7 +251,7 @@ async def embed_note_command(input_data: EmbedNoteInput) -> EmbedNoteOutput:
     Flow:
     1. Load Note by ID
     2. Generate embedding via generate_embedding() (auto-chunks + mean pools if needed)
-    3. UPSERT note embedding in database
+    3. UPSERT note embedding (and shadow embedding, if a model migration is active)
 
     Retry Strategy:
     - Retries up to 5 times for transient failures (RuntimeError, ConnectionError, TimeoutError)
@@ -141,12 +277,18 @@ async def embed_note_command(input_data: EmbedNoteInput) -> EmbedNoteOutput:
             note.content, content_type=ContentType.MARKDOWN
         )
 
+        # Shadow vector for an in-progress embedding model migration (None otherwise)
+        shadow_embedding = await generate_shadow_embedding(
+            note.content, content_type=ContentType.MARKDOWN
+        )
+
         # 3. UPSERT embedding into note record
         await repo_query(
-            "UPDATE $note_id SET embedding = $embedding",
+            "UPDATE $note_id SET embedding = $embedding, embedding_shadow = $embedding_shadow",
             {
                 "note_id": ensure_record_id(input_data.note_id),
                 "embedding": embedding,
+                "embedding_shadow": shadow_embedding,
             },
         )
 
@@ -161,15 +303,17 @@ async def embed_note_command(input_data: EmbedNoteInput) -> EmbedNoteOutput:
             processing_time=processing_time,
         )
 
-    except RuntimeError:
+    except RuntimeError as e:
         logger.debug(
             f"Transaction conflict for note {input_data.note_id} - will be retried"
         )
+        await record_retry("embed_note", e)
         raise
     except (ConnectionError, TimeoutError) as e:
         logger.debug(
             f"Network/timeout error for note {input_data.note_id} ({type(e).__name__}: {e}) - will be retried"
         )
+        await record_retry("embed_note", e)
         raise
     except Exception as e:
         processing_time = time.time() - start_time
@@ -206,7 +350,7 @@ async def embed_insight_command(input_data: EmbedInsightInput) -> EmbedInsightOu
     Flow:
     1. Load SourceInsight by ID
     2. Generate embedding via generate_embedding() (auto-chunks + mean pools if needed)
-    3. UPSERT insight embedding in database
+    3. UPSERT insight embedding (and shadow embedding, if a model migration is active)
 
     Retry Strategy:
     - Retries up to 5 times for transient failures (RuntimeError, ConnectionError, TimeoutError)
@@ -234,15 +378,29 @@ async def embed_insight_command(input_data: EmbedInsightInput) -> EmbedInsightOu
             insight.content, content_type=ContentType.MARKDOWN
         )
 
-        # 3. UPSERT embedding into insight record
-        await repo_query(
-            "UPDATE $insight_id SET embedding = $embedding",
-            {
-                "insight_id": ensure_record_id(input_data.insight_id),
-                "embedding": embedding,
-            },
+        # Shadow vector for an in-progress embedding model migration (None otherwise)
+        shadow_embedding = await generate_shadow_embedding(
+            insight.content, content_type=ContentType.MARKDOWN
         )
 
+        # 3. UPSERT embedding into insight record, serialized with the other
+        # writes for its source (insight creation, source processing)
+        source_ids = await repo_query(
+            "SELECT VALUE source FROM $insight_id",
+            {"insight_id": ensure_record_id(input_data.insight_id)},
+        )
+        async with record_write_lock(
+            str(source_ids[0]) if source_ids else input_data.insight_id
+        ):
+            await repo_query(
+                "UPDATE $insight_id SET embedding = $embedding, embedding_shadow = $embedding_shadow",
+                {
+                    "insight_id": ensure_record_id(input_data.insight_id),
+                    "embedding": embedding,
+                    "embedding_shadow": shadow_embedding,
+                },
+            )
+
         processing_time = time.time() - start_time
         logger.info(
             f"Successfully embedded insight {input_data.insight_id} in {processing_time:.2f}s"
@@ -254,15 +412,17 @@ async def embed_insight_command(input_data: EmbedInsightInput) -> EmbedInsightOu
             processing_time=processing_time,
         )
 
-    except RuntimeError:
+    except RuntimeError as e:
         logger.debug(
             f"Transaction conflict for insight {input_data.insight_id} - will be retried"
         )
+        await record_retry("embed_insight", e)
         raise
     except (ConnectionError, TimeoutError) as e:
         logger.debug(
             f"Network/timeout error for insight {input_data.insight_id} ({type(e).__name__}: {e}) - will be retried"
         )
+        await record_retry("embed_insight", e)
         raise
     except Exception as e:
         processing_time = time.time() - start_time
@@ -298,11 +458,18 @@ async def embed_source_command(input_data: EmbedSourceInput) -> EmbedSourceOutpu
 
     Flow:
     1. Load Source by ID
-    2. DELETE existing source_embedding records for this source
-    3. Detect content type from file path or content
-    4. Chunk text using appropriate splitter
-    5. Generate embeddings for all chunks in a single API call
-    6. Bulk INSERT source_embedding records
+    2. Detect content type from file path or content
+    3. Stream chunks from the appropriate splitter, sized by the embedding
+       model's chunking config, EMBED_WINDOW_SIZE at a time
+    4. Per window, generate embeddings in one API call and bulk INSERT them
+       under the source's write lock, tagged with this job's attempt ID
+    5. Once all windows are in, DELETE the chunks of other attempts - or, if
+       a newer embed_source job for the source has started meanwhile, this
+       job's own chunks (migration 18)
+    6. If an embedding model migration is active, write shadow chunks too
+
+    Only one window of chunks and embeddings is held at a time, so memory
+    does not grow with the size of the document.
 
     Retry Strategy:
     - Retries up to 5 times for transient failures (RuntimeError, ConnectionError, TimeoutError)
@@ -314,6 +481,18 @@ async def embed_source_command(input_data: EmbedSourceInput) -> EmbedSourceOutpu
     try:
         logger.info(f"Starting embedding for source: {input_data.source_id}")
 
+        # Become the source's current attempt before loading it, so the current
+        # attempt has always read the newest text
+        source_ref = ensure_record_id(input_data.source_id)
+        attempt = uuid.uuid4().hex
+        await repo_query(
+            """
+            UPSERT type::thing("source_embedding_attempt", <string> $source_id)
+            SET source = $source_id, attempt = $attempt
+            """,
+            {"source_id": source_ref, "attempt": attempt},
+        )
+
         # 1. Load source
         source = await Source.get(input_data.source_id)
         if not source:
@@ -322,58 +501,103 @@ async def embed_source_command(input_data: EmbedSourceInput) -> EmbedSourceOutpu
         if not source.full_text or not source.full_text.strip():
             raise ValueError(f"Source '{input_data.source_id}' has no text to embed")
 
-        # 2. DELETE existing embeddings (idempotency)
-        logger.debug(f"Deleting existing embeddings for source {input_data.source_id}")
-        await repo_query(
-            "DELETE source_embedding WHERE source = $source_id",
-            {"source_id": ensure_record_id(input_data.source_id)},
-        )
-
-        # 3. Detect content type from file path if available
+        # 2. Detect content type from file path if available
         file_path = source.asset.file_path if source.asset else None
-        content_type = detect_content_type(source.full_text, file_path)
+        sample = source.full_text[:STREAM_SECTION_SIZE]
+        content_type = await run_offloaded(
+            detect_content_type, sample, file_path, size=len(sample)
+        )
         logger.debug(f"Detected content type: {content_type.value}")
 
-        # 4. Chunk text using appropriate splitter
-        chunks = chunk_text(source.full_text, content_type=content_type)
-        total_chunks = len(chunks)
-
-        # Log chunk statistics for debugging
-        chunk_sizes = [len(c) for c in chunks]
-        logger.info(
-            f"Created {total_chunks} chunks for source {input_data.source_id} "
-            f"(sizes: min={min(chunk_sizes) if chunk_sizes else 0}, "
-            f"max={max(chunk_sizes) if chunk_sizes else 0}, "
-            f"avg={sum(chunk_sizes)//len(chunk_sizes) if chunk_sizes else 0} chars)"
+        # The old chunks stay searchable until the new set is complete; new
+        # chunks are numbered after them so orders stay distinct meanwhile
+        latest = await repo_query(
+            """
+            SELECT order FROM source_embedding WHERE source = $source_id
+            ORDER BY order DESC LIMIT 1
+            """,
+            {"source_id": source_ref},
         )
+        first_order = latest[0]["order"] + 1 if latest else 0
+
+        # 3-4. Stream chunks, embed and insert them one window at a time
+        total_chunks = 0
+        total_chars = 0
+        max_chunk = 0
+        config = await get_chunking_config()
+        chunk_stream = aiter_chunks(
+            source.full_text, content_type=content_type, config=config
+        )
+        async for window in _iter_windows(chunk_stream):
+            records = await _embed_chunk_records(
+                input_data.source_id,
+                window,
+                first_order + total_chunks,
+                attempt=attempt,
+            )
+            async with record_write_lock(input_data.source_id):
+                await repo_insert("source_embedding", records)
+            total_chunks += len(window)
+            total_chars += sum(len(c) for c in window)
+            max_chunk = max(max_chunk, *(len(c) for c in window))
+            logger.debug(
+                f"Inserted {total_chunks} source_embedding records "
+                f"for source {input_data.source_id}"
+            )
 
         if total_chunks == 0:
             raise ValueError("No chunks created after splitting text")
 
-        # 5. Generate embeddings for all chunks in single API call
-        logger.debug(f"Generating embeddings for {total_chunks} chunks")
-        embeddings = await generate_embeddings(chunks)
+        logger.info(
+            f"Created {total_chunks} chunks for source {input_data.source_id} "
+            f"(sizes: max={max_chunk}, avg={total_chars // total_chunks} chars)"
+        )
 
-        # Verify we got embeddings for all chunks
-        if len(embeddings) != len(chunks):
-            raise ValueError(
-                f"Embedding count mismatch: got {len(embeddings)} embeddings "
-                f"for {len(chunks)} chunks"
+        # 5. Keep exactly one attempt's chunks. The check and the delete are a
+        # single statement (one transaction), so a job starting meanwhile
+        # cannot interleave
+        async with record_write_lock(input_data.source_id):
+            logger.debug(
+                f"Deleting previous embeddings for source {input_data.source_id}"
             )
+            current = await repo_query(
+                """
+                IF type::thing("source_embedding_attempt", <string> $source_id).attempt
+                    = $attempt {
+                    DELETE source_embedding
+                        WHERE source = $source_id AND attempt != $attempt;
+                    RETURN true;
+                } ELSE {
+                    DELETE source_embedding
+                        WHERE source = $source_id AND attempt = $attempt;
+                    RETURN false;
+                };
+                """,
+                {"source_id": source_ref, "attempt": attempt},
+            )
+        if current is False:
+            logger.info(
+                f"A newer embedding job for source {input_data.source_id} started "
+                "meanwhile; dropped this job's chunks"
+            )
+            total_chunks = 0
 
-        # 6. Bulk INSERT source_embedding records
-        records = [
-            {
-                "source": ensure_record_id(input_data.source_id),
-                "order": idx,
-                "content": chunk,
-                "embedding": embedding,
-            }
-            for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings))
-        ]
-
-        logger.debug(f"Inserting {len(records)} source_embedding records")
-        await repo_insert("source_embedding", records)
+        # 6. Mirror chunks into shadow storage while an embedding model migration
+        # runs (left to the newer job if this one was superseded)
+        shadow_model = await get_shadow_target_model() if total_chunks else None
+        if shadow_model:
+            try:
+                await write_source_shadow_embeddings(
+                    input_data.source_id,
+                    source.full_text,
+                    shadow_model,
+                    content_type=content_type,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Shadow embedding failed for source {input_data.source_id}: {e}. "
+                    "The shadow backfill will pick it up."
+                )
 
         processing_time = time.time() - start_time
         logger.info(
@@ -388,15 +612,17 @@ async def embed_source_command(input_data: EmbedSourceInput) -> EmbedSourceOutpu
             processing_time=processing_time,
         )
 
-    except RuntimeError:
+    except RuntimeError as e:
         logger.debug(
             f"Transaction conflict for source {input_data.source_id} - will be retried"
         )
+        await record_retry("embed_source", e)
         raise
     except (ConnectionError, TimeoutError) as e:
         logger.debug(
             f"Network/timeout error for source {input_data.source_id} ({type(e).__name__}: {e}) - will be retried"
         )
+        await record_retry("embed_source", e)
         raise
     except Exception as e:
         processing_time = time.time() - start_time
@@ -551,10 +777,11 @@ async def rebuild_embeddings_command(
         logger.info(f"\nSubmitting {len(items['sources'])} source embedding jobs...")
         for idx, source_id in enumerate(items["sources"], 1):
             try:
-                submit_command(
+                await submit_coalesced(
                     "open_notebook",
                     "embed_source",
                     {"source_id": source_id},
+                    lane="bulk",
                 )
                 sources_submitted += 1
 
@@ -571,10 +798,11 @@ async def rebuild_embeddings_command(
         logger.info(f"\nSubmitting {len(items['notes'])} note embedding jobs...")
         for idx, note_id in enumerate(items["notes"], 1):
             try:
-                submit_command(
+                await submit_coalesced(
                     "open_notebook",
                     "embed_note",
                     {"note_id": note_id},
+                    lane="bulk",
                 )
                 notes_submitted += 1
 
@@ -591,10 +819,11 @@ async def rebuild_embeddings_command(
         logger.info(f"\nSubmitting {len(items['insights'])} insight embedding jobs...")
         for idx, insight_id in enumerate(items["insights"], 1):
             try:
-                submit_command(
+                await submit_coalesced(
                     "open_notebook",
                     "embed_insight",
                     {"insight_id": insight_id},
+                    lane="bulk",
                 )
                 insights_submitted += 1
 
@@ -645,3 +874,238 @@ async def rebuild_embeddings_command(
             processing_time=processing_time,
             error_message=str(e),
         )
+
+
+async def _backfill_shadow_batch(
+    table: str, target_model: str, batch_size: int, skip: List[str]
+) -> Dict[str, List[str]]:
+    """
+    Shadow-embed one batch of notes or insights that still lack a shadow vector.
+
+    Short texts are embedded together in a single API call; long texts go
+    through generate_embedding() for chunking and mean pooling.
+
+    Returns:
+        Dict with 'done' and 'failed' lists of record IDs (both empty when
+        nothing is left to backfill)
+    """
+    rows = await repo_query(
+        f"""
+        SELECT id, content FROM {table}
+        WHERE embedding != none AND array::len(embedding) > 0
+            AND embedding_shadow = none AND id NOT IN $skip
+        LIMIT $limit
+        """,
+        {"skip": [ensure_record_id(i) for i in skip], "limit": batch_size},
+    )
+    outcome: Dict[str, List[str]] = {"done": [], "failed": []}
+    if not rows:
+        return outcome
+
+    updates = []
+    short_rows = []
+    for row in rows:
+        content = (row.get("content") or "").strip()
+        if not content:
+            outcome["failed"].append(str(row["id"]))
+        elif len(content) <= CHUNK_SIZE:
+            short_rows.append((str(row["id"]), content))
+        else:
+            try:
+                embedding = await generate_embedding(
+                    content, content_type=ContentType.MARKDOWN, model_id=target_model
+                )
+                updates.append(
+                    {"id": ensure_record_id(row["id"]), "embedding": embedding}
+                )
+            except Exception as e:
+                logger.warning(f"Shadow embedding failed for {row['id']}: {e}")
+                outcome["failed"].append(str(row["id"]))
+
+    if short_rows:
+        try:
+            embeddings = await generate_embeddings(
+                [content for _, content in short_rows], model_id=target_model
+            )
+            updates.extend(
+                {"id": ensure_record_id(record_id), "embedding": embedding}
+                for (record_id, _), embedding in zip(short_rows, embeddings)
+            )
+        except Exception as e:
+            logger.warning(f"Shadow embedding failed for a {table} batch: {e}")
+            outcome["failed"].extend(record_id for record_id, _ in short_rows)
+
+    if updates:
+        await repo_query(
+            "FOR $row IN $rows { UPDATE $row.id SET embedding_shadow = $row.embedding; };",
+            {"rows": updates},
+        )
+        outcome["done"].extend(str(update["id"]) for update in updates)
+
+    return outcome
+
+
+async def _backfill_shadow_sources(
+    target_model: str, batch_size: int, skip: List[str]
+) -> Dict[str, List[str]]:
+    """Shadow-embed one batch of embedded sources that have no shadow chunks yet."""
+    result = await repo_query(
+        """
+        RETURN array::slice(
+            array::complement(
+                array::complement(
+                    array::distinct(SELECT VALUE source FROM source_embedding),
+                    array::distinct(SELECT VALUE source FROM source_embedding_shadow)
+                ),
+                $skip
+            ),
+            0,
+            $limit
+        )
+        """,
+        {"skip": [ensure_record_id(i) for i in skip], "limit": batch_size},
+    )
+    outcome: Dict[str, List[str]] = {"done": [], "failed": []}
+
+    for source_id in [str(item) for item in result or []]:
+        try:
+            source = await Source.get(source_id)
+            if not source.full_text or not source.full_text.strip():
+                raise ValueError("Source has no text to embed")
+
+            file_path = source.asset.file_path if source.asset else None
+            sample = source.full_text[:STREAM_SECTION_SIZE]
+            content_type = await run_offloaded(
+                detect_content_type, sample, file_path, size=len(sample)
+            )
+            await write_source_shadow_embeddings(
+                source_id, source.full_text, target_model, content_type=content_type
+            )
+            outcome["done"].append(source_id)
+        except Exception as e:
+            logger.warning(f"Shadow embedding failed for source {source_id}: {e}")
+            outcome["failed"].append(source_id)
+
+    return outcome
+
+
+@command("shadow_reindex_embeddings", app="open_notebook", retry=None)
+async def shadow_reindex_embeddings_command(
+    input_data: ShadowReindexInput,
+) -> ShadowReindexOutput:
+    """
+    Backfill shadow embeddings for an embedding model switch without downtime.
+
+    Walks notes, insights and sources in small batches, writing vectors from
+    the target model into shadow storage while search keeps using the live
+    vectors. New content is covered by the embed_* commands, which write
+    shadow vectors as well while the migration is active.
+
+    Throttling:
+    - Processes batch_size items at a time and sleeps batch_delay seconds
+      between batches, leaving room for interactive embed_* jobs
+    - Stops early if the migration is cancelled or retargeted
+
+    When coverage reaches 100% the migration is marked "ready" and, if
+    auto_cutover is set, promoted atomically via cutover_shadow_embeddings().
+
+    Retry Strategy:
+    - Retries disabled (retry=None); the command is resumable, items that
+      already have shadow vectors are skipped on the next run
+    """
+    start_time = time.time()
+    counts = {"note": 0, "source_insight": 0, "source": 0}
+    failed: List[str] = []
+
+    try:
+        logger.info(
+            f"Starting shadow re-index with model {input_data.target_model} "
+            f"(batch_size={input_data.batch_size}, batch_delay={input_data.batch_delay}s)"
+        )
+
+        for table in ("note", "source_insight", "source"):
+            while True:
+                migration = await EmbeddingMigration.get_instance()
+                if (
+                    not migration.is_active
+                    or migration.target_model != input_data.target_model
+                ):
+                    raise InterruptedError("Embedding model migration was cancelled")
+
+                if table == "source":
+                    outcome = await _backfill_shadow_sources(
+                        input_data.target_model, input_data.batch_size, failed
+                    )
+                else:
+                    outcome = await _backfill_shadow_batch(
+                        table, input_data.target_model, input_data.batch_size, failed
+                    )
+
+                if not outcome["done"] and not outcome["failed"]:
+                    break
+
+                counts[table] += len(outcome["done"])
+                failed.extend(outcome["failed"])
+                logger.info(
+                    f"  Shadow progress: {counts[table]} {table} records embedded "
+                    f"({len(failed)} failed so far)"
+                )
+
+                if input_data.batch_delay > 0:
+                    await asyncio.sleep(input_data.batch_delay)
+
+        coverage = await get_shadow_coverage()
+        cut_over = False
+
+        migration = await EmbeddingMigration.get_instance()
+        if coverage["done"] >= coverage["total"]:
+            await migration.patch({"status": "ready", "error_message": None})
+            if input_data.auto_cutover:
+                await cutover_shadow_embeddings()
+                cut_over = True
+        elif failed:
+            await migration.patch(
+                {"error_message": f"{len(failed)} items could not be shadow-embedded"}
+            )
+
+        processing_time = time.time() - start_time
+        logger.info(
+            f"Shadow re-index finished in {processing_time:.2f}s: "
+            f"coverage {coverage['percentage']}%, cut_over={cut_over}"
+        )
+
+        return ShadowReindexOutput(
+            success=True,
+            target_model=input_data.target_model,
+            notes_processed=counts["note"],
+            insights_processed=counts["source_insight"],
+            sources_processed=counts["source"],
+            failed_items=len(failed),
+            coverage=coverage["percentage"],
+            cut_over=cut_over,
+            processing_time=processing_time,
+        )
+
+    except Exception as e:
+        processing_time = time.time() - start_time
+        logger.error(f"Shadow re-index failed: {e}")
+        logger.exception(e)
+
+        if not isinstance(e, InterruptedError):
+            try:
+                migration = await EmbeddingMigration.get_instance()
+                if migration.target_model == input_data.target_model:
+                    await migration.patch({"status": "failed", "error_message": str(e)})
+            except Exception as state_error:
+                logger.error(f"Failed to record shadow re-index failure: {state_error}")
+
+        return ShadowReindexOutput(
+            success=False,
+            target_model=input_data.target_model,
+            notes_processed=counts["note"],
+            insights_processed=counts["source_insight"],
+            sources_processed=counts["source"],
+            failed_items=len(failed),
+            processing_time=processing_time,
+            error_message=str(e),
+        )
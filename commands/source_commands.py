@@ -5,7 +5,9 @@ from loguru import logger
 from pydantic import BaseModel
 from surreal_commands import CommandInput, CommandOutput, command
 
+from open_notebook.database.command_queue import record_retry
 from open_notebook.database.repository import ensure_record_id
+from open_notebook.database.write_lock import record_write_lock
 from open_notebook.domain.notebook import Source
 from open_notebook.domain.transformation import Transformation
 
@@ -92,7 +94,8 @@ async def process_source_command(
             if input_data.execution_context
             else None
         )
-        await source.save()
+        async with record_write_lock(input_data.source_id):
+            await source.save()
 
         logger.info(f"Updated source {source.id} with command reference")
 
@@ -138,6 +141,7 @@ async def process_source_command(
     except RuntimeError as e:
         # Transaction conflicts should be retried by surreal-commands
         logger.debug(f"Transaction conflict, will retry: {e}")
+        await record_retry("process_source", e)
         raise
 
     except Exception as e:
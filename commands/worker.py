@@ -0,0 +1,160 @@
+"""
+Lane-aware worker for the Open Notebook command queue.
+
+Drop-in replacement for `surreal-commands-worker --import-modules commands`.
+The stock worker starts commands in arrival order, so a single interactive
+job (embedding the note a user just wrote) waits behind every job of a bulk
+fan-out queued before it. This worker keeps one FIFO per priority lane and
+always serves the interactive lane first, except that a bulk job that has
+been waiting longer than COMMAND_LANE_MAX_WAIT seconds goes next, so bulk
+work keeps making progress under sustained interactive load.
+
+Execution itself is delegated to surreal-commands (status updates, retries,
+results), exactly as in the stock worker.
+
+Usage:
+    uv run python -m commands.worker [--max-tasks 5] [--debug]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from loguru import logger
+from surreal_commands import command_service, registry
+
+from open_notebook.database.command_queue import (
+    LANES,
+    get_lane_max_wait,
+    lane_of,
+)
+from open_notebook.database.repository import db_connection
+from open_notebook.utils.offload import loop_lag_monitor
+
+DEFAULT_MAX_TASKS = 5
+
+
+class LaneScheduler:
+    """Pending commands per lane, dequeued by priority with starvation protection."""
+
+    def __init__(self, max_wait: float):
+        self.max_wait = max_wait
+        # command id -> (enqueued_at, command), in arrival order
+        self._lanes: Dict[str, OrderedDict] = {lane: OrderedDict() for lane in LANES}
+        self._available = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._lanes.values())
+
+    async def put(self, cmd: Dict[str, Any]) -> None:
+        """Add a new command, or move an already pending one to its current lane."""
+        cmd_id = str(cmd["id"])
+        lane = lane_of(cmd.get("context"))
+        async with self._available:
+            enqueued_at = time.monotonic()
+            for queue in self._lanes.values():
+                if cmd_id in queue:
+                    enqueued_at, _ = queue.pop(cmd_id)
+            self._lanes[lane][cmd_id] = (enqueued_at, cmd)
+            self._available.notify()
+
+    def discard(self, cmd_id: str) -> None:
+        """Forget a command that was started elsewhere or canceled."""
+        for queue in self._lanes.values():
+            queue.pop(cmd_id, None)
+
+    def _next_lane(self) -> str:
+        interactive, bulk = self._lanes["interactive"], self._lanes["bulk"]
+        if bulk:
+            oldest_bulk, _ = next(iter(bulk.values()))
+            if not interactive or time.monotonic() - oldest_bulk >= self.max_wait:
+                return "bulk"
+        return "interactive"
+
+    async def get(self) -> Dict[str, Any]:
+        async with self._available:
+            await self._available.wait_for(lambda: len(self) > 0)
+            queue = self._lanes[self._next_lane()]
+            _, (_, cmd) = queue.popitem(last=False)
+            return cmd
+
+
+async def _run(scheduler: LaneScheduler) -> None:
+    while True:
+        cmd = await scheduler.get()
+        command_full_name = f"{cmd['app']}.{cmd['name']}"
+        logger.info(
+            f"Starting {command_full_name} {cmd['id']} "
+            f"({lane_of(cmd.get('context'))} lane, {len(scheduler)} pending)"
+        )
+        try:
+            await command_service.execute_command(
+                cmd["id"], command_full_name, cmd["args"], cmd.get("context")
+            )
+        except Exception as e:
+            logger.error(f"Error executing {command_full_name} {cmd['id']}: {e}")
+
+
+async def listen_for_commands(max_tasks: int) -> None:
+    scheduler = LaneScheduler(get_lane_max_wait())
+    runners = [asyncio.create_task(_run(scheduler)) for _ in range(max_tasks)]
+    loop_lag_monitor.start()
+
+    async with db_connection() as db:
+        # Subscribe before reading the backlog so nothing submitted in between is lost
+        query_uuid = await db.live("command")
+        notifications = await db.subscribe_live(query_uuid)
+
+        existing = await db.query(
+            "SELECT * FROM command WHERE status = 'new' ORDER BY created ASC"
+        )
+        for cmd in existing or []:
+            if isinstance(cmd, dict):
+                await scheduler.put(cmd)
+        logger.info(f"Found {len(scheduler)} queued command(s)")
+
+        try:
+            async for cmd in notifications:
+                if not isinstance(cmd, dict) or "id" not in cmd:
+                    continue
+                if cmd.get("status", "new") == "new" and "app" in cmd:
+                    await scheduler.put(cmd)
+                else:
+                    scheduler.discard(str(cmd["id"]))
+        finally:
+            for runner in runners:
+                runner.cancel()
+            loop_lag_monitor.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--max-tasks",
+        "-m",
+        type=int,
+        default=DEFAULT_MAX_TASKS,
+        help="Maximum number of concurrent tasks",
+    )
+    parser.add_argument("--debug", "-d", action="store_true", help="Debug logging")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if args.debug else "INFO")
+
+    commands = registry.get_all_commands()
+    logger.info(
+        f"Starting lane-aware worker with {len(commands)} registered commands, "
+        f"up to {args.max_tasks} concurrent tasks"
+    )
+    try:
+        asyncio.run(listen_for_commands(args.max_tasks))
+    except KeyboardInterrupt:
+        logger.info("Worker stopped by user")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,56 @@ import {
   SourceDetailResponse, 
   SourceResponse,
   SourceStatusResponse,
+  SourceStatusBatchResponse,
   CreateSourceRequest, 
   UpdateSourceRequest 
 } from '@/lib/types/api'
 
+// Status lookups issued within this window are sent as one batch request,
+// so a page with many processing sources polls once instead of once per source
+const STATUS_BATCH_WINDOW_MS = 50
+
+type StatusWaiter = {
+  resolve: (status: SourceStatusResponse) => void
+  reject: (error: unknown) => void
+}
+
+let pendingStatusBatch: Map<string, StatusWaiter[]> | null = null
+
+async function flushStatusBatch() {
+  const batch = pendingStatusBatch
+  pendingStatusBatch = null
+  if (!batch) return
+
+  try {
+    const response = await apiClient.post<SourceStatusBatchResponse>('/sources/status', {
+      source_ids: Array.from(batch.keys()),
+    })
+    batch.forEach((waiters, id) => {
+      const status = response.data.sources[id]
+      waiters.forEach(({ resolve, reject }) =>
+        status ? resolve(status) : reject({ response: { status: 404 } })
+      )
+    })
+  } catch (error) {
+    batch.forEach((waiters) => waiters.forEach(({ reject }) => reject(error)))
+  }
+}
+
+function batchedStatus(id: string): Promise<SourceStatusResponse> {
+  // The batch response is keyed by full record IDs ("source:xxx")
+  const key = id.startsWith('source:') ? id : `source:${id}`
+  return new Promise((resolve, reject) => {
+    if (!pendingStatusBatch) {
+      pendingStatusBatch = new Map()
+      setTimeout(flushStatusBatch, STATUS_BATCH_WINDOW_MS)
+    }
+    const waiters = pendingStatusBatch.get(key) ?? []
+    waiters.push({ resolve, reject })
+    pendingStatusBatch.set(key, waiters)
+  })
+}
+
 export const sourcesApi = {
   list: async (params?: {
     notebook_id?: string
@@ -75,10 +121,7 @@ export const sourcesApi = {
     await apiClient.delete(`/sources/${id}`)
   },
 
-  status: async (id: string) => {
-    const response = await apiClient.get<SourceStatusResponse>(`/sources/${id}/status`)
-    return response.data
-  },
+  status: (id: string) => batchedStatus(id),
 
   upload: async (file: File, notebook_id: string) => {
     const formData = new FormData()
@@ -5,7 +5,7 @@ import { toast } from 'sonner'
 import { useTranslation } from '@/lib/hooks/use-translation'
 import { getApiErrorKey } from '@/lib/utils/error-handler'
 import { searchApi } from '@/lib/api/search'
-import { AskStreamEvent } from '@/lib/types/search'
+import { AskStageTimings, AskStreamEvent } from '@/lib/types/search'
 
 interface AskModels {
   strategy: string
@@ -23,6 +23,7 @@ interface AskState {
   strategy: StrategyData | null
   answers: string[]
   finalAnswer: string | null
+  timings: AskStageTimings | null
   error: string | null
 }
 
@@ -33,6 +34,7 @@ export function useAsk() {
     strategy: null,
     answers: [],
     finalAnswer: null,
+    timings: null,
     error: null
   })
 
@@ -54,6 +56,7 @@ export function useAsk() {
       strategy: null,
       answers: [],
       finalAnswer: null,
+      timings: null,
       error: null
     })
 
@@ -107,7 +110,14 @@ export function useAsk() {
                   ...prev,
                   answers: [...prev.answers, data.content || '']
                 }))
+              } else if (data.type === 'final_answer_token') {
+                // Tokens arrive while the final answer is generated
+                setState(prev => ({
+                  ...prev,
+                  finalAnswer: (prev.finalAnswer || '') + (data.content || '')
+                }))
               } else if (data.type === 'final_answer') {
+                // Replaces the streamed tokens with the cleaned-up answer
                 setState(prev => ({
                   ...prev,
                   finalAnswer: data.content || '',
@@ -116,6 +126,7 @@ export function useAsk() {
               } else if (data.type === 'complete') {
                 setState(prev => ({
                   ...prev,
+                  timings: data.timings || null,
                   isStreaming: false
                 }))
               } else if (data.type === 'error') {
@@ -155,6 +166,7 @@ export function useAsk() {
       strategy: null,
       answers: [],
       finalAnswer: null,
+      timings: null,
       error: null
     })
   }, [])
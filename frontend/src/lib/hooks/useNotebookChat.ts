@@ -230,14 +230,18 @@ export function useNotebookChat({ notebookId, sources, notes, contextSelections
 
       const reader = response.getReader()
       const decoder = new TextDecoder()
+      let buffer = ''
       let aiMessage: NotebookChatMessage | null = null
 
       while (true) {
         const { done, value } = await reader.read()
         if (done) break
 
-        const text = decoder.decode(value)
-        const lines = text.split('\n')
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+
+        // Keep the last incomplete line in buffer
+        buffer = lines.pop() || ''
 
         for (const line of lines) {
           if (line.startsWith('data: ')) {
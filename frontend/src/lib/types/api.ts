@@ -52,6 +52,11 @@ export interface SourceStatusResponse {
   command_id?: string
 }
 
+export interface SourceStatusBatchResponse {
+  sources: Record<string, SourceStatusResponse>
+  commands: Record<string, { command_id: string; status?: string; error_message?: string }>
+}
+
 export interface SettingsResponse {
   default_content_processing_engine_doc?: string
   default_content_processing_engine_url?: string
@@ -136,6 +141,8 @@ export interface BaseChatSession {
   created: string
   updated: string
   message_count?: number
+  last_message_preview?: string | null
+  last_activity?: string | null
   model_override?: string | null
 }
 
@@ -179,11 +186,14 @@ export interface SendMessageRequest {
 }
 
 export interface SourceChatStreamEvent {
-  type: 'user_message' | 'ai_message' | 'context_indicators' | 'complete' | 'error'
+  type: 'user_message' | 'ai_message' | 'context_indicators' | 'usage' | 'complete' | 'error'
   content?: string
   data?: unknown
   message?: string
   timestamp?: string
+  prompt_tokens?: number
+  completion_tokens?: number
+  cached_tokens?: number | null
 }
 
 // Notebook Chat Types
@@ -238,4 +248,5 @@ export interface BuildContextResponse {
   }
   token_count: number
   char_count: number
+  context_version?: string | null
 }
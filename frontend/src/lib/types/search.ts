@@ -1,7 +1,7 @@
 // Search types
 export interface SearchRequest {
   query: string
-  type: 'text' | 'vector'
+  type: 'text' | 'vector' | 'hybrid'
   limit: number
   search_sources: boolean
   search_notes: boolean
@@ -35,6 +35,7 @@ export interface AskRequest {
   strategy_model: string
   answer_model: string
   final_answer_model: string
+  search_type?: 'vector' | 'hybrid'
 }
 
 export interface AskResponse {
@@ -51,11 +52,31 @@ export interface StrategyData {
   }>
 }
 
+export interface AskStageTimings {
+  strategy_ms?: number
+  retrieval_ms?: number
+  answers_ms?: number
+  first_token_ms?: number
+  final_answer_ms?: number
+  total_ms?: number
+}
+
 export interface AskStreamEvent {
-  type: 'strategy' | 'answer' | 'final_answer' | 'complete' | 'error'
+  type:
+    | 'strategy'
+    | 'retrieval'
+    | 'answer'
+    | 'final_answer_token'
+    | 'final_answer'
+    | 'complete'
+    | 'error'
   reasoning?: string
   searches?: Array<{ term: string; instructions: string }>
+  results?: number[]
   content?: string
   final_answer?: string
   message?: string
+  duration_ms?: number
+  elapsed_ms?: number
+  timings?: AskStageTimings
 }
@@ -29,12 +29,14 @@ export interface ExecuteTransformationRequest {
   transformation_id: string
   input_text: string
   model_id: string
+  bypass_cache?: boolean
 }
 
 export interface ExecuteTransformationResponse {
   output: string
   transformation_id: string
   model_id: string
+  cached: boolean
 }
 
 export interface DefaultPrompt {
@@ -1,4 +1,8 @@
-from typing import ClassVar, Dict, Optional, Union
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
 from esperanto import (
     AIFactory,
@@ -76,20 +80,208 @@ class DefaultModels(RecordModel):
         return instance
 
 
+# Maximum number of warm model instances kept per process
+MODEL_REGISTRY_MAX_SIZE = 64
+
+RegistryKey = Tuple[str, str, str, str, str, str]
+
+
+@dataclass
+class _RegistryEntry:
+    """A warm model instance and its cached LangChain wrapper."""
+
+    model_id: str
+    provider: str
+    updated: str
+    instance: Any
+    langchain: Any = None
+    hits: int = 0
+    created: float = field(default_factory=time.time)
+
+
+def _httpx_pool_stats(client: Any) -> Optional[Dict[str, Any]]:
+    """Best-effort connection pool introspection for an httpx client."""
+    if client is None:
+        return None
+    transport = getattr(client, "_transport", None)
+    pool = getattr(transport, "_pool", None)
+    connections = list(getattr(pool, "connections", None) or [])
+
+    def _check(conn: Any, method: str) -> bool:
+        try:
+            return bool(getattr(conn, method)())
+        except Exception:
+            return False
+
+    return {
+        "closed": bool(getattr(client, "is_closed", False)),
+        "connections": len(connections),
+        "idle": sum(1 for conn in connections if _check(conn, "is_idle")),
+        "available": sum(1 for conn in connections if _check(conn, "is_available")),
+    }
+
+
 class ModelManager:
+    """
+    Resolves model IDs to provider model instances.
+
+    Instances are kept in a per-process registry keyed by (model id, name,
+    provider, type, updated, config), so repeated chat turns, transformations
+    and embeddings reuse the same provider clients and their HTTP connection
+    pools (keep-alive, TLS sessions) instead of rebuilding them per call.
+
+    The model record is read on every lookup, so an edit made in any process
+    (which changes its updated timestamp) or a deletion replaces or drops the
+    cached instances in the API and worker processes alike.
+    """
+
     def __init__(self):
-        pass  # No caching needed
+        self._registry: "OrderedDict[RegistryKey, _RegistryEntry]" = OrderedDict()
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _registry_key(model: "Model", kwargs: Dict[str, Any]) -> RegistryKey:
+        config = json.dumps(kwargs, sort_keys=True, default=str)
+        return (
+            str(model.id),
+            model.name,
+            model.provider,
+            model.type,
+            str(model.updated),
+            config,
+        )
+
+    def evict(self, model_id: Optional[str] = None) -> int:
+        """
+        Drop warm instances so the next request rebuilds them.
+
+        Args:
+            model_id: Only evict instances of this model. Evicts everything if omitted.
+
+        Returns:
+            Number of evicted instances
+        """
+        keys = [
+            key
+            for key, entry in self._registry.items()
+            if model_id is None or entry.model_id == str(model_id)
+        ]
+        for key in keys:
+            del self._registry[key]
+        self._evictions += len(keys)
+        if keys:
+            logger.debug(f"Evicted {len(keys)} cached model instance(s)")
+        return len(keys)
+
+    def provider_of(self, model: Any) -> Optional[str]:
+        """Configured provider name of a registry instance, if known."""
+        for entry in self._registry.values():
+            if entry.instance is model:
+                return entry.provider
+        return None
+
+    def to_langchain(self, model: LanguageModel) -> Any:
+        """Return the LangChain wrapper of a model, reusing it for registry instances."""
+        for entry in self._registry.values():
+            if entry.instance is model:
+                if entry.langchain is None:
+                    entry.langchain = model.to_langchain()
+                return entry.langchain
+        return model.to_langchain()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Registry and per-provider HTTP connection pool statistics."""
+        providers: Dict[str, Dict[str, Any]] = {}
+        instances: List[Dict[str, Any]] = []
+
+        for entry in self._registry.values():
+            pools = {}
+            for label, owner, attr in (
+                ("async_client", entry.instance, "async_client"),
+                ("client", entry.instance, "client"),
+                ("langchain_async_client", entry.langchain, "http_async_client"),
+                ("langchain_client", entry.langchain, "http_client"),
+            ):
+                stats = _httpx_pool_stats(getattr(owner, attr, None))
+                if stats:
+                    pools[label] = stats
+
+            provider = providers.setdefault(
+                entry.provider,
+                {"instances": 0, "hits": 0, "connections": 0, "idle": 0},
+            )
+            provider["instances"] += 1
+            provider["hits"] += entry.hits
+            for stats in pools.values():
+                provider["connections"] += stats["connections"]
+                provider["idle"] += stats["idle"]
+
+            instances.append(
+                {
+                    "model_id": entry.model_id,
+                    "provider": entry.provider,
+                    "hits": entry.hits,
+                    "age_seconds": round(time.time() - entry.created, 1),
+                    "langchain_cached": entry.langchain is not None,
+                    "pools": pools,
+                }
+            )
+
+        return {
+            "size": len(self._registry),
+            "max_size": MODEL_REGISTRY_MAX_SIZE,
+            "hits": sum(entry.hits for entry in self._registry.values()),
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "providers": providers,
+            "instances": instances,
+        }
 
     async def get_model(self, model_id: str, **kwargs) -> Optional[ModelType]:
-        """Get a model by ID. Esperanto will cache the actual model instance."""
+        """Get a model by ID, reusing a warm instance when one exists."""
         if not model_id:
             return None
 
         try:
             model: Model = await Model.get(model_id)
         except Exception:
+            # Deleted (possibly by another process): drop its warm instances
+            self.evict(model_id)
             raise ValueError(f"Model with ID {model_id} not found")
 
+        key = self._registry_key(model, kwargs)
+        entry = self._registry.get(key)
+        if entry is not None:
+            entry.hits += 1
+            self._registry.move_to_end(key)
+            return entry.instance
+
+        # Instances built from an older version of the record are never hit again
+        updated = str(model.updated)
+        for stale in [
+            k
+            for k, e in self._registry.items()
+            if e.model_id == str(model.id) and e.updated != updated
+        ]:
+            del self._registry[stale]
+            self._evictions += 1
+
+        instance = self._create_model(model, **kwargs)
+        self._misses += 1
+        self._registry[key] = _RegistryEntry(
+            model_id=str(model.id),
+            provider=model.provider,
+            updated=updated,
+            instance=instance,
+        )
+        while len(self._registry) > MODEL_REGISTRY_MAX_SIZE:
+            self._registry.popitem(last=False)
+            self._evictions += 1
+        return instance
+
+    def _create_model(self, model: "Model", **kwargs) -> ModelType:
+        """Build a new provider model instance through Esperanto."""
         if not model.type or model.type not in [
             "language",
             "embedding",
@@ -120,7 +312,7 @@ class ModelManager:
         else:
             provider_config = kwargs
 
-        # Create model based on type (Esperanto will cache the instance)
+        # Create model based on type
         if model.type == "language":
             return AIFactory.create_language(
                 model_name=model.name,
@@ -1,25 +1,34 @@
+from typing import Optional
+
 from esperanto import LanguageModel
 from langchain_core.language_models.chat_models import BaseChatModel
 from loguru import logger
 
 from open_notebook.ai.models import model_manager
-from open_notebook.utils import token_count
+from open_notebook.ai.rate_limit import acquire_for_model
+from open_notebook.utils import atoken_count
+
+LARGE_CONTEXT_TOKENS = 105_000
 
 
 async def provision_langchain_model(
-    content, model_id, default_type, **kwargs
+    content, model_id, default_type, tokens: Optional[int] = None, **kwargs
 ) -> BaseChatModel:
     """
     Returns the best model to use based on the context size and on whether there is a specific model being requested in Config.
     If context > 105_000, returns the large_context_model
     If model_id is specified in Config, returns that model
     Otherwise, returns the default model for the given type
+
+    Callers that already know the prompt's token count pass it as tokens, so the
+    content is not tokenized again.
     """
-    tokens = token_count(content)
+    if tokens is None:
+        tokens = await atoken_count(content)
     model = None
     selection_reason = ""
 
-    if tokens > 105_000:
+    if tokens > LARGE_CONTEXT_TOKENS:
         selection_reason = f"large_context (content has {tokens} tokens)"
         logger.debug(
             f"Using large context model because the content has {tokens} tokens"
@@ -57,4 +66,8 @@ async def provision_langchain_model(
             f"Please check that the model configured for '{default_type}' is a language model, not an embedding or speech model."
         )
 
-    return model.to_langchain()
+    # Queue behind the shared provider budget (input tokens + requested output)
+    await acquire_for_model(model, tokens + int(kwargs.get("max_tokens") or 0))
+
+    # Reuse the LangChain wrapper (and its HTTP clients) of warm instances
+    return model_manager.to_langchain(model)
@@ -0,0 +1,276 @@
+"""
+Shared rate limiting for LLM and embedding provider calls.
+
+Every provider call first takes capacity from a token bucket keyed by
+provider and model. Buckets enforce requests/minute and tokens/minute and
+live in small JSON state files under DATA_FOLDER, guarded by a file lock, so
+the API process and all worker processes on the host draw from the same
+budget. Callers that exceed the budget wait in line instead of failing with
+a provider 429 and falling back to command retries.
+
+Configuration (environment variables, unset = unlimited):
+- RATE_LIMIT_<PROVIDER>_RPM / RATE_LIMIT_<PROVIDER>_TPM: per-provider limits,
+  e.g. RATE_LIMIT_OPENAI_RPM=500 (provider name upper-cased, "-" becomes "_")
+- RATE_LIMITS: JSON with per-model overrides, keyed by "provider/model" or
+  "provider", e.g. {"openai/text-embedding-3-small": {"rpm": 3000, "tpm": 1000000}}
+- RATE_LIMIT_MAX_WAIT: optional cap in seconds on queue wait; after it the
+  call proceeds anyway and the provider's own limits apply
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from open_notebook.config import RATE_LIMIT_FOLDER
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Longest single sleep while waiting in line, so newly freed capacity is noticed quickly
+MAX_POLL_INTERVAL = 1.0
+
+
+@dataclass
+class RateLimit:
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm) or bool(self.tpm)
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid value for {name}: {value!r}")
+        return None
+
+
+def get_rate_limit(provider: str, model_name: str) -> RateLimit:
+    """Resolve the configured limit for a provider/model pair."""
+    overrides: Dict[str, Any] = {}
+    raw = os.environ.get("RATE_LIMITS")
+    if raw:
+        try:
+            overrides = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Ignoring invalid RATE_LIMITS JSON: {e}")
+
+    for key in (f"{provider}/{model_name}", provider):
+        if isinstance(overrides.get(key), dict):
+            return RateLimit(
+                rpm=overrides[key].get("rpm"), tpm=overrides[key].get("tpm")
+            )
+
+    env_name = re.sub(r"[^A-Z0-9]", "_", provider.upper())
+    return RateLimit(
+        rpm=_env_float(f"RATE_LIMIT_{env_name}_RPM"),
+        tpm=_env_float(f"RATE_LIMIT_{env_name}_TPM"),
+    )
+
+
+def _state_path(key: str) -> Path:
+    return Path(RATE_LIMIT_FOLDER) / f"{key}.json"
+
+
+def _refill(bucket: Dict[str, float], capacity: float, now: float) -> float:
+    """Refill a bucket for elapsed time and return its available amount."""
+    elapsed = max(0.0, now - bucket.get("updated", now))
+    available = min(
+        capacity, bucket.get("available", capacity) + elapsed * capacity / 60
+    )
+    bucket["available"] = available
+    bucket["updated"] = now
+    return available
+
+
+def _try_take(key: str, limit: RateLimit, tokens: int) -> float:
+    """
+    Take one request and `tokens` tokens from the bucket if available.
+
+    Runs under an exclusive file lock so concurrent processes see a
+    consistent bucket. Returns 0 on success, otherwise the number of seconds
+    until enough capacity will have been refilled.
+    """
+    path = _state_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "a+", encoding="utf-8") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            handle.seek(0)
+            raw = handle.read()
+            try:
+                state = json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                state = {}
+
+            now = time.time()
+            waits = []
+            needs: List[Tuple[str, float, float]] = []
+            if limit.rpm:
+                needs.append(("rpm", float(limit.rpm), 1.0))
+            if limit.tpm:
+                # A single call larger than the whole budget would never fit
+                needs.append(("tpm", float(limit.tpm), min(float(tokens), limit.tpm)))
+
+            for name, capacity, amount in needs:
+                bucket = state.setdefault(name, {})
+                available = _refill(bucket, capacity, now)
+                if available < amount:
+                    waits.append((amount - available) * 60 / capacity)
+
+            if not waits:
+                for name, _, amount in needs:
+                    state[name]["available"] -= amount
+
+            handle.seek(0)
+            handle.truncate()
+            json.dump(state, handle)
+            return max(waits) if waits else 0.0
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _record_wait(key: str, waited: float, queued: bool) -> None:
+    """Add a completed wait to the shared per-key statistics."""
+    path = _state_path(key)
+    with open(path, "a+", encoding="utf-8") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            handle.seek(0)
+            raw = handle.read()
+            try:
+                state = json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                state = {}
+
+            stats = state.setdefault(
+                "stats",
+                {"acquired": 0, "queued": 0, "total_wait": 0.0, "max_wait": 0.0},
+            )
+            stats["acquired"] += 1
+            if queued:
+                stats["queued"] += 1
+                stats["total_wait"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+                stats["last_wait"] = waited
+                stats["last_wait_at"] = time.time()
+
+            handle.seek(0)
+            handle.truncate()
+            json.dump(state, handle)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+# Callers currently waiting in this process, per key
+_waiting: Dict[str, int] = {}
+
+
+async def acquire(provider: str, model_name: str, tokens: int = 0) -> float:
+    """
+    Wait until the provider/model budget allows one more call.
+
+    Args:
+        provider: Provider name (e.g. "openai")
+        model_name: Model name (e.g. "gpt-4o-mini")
+        tokens: Estimated tokens the call will consume (input + requested output)
+
+    Returns:
+        Seconds spent waiting in line
+    """
+    limit = get_rate_limit(provider, model_name)
+    if not limit.enabled:
+        return 0.0
+
+    key = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{provider}__{model_name}")
+    max_wait = _env_float("RATE_LIMIT_MAX_WAIT")
+    start = time.monotonic()
+    queued = False
+
+    _waiting[key] = _waiting.get(key, 0) + 1
+    try:
+        while True:
+            wait = await asyncio.to_thread(_try_take, key, limit, tokens)
+            if wait <= 0:
+                break
+
+            waited = time.monotonic() - start
+            if max_wait is not None and waited >= max_wait:
+                logger.warning(
+                    f"Rate limit wait for {provider}/{model_name} exceeded "
+                    f"{max_wait}s, proceeding without capacity"
+                )
+                break
+            if not queued:
+                logger.debug(
+                    f"Rate limit reached for {provider}/{model_name}, "
+                    f"queued ({_waiting[key]} waiting in this process)"
+                )
+                queued = True
+            await asyncio.sleep(min(wait, MAX_POLL_INTERVAL))
+    finally:
+        _waiting[key] -= 1
+
+    waited = time.monotonic() - start
+    try:
+        await asyncio.to_thread(_record_wait, key, waited, queued)
+    except Exception as e:
+        logger.debug(f"Failed to record rate limit stats for {key}: {e}")
+    return waited
+
+
+async def acquire_for_model(model: Any, tokens: int = 0) -> float:
+    """acquire() for an Esperanto model instance."""
+    from open_notebook.ai.models import model_manager
+
+    # Prefer the configured provider name (e.g. "dashscope" rather than the
+    # "openai-compatible" implementation it runs on)
+    provider = model_manager.provider_of(model) or getattr(model, "provider", None)
+    if not isinstance(provider, str):
+        provider = type(model).__name__
+    model_name = getattr(model, "model_name", None) or "default"
+    return await acquire(str(provider), str(model_name), tokens)
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Shared limiter state and queue wait statistics for every known key."""
+    stats: Dict[str, Any] = {}
+    folder = Path(RATE_LIMIT_FOLDER)
+    if not folder.exists():
+        return stats
+
+    for path in sorted(folder.glob("*.json")):
+        try:
+            state = json.loads(path.read_text(encoding="utf-8") or "{}")
+        except (OSError, json.JSONDecodeError):
+            continue
+        key = path.stem
+        entry = dict(state.get("stats", {}))
+        if entry.get("queued"):
+            entry["avg_wait"] = round(entry["total_wait"] / entry["queued"], 3)
+        entry["waiting_in_process"] = _waiting.get(key, 0)
+        for bucket in ("rpm", "tpm"):
+            if bucket in state:
+                entry[f"{bucket}_available"] = round(state[bucket]["available"], 1)
+        stats[key] = entry
+    return stats
@@ -1,5 +1,7 @@
 import os
 
+from loguru import logger
+
 # ROOT DATA FOLDER
 DATA_FOLDER = "./data"
 
@@ -15,3 +17,24 @@ os.makedirs(UPLOADS_FOLDER, exist_ok=True)
 # TIKTOKEN CACHE FOLDER
 TIKTOKEN_CACHE_DIR = f"{DATA_FOLDER}/tiktoken-cache"
 os.makedirs(TIKTOKEN_CACHE_DIR, exist_ok=True)
+
+# RATE LIMIT STATE FOLDER (shared by API and worker processes)
+RATE_LIMIT_FOLDER = f"{DATA_FOLDER}/rate-limits"
+os.makedirs(RATE_LIMIT_FOLDER, exist_ok=True)
+
+
+def env_int(name: str, default: int, minimum: int = 0) -> int:
+    """
+    Integer setting from an environment variable.
+
+    Values below minimum are raised to it; values that are not integers fall
+    back to the default with a warning.
+    """
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return max(minimum, int(value))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name} value {value!r}")
+        return default
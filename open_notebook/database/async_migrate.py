@@ -106,6 +106,14 @@ class AsyncMigrationManager:
             AsyncMigration.from_file("open_notebook/database/migrations/8.surrealql"),
             AsyncMigration.from_file("open_notebook/database/migrations/9.surrealql"),
             AsyncMigration.from_file("open_notebook/database/migrations/10.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/11.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/12.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/13.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/14.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/15.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/16.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/17.surrealql"),
+            AsyncMigration.from_file("open_notebook/database/migrations/18.surrealql"),
         ]
         self.down_migrations = [
             AsyncMigration.from_file(
@@ -138,6 +146,30 @@ class AsyncMigrationManager:
             AsyncMigration.from_file(
                 "open_notebook/database/migrations/10_down.surrealql"
             ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/11_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/12_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/13_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/14_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/15_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/16_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/17_down.surrealql"
+            ),
+            AsyncMigration.from_file(
+                "open_notebook/database/migrations/18_down.surrealql"
+            ),
         ]
         self.runner = AsyncMigrationRunner(
             up_migrations=self.up_migrations,
@@ -0,0 +1,278 @@
+"""
+Coalesced command submission on top of the surreal-commands queue.
+
+Per-record jobs such as embed_note only need to run once for the latest
+state of the record: the command loads the record when it starts, not when
+it is submitted. submit_coalesced() therefore skips the submission when an
+identical job (same app, command and arguments) is still waiting in the
+queue, and returns the pending job's ID instead. Once a job is picked up by a
+worker its status becomes "running", so a save that happens during
+execution still queues exactly one follow-up job.
+
+The lookup and the submission are not one database statement (the command
+record is created by surreal-commands). They are serialized per coalescing
+key within a process, so concurrent saves in the API coalesce reliably, but
+two processes submitting the same job at the same moment can both enqueue
+it. Coalescing is therefore best-effort; a duplicate job only repeats
+idempotent work.
+
+Submissions and coalesced skips are counted per command in the
+command_stats table, shared by the API and worker processes.
+
+Every submission is tagged with a priority lane in its command context:
+"interactive" for work a user is waiting on, "bulk" for large fan-outs such
+as rebuild_embeddings. The Open Notebook worker (commands/worker.py) always
+dequeues interactive jobs first, unless the oldest bulk job has been waiting
+longer than COMMAND_LANE_MAX_WAIT seconds.
+"""
+
+import json
+import os
+from typing import Any, Dict, Literal, Optional
+
+from loguru import logger
+from surreal_commands import submit_command
+
+from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.database.write_lock import record_write_lock
+
+CommandLane = Literal["interactive", "bulk"]
+LANES = ("interactive", "bulk")
+DEFAULT_LANE: CommandLane = "interactive"
+
+# Seconds a bulk job may be passed over before it is served ahead of interactive work
+DEFAULT_LANE_MAX_WAIT = 300.0
+
+
+def get_lane_max_wait() -> float:
+    try:
+        return float(os.environ.get("COMMAND_LANE_MAX_WAIT", DEFAULT_LANE_MAX_WAIT))
+    except ValueError:
+        return DEFAULT_LANE_MAX_WAIT
+
+
+def lane_of(context: Optional[Dict[str, Any]]) -> CommandLane:
+    """Lane a command was submitted in (commands without one are interactive)."""
+    lane = (context or {}).get("lane")
+    return lane if lane in LANES else DEFAULT_LANE
+
+
+async def _increment_stats(command_name: str, **counters: int) -> None:
+    """Add to the shared per-command counters (submitted, coalesced, retries, conflicts)."""
+    try:
+        await repo_query(
+            """
+            UPSERT type::thing("command_stats", $name) SET
+                name = $name,
+                submitted = (submitted ?? 0) + $submitted,
+                coalesced = (coalesced ?? 0) + $coalesced,
+                retries = (retries ?? 0) + $retries,
+                conflicts = (conflicts ?? 0) + $conflicts,
+                updated = time::now();
+            """,
+            {
+                "name": command_name,
+                **{
+                    counter: counters.get(counter, 0)
+                    for counter in ("submitted", "coalesced", "retries", "conflicts")
+                },
+            },
+        )
+    except Exception as e:
+        logger.debug(f"Failed to record command stats for {command_name}: {e}")
+
+
+def is_transaction_conflict(error: Exception) -> bool:
+    """True for SurrealDB's retryable read/write conflict errors."""
+    return isinstance(error, RuntimeError) and "conflict" in str(error).lower()
+
+
+async def record_retry(command_name: str, error: Exception) -> None:
+    """Count a failed attempt that surreal-commands will retry."""
+    await _increment_stats(
+        command_name, retries=1, conflicts=int(is_transaction_conflict(error))
+    )
+
+
+async def find_pending_command(
+    app: str, command_name: str, args: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Return the queued (not yet started) command with the same arguments, if any."""
+    conditions = " AND ".join(f"args.{key} = $arg_{key}" for key in args)
+    result = await repo_query(
+        f"""
+        SELECT id, context.lane AS lane FROM command
+        WHERE status = "new" AND app = $app AND name = $name
+        {"AND " + conditions if conditions else ""}
+        ORDER BY created ASC LIMIT 1
+        """,
+        {
+            "app": app,
+            "name": command_name,
+            **{f"arg_{key}": value for key, value in args.items()},
+        },
+    )
+    return result[0] if result else None
+
+
+async def submit_coalesced(
+    app: str,
+    command_name: str,
+    args: Dict[str, Any],
+    lane: CommandLane = DEFAULT_LANE,
+) -> str:
+    """
+    Submit a command unless an identical one is still pending.
+
+    Args:
+        app: Application name (e.g. "open_notebook")
+        command_name: Command name (e.g. "embed_note")
+        args: Command arguments; all of them are part of the coalescing key
+        lane: Priority lane. An interactive request merged into a pending bulk
+            job promotes that job to the interactive lane.
+
+    Returns:
+        str: ID of the newly submitted command, or of the pending command the
+        request was merged into
+    """
+    key = f"{app}:{command_name}:{json.dumps(args, sort_keys=True, default=str)}"
+    async with record_write_lock(key):
+        try:
+            pending = await find_pending_command(app, command_name, args)
+        except Exception as e:
+            # The lookup is an optimization only - never block the submission on it
+            logger.warning(f"Pending command lookup failed for {command_name}: {e}")
+            pending = None
+
+        if pending:
+            pending_id = str(pending["id"])
+            logger.debug(
+                f"Coalesced {command_name} {args} into pending command {pending_id}"
+            )
+            if lane == "interactive" and pending.get("lane") == "bulk":
+                await repo_query(
+                    "UPDATE $id SET context.lane = $lane",
+                    {"id": ensure_record_id(pending_id), "lane": lane},
+                )
+            await _increment_stats(command_name, submitted=1, coalesced=1)
+            return pending_id
+
+        command_id = submit_command(app, command_name, args, context={"lane": lane})
+    await _increment_stats(command_name, submitted=1)
+    return str(command_id)
+
+
+async def get_queue_stats() -> Dict[str, Any]:
+    """Queue depth per command and status, plus submission and retry counters."""
+    result = await repo_query(
+        """
+        RETURN {
+            depth: (SELECT name, status, count() AS count FROM command
+                WHERE status IN ["new", "running"] GROUP BY name, status),
+            stats: (SELECT name, submitted, coalesced, retries, conflicts, updated
+                FROM command_stats)
+        }
+        """
+    )
+    # RETURN yields the object itself rather than a list of rows
+    row: Dict[str, Any] = (
+        result if isinstance(result, dict) else result[0] if result else {}
+    )
+
+    commands: Dict[str, Dict[str, Any]] = {}
+
+    def entry(name: str) -> Dict[str, Any]:
+        return commands.setdefault(
+            name,
+            {
+                "queued": 0,
+                "running": 0,
+                "submitted": 0,
+                "coalesced": 0,
+                "retries": 0,
+                "conflicts": 0,
+            },
+        )
+
+    for item in row.get("depth") or []:
+        key = "queued" if item.get("status") == "new" else "running"
+        entry(item["name"])[key] = item.get("count", 0)
+    for item in row.get("stats") or []:
+        stats = entry(item["name"])
+        for counter in ("submitted", "coalesced", "retries", "conflicts"):
+            stats[counter] = item.get(counter) or 0
+        stats["updated"] = item.get("updated")
+
+    return {
+        "commands": commands,
+        **{
+            f"total_{name}": sum(c[name] for c in commands.values())
+            for name in (
+                "queued",
+                "running",
+                "submitted",
+                "coalesced",
+                "retries",
+                "conflicts",
+            )
+        },
+    }
+
+
+async def get_lane_stats() -> Dict[str, Any]:
+    """
+    Per-lane queue depth and wait times.
+
+    queued/oldest_wait_ms describe jobs still waiting; started_last_hour,
+    avg_wait_ms and max_wait_ms cover jobs that left the queue in the last hour.
+    """
+    result = await repo_query(
+        """
+        RETURN {
+            queued: (SELECT lane, count() AS count, math::max(age_ms) AS oldest_wait_ms
+                FROM (SELECT context.lane ?? "interactive" AS lane,
+                    duration::millis(time::now() - created) AS age_ms
+                    FROM command WHERE status = "new" AND created != NONE)
+                GROUP BY lane),
+            started: (SELECT lane, count() AS count, math::mean(wait_ms) AS avg_wait_ms,
+                    math::max(wait_ms) AS max_wait_ms
+                FROM (SELECT context.lane ?? "interactive" AS lane,
+                    duration::millis(started - created) AS wait_ms
+                    FROM command WHERE started > time::now() - 1h AND created != NONE)
+                GROUP BY lane)
+        }
+        """
+    )
+    # RETURN yields the object itself rather than a list of rows
+    row: Dict[str, Any] = (
+        result if isinstance(result, dict) else result[0] if result else {}
+    )
+
+    lanes: Dict[str, Dict[str, Any]] = {}
+
+    def entry(name: str) -> Dict[str, Any]:
+        return lanes.setdefault(
+            name,
+            {
+                "queued": 0,
+                "oldest_wait_ms": 0,
+                "started_last_hour": 0,
+                "avg_wait_ms": None,
+                "max_wait_ms": None,
+            },
+        )
+
+    for name in LANES:
+        entry(name)
+    for item in row.get("queued") or []:
+        lane = entry(item["lane"])
+        lane["queued"] = item.get("count", 0)
+        lane["oldest_wait_ms"] = item.get("oldest_wait_ms") or 0
+    for item in row.get("started") or []:
+        lane = entry(item["lane"])
+        lane["started_last_hour"] = item.get("count", 0)
+        if item.get("avg_wait_ms") is not None:
+            lane["avg_wait_ms"] = round(item["avg_wait_ms"])
+        lane["max_wait_ms"] = item.get("max_wait_ms")
+
+    return {"lanes": lanes, "max_wait_seconds": get_lane_max_wait()}
@@ -0,0 +1,159 @@
+"""
+Persistent cache for transformation results.
+
+A transformation result depends only on the rendered transformation prompt,
+the input content and the model that ran it, so results are stored under a
+key derived from (prompt hash, content hash, model id). Re-ingested URLs,
+sources added to several notebooks, retries and demo corpora then reuse the
+earlier result instead of calling the LLM again.
+
+Concurrent requests for the same key in one process share a single in-flight
+call (singleflight). Entries expire after TRANSFORMATION_CACHE_TTL_DAYS and
+only the TRANSFORMATION_CACHE_MAX_ENTRIES most recently used are kept;
+TRANSFORMATION_CACHE_MAX_ENTRIES=0 disables the cache.
+"""
+
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from open_notebook.config import env_int
+from open_notebook.database.repository import repo_query
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 5000
+
+# Cache key -> in-flight computation shared by concurrent identical requests
+_inflight: Dict[str, "asyncio.Task[str]"] = {}
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(prompt: str, content: str, model_id: str) -> Tuple[str, str, str]:
+    """Return (key, prompt_hash, content_hash) for a transformation call."""
+    prompt_hash = _sha256(prompt)
+    content_hash = _sha256(content)
+    return (
+        _sha256(f"{prompt_hash}:{content_hash}:{model_id}"),
+        prompt_hash,
+        content_hash,
+    )
+
+
+async def _lookup(key: str, ttl_days: int) -> Optional[str]:
+    result = await repo_query(
+        """
+        UPDATE type::thing("transformation_cache", $key)
+        SET hits += 1, last_used = time::now()
+        WHERE created > time::now() - duration::from::days($ttl_days)
+        RETURN output
+        """,
+        {"key": key, "ttl_days": ttl_days},
+    )
+    return result[0].get("output") if result else None
+
+
+async def _store(
+    key: str,
+    prompt_hash: str,
+    content_hash: str,
+    model_id: str,
+    output: str,
+    ttl_days: int,
+    max_entries: int,
+) -> None:
+    await repo_query(
+        """
+        UPSERT type::thing("transformation_cache", $key) CONTENT {
+            prompt_hash: $prompt_hash,
+            content_hash: $content_hash,
+            model_id: $model_id,
+            output: $output,
+            hits: 0,
+            created: time::now(),
+            last_used: time::now()
+        };
+        DELETE transformation_cache
+            WHERE created < time::now() - duration::from::days($ttl_days);
+        DELETE transformation_cache WHERE id IN (
+            SELECT VALUE id FROM transformation_cache
+            ORDER BY last_used DESC START $max_entries
+        );
+        """,
+        {
+            "key": key,
+            "prompt_hash": prompt_hash,
+            "content_hash": content_hash,
+            "model_id": model_id,
+            "output": output,
+            "ttl_days": ttl_days,
+            "max_entries": max_entries,
+        },
+    )
+
+
+async def cached_transformation(
+    prompt: str,
+    content: str,
+    model_id: str,
+    compute: Callable[[], Awaitable[str]],
+    bypass_cache: bool = False,
+) -> Tuple[str, bool]:
+    """
+    Return the cached result for a transformation call, computing it if needed.
+
+    Args:
+        prompt: Rendered transformation system prompt
+        content: Input content
+        model_id: ID of the model that runs the transformation
+        compute: Coroutine factory that calls the model
+        bypass_cache: Always call the model; the fresh result replaces the
+            cached one
+
+    Returns:
+        Tuple[str, bool]: The output, and whether it came from the cache
+    """
+    max_entries = env_int("TRANSFORMATION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+    ttl_days = env_int("TRANSFORMATION_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)
+    if max_entries == 0:
+        return await compute(), False
+
+    key, prompt_hash, content_hash = cache_key(prompt, content, model_id)
+
+    if not bypass_cache:
+        try:
+            output = await _lookup(key, ttl_days)
+        except Exception as e:
+            # The cache is an optimization only - never fail the transformation on it
+            logger.warning(f"Transformation cache lookup failed: {e}")
+            output = None
+        if output is not None:
+            logger.debug(f"Transformation cache hit for {key[:12]} ({model_id})")
+            return output, True
+
+        pending = _inflight.get(key)
+        if pending is not None:
+            logger.debug(f"Joining in-flight transformation {key[:12]} ({model_id})")
+            return await asyncio.shield(pending), False
+
+    async def run() -> str:
+        output = await compute()
+        try:
+            await _store(
+                key, prompt_hash, content_hash, model_id, output, ttl_days, max_entries
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store transformation result in cache: {e}")
+        return output
+
+    task = asyncio.ensure_future(run())
+    _inflight[key] = task
+    task.add_done_callback(
+        lambda done: _inflight.pop(key, None) if _inflight.get(key) is done else None
+    )
+    # Shielded so a canceled caller does not cancel the call others are waiting on
+    return await asyncio.shield(task), False
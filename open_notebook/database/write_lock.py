@@ -0,0 +1,36 @@
+"""
+Per-record write serialization within a process.
+
+SurrealDB v2 aborts concurrent transactions that touch the same records with
+a retryable conflict error. Source processing fans out into several writers
+for the same source (save_source, parallel transformations adding insights,
+embed_insight/embed_source jobs), which used to surface as long retry storms.
+Holding record_write_lock(source_id) around those writes makes them run one
+at a time per source inside a worker process. The lock is an asyncio lock:
+writers in different worker processes are not coordinated, and their
+conflicts are still handled by the commands' retries.
+
+Only the database writes should be wrapped - never model calls - so the
+expensive parts of the pipeline keep running concurrently.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Union
+
+from surrealdb import RecordID
+
+# Locks are dropped automatically once no writer holds or waits for them
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+@asynccontextmanager
+async def record_write_lock(key: Union[str, RecordID]) -> AsyncIterator[None]:
+    """Serialize writes keyed by a record ID (e.g. "source:abc") in this process."""
+    lock = _locks.get(str(key))
+    if lock is None:
+        lock = asyncio.Lock()
+        _locks[str(key)] = lock
+    async with lock:
+        yield
@@ -0,0 +1,228 @@
+from typing import Any, ClassVar, Dict, List, Literal, Optional
+
+from loguru import logger
+
+from open_notebook.database.command_queue import submit_coalesced
+from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.domain.base import RecordModel
+from open_notebook.exceptions import InvalidInputError
+
+EmbeddingMigrationStatus = Literal["idle", "backfilling", "ready", "failed"]
+
+# Embed command -> its item ID argument
+_ARG_NAMES = {
+    "embed_note": "note_id",
+    "embed_insight": "insight_id",
+    "embed_source": "source_id",
+}
+
+
+class EmbeddingMigration(RecordModel):
+    """
+    State of an in-progress switch to a new embedding model.
+
+    While status is "backfilling" or "ready", every embed_* command also writes
+    vectors produced by target_model into the shadow storage (note.embedding_shadow,
+    source_insight.embedding_shadow and the source_embedding_shadow table). Search
+    keeps using the live vectors until cutover_shadow_embeddings() promotes them.
+    """
+
+    record_id: ClassVar[str] = "open_notebook:embedding_migration"
+    status: EmbeddingMigrationStatus = "idle"
+    target_model: Optional[str] = None
+    command_id: Optional[str] = None
+    error_message: Optional[str] = None
+
+    @classmethod
+    async def get_instance(cls) -> "EmbeddingMigration":
+        """Always fetch fresh state from database (shared by API and worker processes)"""
+        result = await repo_query(
+            "SELECT * FROM ONLY $record_id",
+            {"record_id": ensure_record_id(cls.record_id)},
+        )
+
+        data: Dict[str, Any] = {}
+        if isinstance(result, list) and result:
+            data = result[0]
+        elif isinstance(result, dict):
+            data = result
+
+        # Create new instance with fresh data (bypass singleton cache)
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "__dict__", {})
+        super(RecordModel, instance).__init__(**data)
+        return instance
+
+    @property
+    def is_active(self) -> bool:
+        """True while shadow vectors should be written alongside live ones."""
+        return self.status in ("backfilling", "ready") and bool(self.target_model)
+
+
+async def get_shadow_target_model() -> Optional[str]:
+    """Return the migration target model ID if shadow writes are active."""
+    migration = await EmbeddingMigration.get_instance()
+    return migration.target_model if migration.is_active else None
+
+
+async def get_shadow_coverage() -> Dict[str, Any]:
+    """
+    Count how many embedded items already have a shadow vector.
+
+    Only items that currently have live embeddings are counted, so the
+    coverage reaches 100% exactly when cutover would not drop any vectors.
+    """
+    result = await repo_query(
+        """
+        RETURN {
+            notes_total: array::len(SELECT VALUE id FROM note WHERE embedding != none AND array::len(embedding) > 0),
+            notes_done: array::len(SELECT VALUE id FROM note WHERE embedding != none AND array::len(embedding) > 0 AND embedding_shadow != none),
+            insights_total: array::len(SELECT VALUE id FROM source_insight WHERE embedding != none AND array::len(embedding) > 0),
+            insights_done: array::len(SELECT VALUE id FROM source_insight WHERE embedding != none AND array::len(embedding) > 0 AND embedding_shadow != none),
+            sources_total: array::len(array::distinct(SELECT VALUE source FROM source_embedding)),
+            sources_done: array::len(array::distinct(SELECT VALUE source FROM source_embedding_shadow))
+        }
+        """
+    )
+    # RETURN yields the object itself rather than a list of rows
+    row: Dict[str, Any] = (
+        result if isinstance(result, dict) else result[0] if result else {}
+    )
+
+    total = (
+        row.get("notes_total", 0)
+        + row.get("insights_total", 0)
+        + row.get("sources_total", 0)
+    )
+    done = (
+        min(row.get("notes_done", 0), row.get("notes_total", 0))
+        + min(row.get("insights_done", 0), row.get("insights_total", 0))
+        + min(row.get("sources_done", 0), row.get("sources_total", 0))
+    )
+
+    return {
+        **row,
+        "total": total,
+        "done": done,
+        "percentage": round((done / total * 100) if total > 0 else 100.0, 2),
+    }
+
+
+async def cutover_shadow_embeddings(force: bool = False) -> Dict[str, Any]:
+    """
+    Atomically promote shadow vectors to live and switch the default embedding model.
+
+    Everything happens inside a single SurrealDB transaction, so searches see
+    either the old model's vectors or the new ones - never a mix.
+
+    Args:
+        force: Cut over even if coverage is below 100%. The old model's vectors
+            of items without a shadow vector are dropped in the same transaction
+            (they would be scored against the new model's queries whenever both
+            models have the same dimension), so those items do not match vector
+            searches until they are re-embedded; re-embedding is queued for them.
+
+    Returns:
+        Coverage snapshot taken right before the cutover
+
+    Raises:
+        InvalidInputError: If no migration is active or coverage is incomplete
+    """
+    migration = await EmbeddingMigration.get_instance()
+    if not migration.is_active:
+        raise InvalidInputError("No embedding model migration is in progress")
+
+    coverage = await get_shadow_coverage()
+    if coverage["done"] < coverage["total"] and not force:
+        raise InvalidInputError(
+            f"Shadow coverage is {coverage['percentage']}% "
+            f"({coverage['done']}/{coverage['total']}); cutover requires 100%"
+        )
+
+    logger.info(
+        f"Cutting over to embedding model {migration.target_model} "
+        f"({coverage['done']}/{coverage['total']} items shadowed)"
+    )
+    unshadowed = await _unshadowed_items() if force else {}
+
+    # Live vectors without a shadow (only left when forced) are dropped, not kept
+    await repo_query(
+        """
+        BEGIN TRANSACTION;
+        UPDATE note SET embedding = NONE WHERE embedding != NONE AND embedding_shadow = NONE;
+        UPDATE source_insight SET embedding = NONE WHERE embedding != NONE AND embedding_shadow = NONE;
+        UPDATE note SET embedding = embedding_shadow, embedding_shadow = NONE WHERE embedding_shadow != NONE;
+        UPDATE source_insight SET embedding = embedding_shadow, embedding_shadow = NONE WHERE embedding_shadow != NONE;
+        DELETE source_embedding;
+        LET $shadow_rows = SELECT source, order, content, embedding FROM source_embedding_shadow;
+        INSERT INTO source_embedding $shadow_rows;
+        DELETE source_embedding_shadow;
+        UPSERT open_notebook:default_models MERGE { default_embedding_model: $target_model };
+        UPSERT $migration_id MERGE { status: "idle", target_model: NONE, command_id: NONE, error_message: NONE };
+        COMMIT TRANSACTION;
+        """,
+        {
+            "target_model": migration.target_model,
+            "migration_id": ensure_record_id(EmbeddingMigration.record_id),
+        },
+    )
+
+    logger.success(f"Embedding model cutover to {migration.target_model} completed")
+    if any(unshadowed.values()):
+        await _queue_reembedding(unshadowed)
+    return coverage
+
+
+async def _unshadowed_items() -> Dict[str, List[str]]:
+    """IDs of embedded items that have no shadow vector, per embed command."""
+    result = await repo_query(
+        """
+        RETURN {
+            embed_note: (SELECT VALUE id FROM note WHERE embedding != none AND array::len(embedding) > 0 AND embedding_shadow = none),
+            embed_insight: (SELECT VALUE id FROM source_insight WHERE embedding != none AND array::len(embedding) > 0 AND embedding_shadow = none),
+            embed_source: array::complement(
+                array::distinct(SELECT VALUE source FROM source_embedding),
+                array::distinct(SELECT VALUE source FROM source_embedding_shadow)
+            )
+        }
+        """
+    )
+    # RETURN yields the object itself rather than a list of rows
+    row: Dict[str, Any] = (
+        result if isinstance(result, dict) else result[0] if result else {}
+    )
+    return {name: [str(i) for i in row.get(name) or []] for name in _ARG_NAMES}
+
+
+async def _queue_reembedding(items: Dict[str, List[str]]) -> None:
+    """Re-embed items that lost their vectors in a forced cutover."""
+    # Import commands to ensure they're registered
+    import commands.embedding_commands  # noqa: F401
+
+    for command_name, item_ids in items.items():
+        logger.info(f"Queueing {command_name} for {len(item_ids)} unshadowed items")
+        for item_id in item_ids:
+            try:
+                await submit_coalesced(
+                    "open_notebook",
+                    command_name,
+                    {_ARG_NAMES[command_name]: item_id},
+                    lane="bulk",
+                )
+            except Exception as e:
+                logger.error(f"Failed to submit {command_name} for {item_id}: {e}")
+
+
+async def discard_shadow_embeddings() -> None:
+    """Abort a migration: drop all shadow vectors and reset the migration state."""
+    await repo_query(
+        """
+        BEGIN TRANSACTION;
+        UPDATE note SET embedding_shadow = NONE WHERE embedding_shadow != NONE;
+        UPDATE source_insight SET embedding_shadow = NONE WHERE embedding_shadow != NONE;
+        DELETE source_embedding_shadow;
+        UPSERT $migration_id MERGE { status: "idle", target_model: NONE, command_id: NONE, error_message: NONE };
+        COMMIT TRANSACTION;
+        """,
+        {"migration_id": ensure_record_id(EmbeddingMigration.record_id)},
+    )
@@ -1,14 +1,16 @@
 import asyncio
 import os
+from datetime import datetime
 from pathlib import Path
 from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple, Union
 
 from loguru import logger
 from pydantic import BaseModel, ConfigDict, Field, field_validator
-from surreal_commands import submit_command
 from surrealdb import RecordID
 
+from open_notebook.database.command_queue import submit_coalesced
 from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.database.write_lock import record_write_lock
 from open_notebook.domain.base import ObjectModel
 from open_notebook.exceptions import DatabaseOperationError, InvalidInputError
 
@@ -432,14 +434,13 @@ class Source(ObjectModel):
             if not self.full_text:
                 raise ValueError(f"Source {self.id} has no text to vectorize")
 
-            # Submit the embed_source command
-            command_id = submit_command(
+            # Submit the embed_source command, merged into a pending one if queued
+            command_id_str = await submit_coalesced(
                 "open_notebook",
                 "embed_source",
                 {"source_id": str(self.id)},
             )
 
-            command_id_str = str(command_id)
             logger.info(
                 f"Embed source job submitted for source {self.id}: "
                 f"command_id={command_id_str}"
@@ -470,27 +471,32 @@ class Source(ObjectModel):
         """
         if not insight_type or not content:
             raise InvalidInputError("Insight type and content must be provided")
+        if not self.id:
+            raise InvalidInputError("Cannot add an insight to an unsaved source")
         try:
-            # Create insight WITHOUT embedding (fire-and-forget embedding via command)
-            result = await repo_query(
-                """
-                CREATE source_insight CONTENT {
-                        "source": $source_id,
-                        "insight_type": $insight_type,
-                        "content": $content,
-                };""",
-                {
-                    "source_id": ensure_record_id(self.id),
-                    "insight_type": insight_type,
-                    "content": content,
-                },
-            )
+            # Create insight WITHOUT embedding (fire-and-forget embedding via command).
+            # Parallel transformations add insights to the same source at once;
+            # serialize them (within this process) to avoid transaction conflicts.
+            async with record_write_lock(self.id):
+                result = await repo_query(
+                    """
+                    CREATE source_insight CONTENT {
+                            "source": $source_id,
+                            "insight_type": $insight_type,
+                            "content": $content,
+                    };""",
+                    {
+                        "source_id": ensure_record_id(self.id),
+                        "insight_type": insight_type,
+                        "content": content,
+                    },
+                )
 
             # Submit embedding command (fire-and-forget)
             if result and len(result) > 0:
                 insight_id = str(result[0].get("id", ""))
                 if insight_id:
-                    submit_command(
+                    await submit_coalesced(
                         "open_notebook",
                         "embed_insight",
                         {"insight_id": insight_id},
@@ -538,6 +544,10 @@ class Source(ObjectModel):
                 "DELETE source_embedding WHERE source = $source_id",
                 {"source_id": source_id},
             )
+            await repo_query(
+                "DELETE source_embedding_shadow WHERE source = $source_id",
+                {"source_id": source_id},
+            )
             await repo_query(
                 "DELETE source_insight WHERE source = $source_id",
                 {"source_id": source_id},
@@ -579,9 +589,11 @@ class Note(ObjectModel):
         # Call parent save (without embedding)
         await super().save()
 
-        # Submit embedding command (fire-and-forget) if note has content
+        # Submit embedding command (fire-and-forget) if note has content.
+        # Repeated saves while a job is still queued reuse that job, which
+        # embeds whatever content the note has when it runs.
         if self.id and self.content and self.content.strip():
-            command_id = submit_command(
+            command_id = await submit_coalesced(
                 "open_notebook",
                 "embed_note",
                 {"note_id": str(self.id)},
@@ -612,8 +624,57 @@ class Note(ObjectModel):
 class ChatSession(ObjectModel):
     table_name: ClassVar[str] = "chat_session"
     nullable_fields: ClassVar[set[str]] = {"model_override"}
+    # Written by record_activity(), and by save() only when creating the
+    # session, so saving a stale session object (e.g. renaming it) cannot roll
+    # back a finished turn
+    activity_fields: ClassVar[set[str]] = {
+        "message_count",
+        "last_message_preview",
+        "last_activity",
+    }
+    preview_length: ClassVar[int] = 200
     title: Optional[str] = None
     model_override: Optional[str] = None
+    message_count: Optional[int] = None
+    last_message_preview: Optional[str] = None
+    last_activity: Optional[datetime] = None
+
+    def _prepare_save_data(self) -> Dict[str, Any]:
+        data = super()._prepare_save_data()
+        if self.id is not None:
+            for field in self.activity_fields:
+                data.pop(field, None)
+        return data
+
+    async def record_activity(
+        self,
+        message_count: int,
+        last_message: Optional[str],
+        at: Optional[datetime] = None,
+    ) -> None:
+        """Store the message count and last message preview after a chat turn."""
+        if not self.id:
+            raise InvalidInputError("Cannot record activity for an unsaved session")
+        preview = " ".join((last_message or "").split())[: self.preview_length]
+        result = await repo_query(
+            """
+            UPDATE $id SET
+                message_count = $message_count,
+                last_message_preview = $preview,
+                last_activity = $at ?? time::now()
+            RETURN message_count, last_message_preview, last_activity
+            """,
+            {
+                "id": ensure_record_id(self.id),
+                "message_count": message_count,
+                "preview": preview or None,
+                "at": at,
+            },
+        )
+        if result:
+            self.message_count = result[0].get("message_count")
+            self.last_message_preview = result[0].get("last_message_preview")
+            self.last_activity = result[0].get("last_activity")
 
     async def relate_to_notebook(self, notebook_id: str) -> Any:
         if not notebook_id:
@@ -677,3 +738,202 @@ async def vector_search(
         logger.error(f"Error performing vector search: {str(e)}")
         logger.exception(e)
         raise DatabaseOperationError(e)
+
+
+RRF_K = 60  # Standard reciprocal-rank fusion constant
+
+
+def _reciprocal_rank_fusion(
+    ranked_lists: List[List[Dict[str, Any]]], k: int = RRF_K
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal-rank fusion.
+
+    Each result contributes 1 / (k + rank) per list it appears in, so items
+    found by both retrievers rise to the top regardless of how the scores
+    of each retriever are scaled. Fields of duplicate results are merged.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for ranked in ranked_lists:
+        for rank, result in enumerate(ranked, start=1):
+            result_id = str(result.get("id"))
+            entry = fused.setdefault(result_id, {"score": 0.0})
+            for key, value in result.items():
+                if value is not None and key not in entry:
+                    entry[key] = value
+            entry["score"] += 1.0 / (k + rank)
+
+    max_score = len(ranked_lists) / (k + 1)
+    merged = sorted(fused.values(), key=lambda r: r["score"], reverse=True)
+    for result in merged:
+        # Normalized to 0..1 (1 = ranked first by every retriever)
+        result["final_score"] = result["score"] / max_score
+    return merged
+
+
+async def hybrid_search(
+    keyword: str,
+    results: int,
+    source: bool = True,
+    note: bool = True,
+    minimum_score=0.2,
+):
+    """
+    Run BM25 text search and vector search in one database round trip and
+    fuse both rankings with reciprocal-rank fusion.
+
+    Each retriever returns twice the requested number of candidates so the
+    fused list is not limited to items that rank highly in just one of them.
+    """
+    if not keyword:
+        raise InvalidInputError("Search keyword cannot be empty")
+    try:
+        from open_notebook.utils.embedding import generate_embedding
+
+        embed = await generate_embedding(keyword)
+        search_results = await repo_query(
+            """
+            RETURN {
+                text: fn::text_search($keyword, $candidates, $source, $note),
+                vector: fn::vector_search($embed, $candidates, $source, $note, $minimum_score)
+            };
+            """,
+            {
+                "keyword": keyword,
+                "embed": embed,
+                "candidates": results * 2,
+                "source": source,
+                "note": note,
+                "minimum_score": minimum_score,
+            },
+        )
+        if isinstance(search_results, list):
+            search_results = search_results[0] if search_results else {}
+        search_results = search_results or {}
+
+        fused = _reciprocal_rank_fusion(
+            [search_results.get("text") or [], search_results.get("vector") or []]
+        )
+        return fused[:results]
+    except Exception as e:
+        logger.error(f"Error performing hybrid search: {str(e)}")
+        logger.exception(e)
+        raise DatabaseOperationError(e)
+
+
+async def _embed_queries(keywords: List[str]) -> List[List[float]]:
+    """Embed several search queries, short ones in a single provider call."""
+    from open_notebook.utils.chunking import CHUNK_SIZE
+    from open_notebook.utils.embedding import generate_embedding, generate_embeddings
+
+    queries = [keyword.strip() for keyword in keywords]
+    if any(len(query) > CHUNK_SIZE for query in queries):
+        # Very long queries need chunking + mean pooling, embed them one by one
+        return list(await asyncio.gather(*[generate_embedding(q) for q in queries]))
+    return await generate_embeddings(queries)
+
+
+async def vector_search_many(
+    keywords: List[str],
+    results: int,
+    source: bool = True,
+    note: bool = True,
+    minimum_score=0.2,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run several vector searches at once.
+
+    All keywords are embedded in one provider call and scored in a single
+    pass over the vector tables (fn::vector_search_many), so a multi-search
+    strategy costs roughly the same as one vector_search() call.
+
+    Returns:
+        One result list per keyword, in the same order as the keywords
+    """
+    if not keywords:
+        return []
+    if any(not keyword or not keyword.strip() for keyword in keywords):
+        raise InvalidInputError("Search keyword cannot be empty")
+    try:
+        embeds = await _embed_queries(keywords)
+        search_results = await repo_query(
+            """
+            RETURN fn::vector_search_many($queries, $results, $source, $note, $minimum_score);
+            """,
+            {
+                "queries": [
+                    {"index": idx, "embedding": embed}
+                    for idx, embed in enumerate(embeds)
+                ],
+                "results": results,
+                "source": source,
+                "note": note,
+                "minimum_score": minimum_score,
+            },
+        )
+        search_results = search_results or []
+        return [
+            search_results[idx] if idx < len(search_results) else []
+            for idx in range(len(keywords))
+        ]
+    except Exception as e:
+        logger.error(f"Error performing batched vector search: {str(e)}")
+        logger.exception(e)
+        raise DatabaseOperationError(e)
+
+
+async def hybrid_search_many(
+    keywords: List[str],
+    results: int,
+    source: bool = True,
+    note: bool = True,
+    minimum_score=0.2,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Batched variant of hybrid_search(): one embedding call and one database
+    round trip for all keywords, fused per keyword with reciprocal-rank fusion.
+    """
+    if not keywords:
+        return []
+    if any(not keyword or not keyword.strip() for keyword in keywords):
+        raise InvalidInputError("Search keyword cannot be empty")
+    try:
+        embeds = await _embed_queries(keywords)
+        search_results = await repo_query(
+            """
+            RETURN {
+                text: (SELECT VALUE fn::text_search(keyword, $candidates, $source, $note) FROM $queries),
+                vector: fn::vector_search_many($queries, $candidates, $source, $note, $minimum_score)
+            };
+            """,
+            {
+                "queries": [
+                    {"index": idx, "keyword": keyword, "embedding": embed}
+                    for idx, (keyword, embed) in enumerate(zip(keywords, embeds))
+                ],
+                "candidates": results * 2,
+                "source": source,
+                "note": note,
+                "minimum_score": minimum_score,
+            },
+        )
+        if isinstance(search_results, list):
+            search_results = search_results[0] if search_results else {}
+        search_results = search_results or {}
+        text_results = search_results.get("text") or []
+        vector_results = search_results.get("vector") or []
+
+        fused = []
+        for idx in range(len(keywords)):
+            ranked = _reciprocal_rank_fusion(
+                [
+                    text_results[idx] if idx < len(text_results) else [],
+                    vector_results[idx] if idx < len(vector_results) else [],
+                ]
+            )
+            fused.append(ranked[:results])
+        return fused
+    except Exception as e:
+        logger.error(f"Error performing batched hybrid search: {str(e)}")
+        logger.exception(e)
+        raise DatabaseOperationError(e)
@@ -1,4 +1,5 @@
 import operator
+import time
 from typing import Annotated, List
 
 from ai_prompter import Prompter
@@ -6,11 +7,17 @@ from langchain_core.output_parsers.pydantic import PydanticOutputParser
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Send
+from loguru import logger
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
 from open_notebook.ai.provision import provision_langchain_model
-from open_notebook.domain.notebook import vector_search
+from open_notebook.domain.notebook import (
+    hybrid_search,
+    hybrid_search_many,
+    vector_search,
+    vector_search_many,
+)
 from open_notebook.utils import clean_thinking_content
 
 
@@ -18,7 +25,7 @@ class SubGraphState(TypedDict):
     question: str
     term: str
     instructions: str
-    results: dict
+    results: list
     answer: str
     ids: list  # Added for provide_answer function
 
@@ -41,6 +48,7 @@ class Strategy(BaseModel):
 class ThreadState(TypedDict):
     question: str
     strategy: Strategy
+    retrieved: list  # One result list per strategy search, in strategy order
     answers: Annotated[list, operator.add]
     final_answer: str
 
@@ -75,7 +83,30 @@ async def call_model_with_messages(state: ThreadState, config: RunnableConfig) -
     return {"strategy": strategy}
 
 
+async def retrieve(state: ThreadState, config: RunnableConfig) -> dict:
+    """
+    Run the retrieval for every strategy search in one batch.
+
+    All search terms are embedded in a single provider call and scored in a
+    single database pass, instead of one embedding call and one scan per term.
+    """
+    terms = [s.term for s in state["strategy"].searches]
+    if not terms:
+        return {"retrieved": []}
+
+    start_time = time.time()
+    if config.get("configurable", {}).get("search_type") == "hybrid":
+        retrieved = await hybrid_search_many(terms, 10, True, True)
+    else:
+        retrieved = await vector_search_many(terms, 10, True, True)
+    logger.debug(
+        f"Retrieved results for {len(terms)} searches in {time.time() - start_time:.2f}s"
+    )
+    return {"retrieved": retrieved}
+
+
 async def trigger_queries(state: ThreadState, config: RunnableConfig):
+    retrieved = state.get("retrieved") or []
     return [
         Send(
             "provide_answer",
@@ -83,19 +114,23 @@ async def trigger_queries(state: ThreadState, config: RunnableConfig):
                 "question": state["question"],
                 "instructions": s.instructions,
                 "term": s.term,
+                "results": retrieved[idx] if idx < len(retrieved) else None,
                 # "type": s.type,
             },
         )
-        for s in state["strategy"].searches
+        for idx, s in enumerate(state["strategy"].searches)
     ]
 
 
 async def provide_answer(state: SubGraphState, config: RunnableConfig) -> dict:
     payload = state
-    # if state["type"] == "text":
-    #     results = text_search(state["term"], 10, True, True)
-    # else:
-    results = await vector_search(state["term"], 10, True, True)
+    results = state.get("results")
+    if results is None:
+        # Not pre-fetched by the retrieve node, search for this term alone
+        if config.get("configurable", {}).get("search_type") == "hybrid":
+            results = await hybrid_search(state["term"], 10, True, True)
+        else:
+            results = await vector_search(state["term"], 10, True, True)
     if len(results) == 0:
         return {"answers": []}
     payload["results"] = results
@@ -124,8 +159,10 @@ async def write_final_answer(state: ThreadState, config: RunnableConfig) -> dict
         config.get("configurable", {}).get("final_answer_model"),
         "tools",
         max_tokens=2000,
+        streaming=True,
     )
-    ai_message = await model.ainvoke(system_prompt)
+    # Pass the config so callers using astream_events receive the tokens
+    ai_message = await model.ainvoke(system_prompt, config=config)
     final_content = (
         ai_message.content
         if isinstance(ai_message.content, str)
@@ -136,10 +173,12 @@ async def write_final_answer(state: ThreadState, config: RunnableConfig) -> dict
 
 agent_state = StateGraph(ThreadState)
 agent_state.add_node("agent", call_model_with_messages)
+agent_state.add_node("retrieve", retrieve)
 agent_state.add_node("provide_answer", provide_answer)
 agent_state.add_node("write_final_answer", write_final_answer)
 agent_state.add_edge(START, "agent")
-agent_state.add_conditional_edges("agent", trigger_queries, ["provide_answer"])
+agent_state.add_edge("agent", "retrieve")
+agent_state.add_conditional_edges("retrieve", trigger_queries, ["provide_answer"])
 agent_state.add_edge("provide_answer", "write_final_answer")
 agent_state.add_edge("write_final_answer", END)
 
@@ -1,19 +1,28 @@
 import asyncio
 import sqlite3
-from typing import Annotated, Optional
+from typing import Annotated, Dict, Optional
 
-import aiosqlite
 from ai_prompter import Prompter
-from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
 
 from open_notebook.ai.provision import provision_langchain_model
-from open_notebook.config import LANGGRAPH_CHECKPOINT_FILE
 from open_notebook.domain.notebook import Notebook
+from open_notebook.graphs.chat_memory import (
+    current_summary,
+    schedule_summary,
+    select_messages,
+)
+from open_notebook.graphs.checkpoint_store import create_checkpointer
+from open_notebook.graphs.prompt_cache import (
+    mark_history,
+    supports_cache_control,
+    system_message,
+)
+from open_notebook.graphs.token_accounting import PromptTokens, merge_token_counts
 from open_notebook.utils import clean_thinking_content
 
 
@@ -23,23 +32,55 @@ class ThreadState(TypedDict):
     context: Optional[str]
     context_config: Optional[dict]
     model_override: Optional[str]
+    # Tokens per message ID, and of the last system prompt ({"hash", "tokens"})
+    token_counts: Annotated[Dict[str, int], merge_token_counts]
+    system_tokens: Optional[dict]
+    # Prompt and completion tokens of the last turn
+    usage: Optional[dict]
+    # Rolling summary of messages[:summarized_count] (see chat_memory)
+    summary: Optional[str]
+    summarized_count: Optional[int]
 
 
 async def call_model_with_messages(state: ThreadState, config: RunnableConfig) -> dict:
-    system_prompt = Prompter(prompt_template="chat/system").render(data=state)  # type: ignore[arg-type]
-    payload = [SystemMessage(content=system_prompt)] + state.get("messages", [])
+    # Stable instructions and context first, so providers can cache the prefix
+    system_prompt = Prompter(prompt_template="chat/system").render(
+        data=state  # type: ignore[arg-type]
+    )
+    summary = current_summary(state)
+    earlier_conversation = (
+        Prompter(prompt_template="chat/earlier_conversation").render(
+            data={"summary": summary}
+        )
+        if summary
+        else ""
+    )
+    # Recent turns verbatim; older ones are covered by the summary
+    messages = select_messages(state)
     model_id = config.get("configurable", {}).get("model_id") or state.get(
         "model_override"
     )
 
+    # Only messages new since the last turn are tokenized
+    prompt_tokens = PromptTokens(
+        f"{system_prompt}\n\n{earlier_conversation}", messages, state
+    )
+    if prompt_tokens.needs_count():
+        await prompt_tokens.count()
+
     # Provision model asynchronously
     model = await provision_langchain_model(
-        str(payload),
+        None,
         model_id,
         "chat",
+        tokens=prompt_tokens.tokens,
         max_tokens=8192,
         streaming=True,
     )
+    cache = supports_cache_control(model)
+    payload = [
+        system_message(system_prompt, earlier_conversation, cache)
+    ] + mark_history(messages, cache)
 
     # Use ainvoke with config to support streaming events
     ai_message = await model.ainvoke(payload, config=config)
@@ -53,16 +94,18 @@ async def call_model_with_messages(state: ThreadState, config: RunnableConfig) -
     cleaned_content = clean_thinking_content(content)
     cleaned_message = ai_message.model_copy(update={"content": cleaned_content})
 
-    return {"messages": cleaned_message}
+    schedule_summary(get_graph, "agent", state, config)
+
+    return {
+        "messages": cleaned_message,
+        **(await prompt_tokens.state_update(cleaned_message)),
+    }
 
 
 # Create async SQLite checkpointer
 async def get_memory():
     """Get or create the async memory checkpointer"""
-    conn = await aiosqlite.connect(
-        LANGGRAPH_CHECKPOINT_FILE,
-    )
-    return AsyncSqliteSaver(conn)
+    return await create_checkpointer()
 
 
 # Lazy initialization of memory
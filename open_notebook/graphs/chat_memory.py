@@ -0,0 +1,257 @@
+"""
+Bounded conversation memory for the chat graphs.
+
+The thread state keeps every message (the UI shows the full history), but the
+model only sees the last CHAT_MEMORY_KEEP_TURNS turns verbatim. Older turns are
+folded into a rolling summary that is rendered into the system prompt. The
+summary is generated in the background after a turn, once at least
+SUMMARY_BATCH_TURNS turns have left the window, and stored in the thread state
+as (summary, summarized_count); turns that left the window but are not yet
+summarized are still sent verbatim, so nothing is lost while it is pending.
+
+A turn writes its checkpoints from the channels it loaded when it started, so
+a summary stored while a turn runs would be overwritten by it. The summary is
+therefore stored only once the thread is idle, and stored again if a turn
+that started meanwhile dropped it. Turns pass only the keys they change as
+graph input, never the previous summary.
+
+Optionally, the CHAT_MEMORY_RECALL_TURNS summarized turns that share the most
+words with the new question are sent verbatim as well (a retrieval window over
+the pruned history).
+
+Configuration (environment variables):
+- CHAT_MEMORY_KEEP_TURNS: turns sent verbatim (default 0: whole history)
+- CHAT_MEMORY_RECALL_TURNS: older turns recalled by relevance (default 0)
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from ai_prompter import Prompter
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from loguru import logger
+
+from open_notebook.ai.provision import provision_langchain_model
+from open_notebook.config import env_int
+from open_notebook.utils import clean_thinking_content
+
+# Summarize once this many turns are outside the window and not yet summarized
+SUMMARY_BATCH_TURNS = 5
+SUMMARY_MAX_TOKENS = 2048
+# Attempts to store a summary that a concurrently running turn overwrote
+SUMMARY_STORE_ATTEMPTS = 3
+# Polling of the thread while a turn is running, in seconds
+SUMMARY_POLL_INTERVAL = 0.5
+SUMMARY_POLL_TIMEOUT = 300
+
+_WORD_PATTERN = re.compile(r"\w{3,}")
+
+# Thread ID -> summarization running for it
+_summarizing: Dict[str, "asyncio.Task[None]"] = {}
+
+
+@dataclass(frozen=True)
+class MemoryPolicy:
+    keep_turns: int = 0
+    recall_turns: int = 0
+
+    @classmethod
+    def from_env(cls) -> "MemoryPolicy":
+        return cls(
+            keep_turns=env_int("CHAT_MEMORY_KEEP_TURNS", 0),
+            recall_turns=env_int("CHAT_MEMORY_RECALL_TURNS", 0),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.keep_turns > 0
+
+
+def _turn_starts(messages: List[BaseMessage]) -> List[int]:
+    """Indexes of the messages that start a turn (user messages)."""
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+
+def _window_start(messages: List[BaseMessage], keep_turns: int) -> int:
+    starts = _turn_starts(messages)
+    if len(starts) <= keep_turns:
+        return 0
+    return starts[-keep_turns]
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+
+def _words(text: str) -> Set[str]:
+    return {word.lower() for word in _WORD_PATTERN.findall(text)}
+
+
+def _recall(
+    messages: List[BaseMessage], end: int, query: str, turns: int
+) -> List[BaseMessage]:
+    """The turns before messages[end] that share the most words with the query."""
+    query_words = _words(query)
+    if not query_words:
+        return []
+    starts = [i for i in _turn_starts(messages) if i < end]
+    scored: List[Tuple[int, int, int]] = []
+    for position, start in enumerate(starts):
+        stop = starts[position + 1] if position + 1 < len(starts) else end
+        text = " ".join(_text(m) for m in messages[start:stop])
+        overlap = len(query_words & _words(text))
+        if overlap:
+            scored.append((overlap, start, stop))
+    best = sorted(scored, reverse=True)[:turns]
+    # Keep the recalled turns in conversation order
+    return [
+        m
+        for _, start, stop in sorted(best, key=lambda t: t[1])
+        for m in messages[start:stop]
+    ]
+
+
+def select_messages(
+    state: Mapping[str, Any], policy: Optional[MemoryPolicy] = None
+) -> List[BaseMessage]:
+    """
+    Messages to send to the model for this turn under the memory policy.
+
+    The rolling summary itself (state["summary"]) is rendered into the system
+    prompt by the prompt templates.
+    """
+    policy = policy or MemoryPolicy.from_env()
+    messages: List[BaseMessage] = state.get("messages", [])
+    if not policy.enabled:
+        return messages
+
+    window_start = _window_start(messages, policy.keep_turns)
+    summarized = min(state.get("summarized_count") or 0, window_start)
+
+    recalled: List[BaseMessage] = []
+    if policy.recall_turns and summarized and messages:
+        recalled = _recall(
+            messages, summarized, _text(messages[-1]), policy.recall_turns
+        )
+    # Turns out of the window that the summary does not cover yet stay verbatim
+    return recalled + messages[summarized:]
+
+
+def current_summary(state: Mapping[str, Any]) -> Optional[str]:
+    """The rolling summary if the memory policy is in effect."""
+    return state.get("summary") if MemoryPolicy.from_env().enabled else None
+
+
+async def _summarize(
+    previous_summary: Optional[str],
+    messages: List[BaseMessage],
+    model_id: Optional[str],
+) -> str:
+    system_prompt = Prompter(prompt_template="chat/summarize").render(
+        data={"summary": previous_summary}
+    )
+    transcript = "\n\n".join(
+        f"## {'User' if isinstance(m, HumanMessage) else 'Assistant'}\n\n{_text(m)}"
+        for m in messages
+    )
+    payload = [SystemMessage(content=system_prompt), HumanMessage(content=transcript)]
+    model = await provision_langchain_model(
+        str(payload), model_id, "transformation", max_tokens=SUMMARY_MAX_TOKENS
+    )
+    response = await model.ainvoke(payload)
+    return clean_thinking_content(_text(response))
+
+
+async def _idle_state(graph: Any, config: RunnableConfig) -> Any:
+    """Thread state once no turn is running (no pending next node)."""
+    waited = 0.0
+    snapshot = await graph.aget_state(config)
+    while snapshot.next and waited < SUMMARY_POLL_TIMEOUT:
+        await asyncio.sleep(SUMMARY_POLL_INTERVAL)
+        waited += SUMMARY_POLL_INTERVAL
+        snapshot = await graph.aget_state(config)
+    return snapshot
+
+
+def schedule_summary(
+    get_graph: Callable[[], Awaitable[Any]],
+    node: str,
+    state: Mapping[str, Any],
+    config: RunnableConfig,
+) -> None:
+    """
+    Start summarizing the turns that left the window, if enough have piled up.
+
+    Runs in the background after the turn; the result is written to the thread
+    state with graph.aupdate_state() as if produced by the given node.
+
+    Args:
+        get_graph: Returns the compiled graph of the thread
+        node: Graph node the state update is attributed to
+        state: Thread state of the turn
+        config: Config of the turn (carries the thread ID)
+    """
+    policy = MemoryPolicy.from_env()
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if not policy.enabled or not thread_id:
+        return
+
+    messages: List[BaseMessage] = state.get("messages", [])
+    # The reply of this turn is not in the state yet, but it does not start a turn
+    window_start = _window_start(messages, policy.keep_turns)
+    summarized = state.get("summarized_count") or 0
+    pending_turns = len(
+        [i for i in _turn_starts(messages) if summarized <= i < window_start]
+    )
+    if pending_turns < SUMMARY_BATCH_TURNS:
+        return
+
+    running = _summarizing.get(thread_id)
+    if running is not None and not running.done():
+        return
+
+    previous_summary = state.get("summary")
+    to_summarize = messages[summarized:window_start]
+    model_id = config.get("configurable", {}).get("model_id")
+
+    async def run() -> None:
+        try:
+            summary = await _summarize(previous_summary, to_summarize, model_id)
+            graph = await get_graph()
+            thread = RunnableConfig(configurable={"thread_id": thread_id})
+            for attempt in range(SUMMARY_STORE_ATTEMPTS + 1):
+                snapshot = await _idle_state(graph, thread)
+                if (snapshot.values.get("summarized_count") or 0) >= window_start:
+                    logger.debug(
+                        f"Summarized {len(to_summarize)} messages of {thread_id} "
+                        f"(now covering {window_start})"
+                    )
+                    return
+                if attempt == SUMMARY_STORE_ATTEMPTS:
+                    break
+                await graph.aupdate_state(
+                    thread,
+                    {"summary": summary, "summarized_count": window_start},
+                    as_node=node,
+                )
+            logger.warning(
+                f"Summary of {thread_id} kept being overwritten by new turns; "
+                "the next turn retries"
+            )
+        except Exception as e:
+            # The turns stay verbatim in the prompt; the next turn retries
+            logger.warning(f"Failed to summarize conversation {thread_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _summarizing[thread_id] = task
+    task.add_done_callback(
+        lambda done: (
+            _summarizing.pop(thread_id, None)
+            if _summarizing.get(thread_id) is done
+            else None
+        )
+    )
@@ -0,0 +1,406 @@
+"""
+SQLite storage for LangGraph chat checkpoints.
+
+Every chat turn writes several full checkpoints of the thread to
+checkpoints.sqlite. Connections are opened in WAL mode with relaxed syncing,
+so writes do not fsync per transaction and readers never wait for a writer.
+
+An AsyncSqliteSaver runs every call on its single connection under one lock,
+so all chats of a graph queued behind each other. Each graph instead gets a
+PooledSqliteSaver of CHECKPOINT_CONNECTIONS savers, each on its own
+connection; a thread always uses the same one (so its checkpoints stay in
+order), and different threads spread over the pool. SQLite still admits one
+writer at a time, but the short commits interleave instead of whole turns'
+checkpoint work waiting on one lock.
+
+Only the latest checkpoint is needed to continue a conversation, so
+CheckpointCompactor periodically keeps the CHECKPOINT_KEEP_PER_THREAD most
+recent checkpoints of each thread, drops threads whose chat_session no longer
+exists and returns the freed pages to the filesystem. Its first run waits one
+interval, so it never competes with chats right after startup.
+
+Files created before incremental auto-vacuum need one full VACUUM to switch
+modes. That locks the whole file, so convert_checkpoint_file() does it at API
+startup, before any chat graph has opened a connection; the periodic
+compaction never runs a full VACUUM.
+
+Configuration (environment variables):
+- CHECKPOINT_CONNECTIONS: connections per chat graph (default 4)
+- CHECKPOINT_KEEP_PER_THREAD: checkpoints kept per thread (default 6)
+- CHECKPOINT_COMPACTION_INTERVAL: seconds between compactions in the API
+  process (default 21600, 0 disables)
+"""
+
+import asyncio
+import os
+import time
+import zlib
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Sequence, Set
+
+import aiosqlite
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from loguru import logger
+
+from open_notebook.config import LANGGRAPH_CHECKPOINT_FILE, env_int
+
+DEFAULT_CONNECTIONS = 4
+DEFAULT_KEEP_PER_THREAD = 6
+DEFAULT_COMPACTION_INTERVAL = 6 * 60 * 60
+
+PRAGMAS = (
+    # Must precede table creation to apply; existing files convert on compaction
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    # Durable across application crashes; a power loss may drop the last turn
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Duration in seconds of the most recent checkpoint writes
+_write_latencies: Deque[float] = deque(maxlen=1000)
+
+
+async def connect() -> aiosqlite.Connection:
+    """Open a tuned connection to the checkpoint file."""
+    conn = await aiosqlite.connect(LANGGRAPH_CHECKPOINT_FILE)
+    for pragma in PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+
+@asynccontextmanager
+async def _connection() -> AsyncIterator[aiosqlite.Connection]:
+    conn = await connect()
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+class TimedSqliteSaver(AsyncSqliteSaver):
+    """AsyncSqliteSaver that records how long checkpoint writes take."""
+
+    async def aput(self, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await super().aput(*args, **kwargs)
+        finally:
+            _write_latencies.append(time.perf_counter() - started)
+
+    async def aput_writes(self, *args: Any, **kwargs: Any) -> None:
+        started = time.perf_counter()
+        try:
+            await super().aput_writes(*args, **kwargs)
+        finally:
+            _write_latencies.append(time.perf_counter() - started)
+
+
+class PooledSqliteSaver(BaseCheckpointSaver):
+    """Spreads threads over several savers, each on its own connection."""
+
+    def __init__(self, savers: List[TimedSqliteSaver]):
+        super().__init__(serde=savers[0].serde)
+        self.savers = savers
+
+    def _saver(self, config: Optional[RunnableConfig]) -> TimedSqliteSaver:
+        thread_id = str((config or {}).get("configurable", {}).get("thread_id", ""))
+        return self.savers[zlib.crc32(thread_id.encode()) % len(self.savers)]
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._saver(config).aget_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        # Every connection reads the same file
+        async for item in self._saver(config).alist(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._saver(config).aput(
+            config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._saver(config).aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        config: RunnableConfig = {"configurable": {"thread_id": thread_id}}
+        await self._saver(config).adelete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        return self.savers[0].get_next_version(current, channel)
+
+
+async def create_checkpointer() -> PooledSqliteSaver:
+    """Create a checkpointer on a pool of CHECKPOINT_CONNECTIONS tuned connections."""
+    size = env_int("CHECKPOINT_CONNECTIONS", DEFAULT_CONNECTIONS, minimum=1)
+    savers = [TimedSqliteSaver(await connect()) for _ in range(size)]
+    # Create the tables once rather than racing on every connection
+    await savers[0].setup()
+    return PooledSqliteSaver(savers)
+
+
+async def _has_tables(conn: aiosqlite.Connection) -> bool:
+    cursor = await conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master "
+        "WHERE type = 'table' AND name IN ('checkpoints', 'writes')"
+    )
+    row = await cursor.fetchone()
+    return bool(row and row[0] == 2)
+
+
+async def _delete_threads(conn: aiosqlite.Connection, thread_ids: Set[str]) -> int:
+    params = [(thread_id,) for thread_id in thread_ids]
+    cursor = await conn.executemany(
+        "DELETE FROM checkpoints WHERE thread_id = ?", params
+    )
+    deleted = cursor.rowcount
+    await conn.executemany("DELETE FROM writes WHERE thread_id = ?", params)
+    return deleted
+
+
+async def delete_thread(thread_id: str) -> None:
+    """Remove all checkpoints of a thread (e.g. of a deleted chat session)."""
+    async with _connection() as conn:
+        if await _has_tables(conn):
+            await _delete_threads(conn, {thread_id})
+            await conn.commit()
+
+
+async def compact_checkpoints(
+    keep: Optional[int] = None, live_threads: Optional[Set[str]] = None
+) -> Dict[str, Any]:
+    """
+    Prune old checkpoints and reclaim the space they used.
+
+    Args:
+        keep: Checkpoints kept per thread (CHECKPOINT_KEEP_PER_THREAD if None)
+        live_threads: Thread IDs still in use; others are removed entirely.
+            No threads are removed when None.
+
+    Returns:
+        Dict[str, Any]: Counts of removed threads, checkpoints and writes
+    """
+    if keep is None:
+        keep = env_int("CHECKPOINT_KEEP_PER_THREAD", DEFAULT_KEEP_PER_THREAD, minimum=1)
+    keep = max(1, keep)
+    started = time.perf_counter()
+    size_before = _file_size()
+    result: Dict[str, Any] = {
+        "threads_removed": 0,
+        "checkpoints_removed": 0,
+        "writes_removed": 0,
+    }
+
+    async with _connection() as conn:
+        if not await _has_tables(conn):
+            return result
+
+        if live_threads is not None:
+            cursor = await conn.execute("SELECT DISTINCT thread_id FROM checkpoints")
+            orphaned = {row[0] for row in await cursor.fetchall()} - live_threads
+            if orphaned:
+                result["threads_removed"] = len(orphaned)
+                result["checkpoints_removed"] += await _delete_threads(conn, orphaned)
+
+        cursor = await conn.execute(
+            """
+            DELETE FROM checkpoints
+            WHERE (thread_id, checkpoint_ns, checkpoint_id) IN (
+                SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                    SELECT thread_id, checkpoint_ns, checkpoint_id,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns
+                            ORDER BY checkpoint_id DESC
+                        ) AS position
+                    FROM checkpoints
+                ) WHERE position > ?
+            )
+            """,
+            (keep,),
+        )
+        result["checkpoints_removed"] += cursor.rowcount
+
+        cursor = await conn.execute(
+            """
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints AS c
+                WHERE c.thread_id = writes.thread_id
+                    AND c.checkpoint_ns = writes.checkpoint_ns
+                    AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """
+        )
+        result["writes_removed"] = cursor.rowcount
+        await conn.commit()
+
+        if await _is_incremental(conn):
+            # The pragma frees pages as its result rows are stepped through
+            cursor = await conn.execute("PRAGMA incremental_vacuum")
+            await cursor.fetchall()
+        await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    result["bytes_before"] = size_before
+    result["bytes_after"] = _file_size()
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def _is_incremental(conn: aiosqlite.Connection) -> bool:
+    cursor = await conn.execute("PRAGMA auto_vacuum")
+    row = await cursor.fetchone()
+    return bool(row and row[0] == 2)
+
+
+async def convert_checkpoint_file() -> bool:
+    """
+    Switch an existing checkpoint file to incremental auto-vacuum.
+
+    Runs a full VACUUM, which locks the file: call it only while nothing else
+    uses the file (the API does so at startup, before serving chats).
+
+    Returns:
+        bool: True if the file was converted
+    """
+    if not os.path.exists(LANGGRAPH_CHECKPOINT_FILE):
+        return False
+    async with _connection() as conn:
+        if not await _has_tables(conn) or await _is_incremental(conn):
+            return False
+        logger.info("Converting checkpoint file to incremental auto-vacuum")
+        started = time.perf_counter()
+        await conn.execute("VACUUM")
+        logger.info(
+            f"Converted checkpoint file in {time.perf_counter() - started:.1f}s"
+        )
+    return True
+
+
+def _file_size() -> int:
+    size = 0
+    for suffix in ("", "-wal"):
+        path = f"{LANGGRAPH_CHECKPOINT_FILE}{suffix}"
+        if os.path.exists(path):
+            size += os.path.getsize(path)
+    return size
+
+
+async def _live_thread_ids() -> Optional[Set[str]]:
+    from open_notebook.database.repository import repo_query
+
+    try:
+        ids = await repo_query("SELECT VALUE id FROM chat_session")
+    except Exception as e:
+        # Without the session list no thread can safely be considered deleted
+        logger.warning(f"Failed to load chat sessions for checkpoint compaction: {e}")
+        return None
+    return {str(session_id) for session_id in ids or []}
+
+
+class CheckpointCompactor:
+    """Runs checkpoint compaction in the background at a fixed interval."""
+
+    def __init__(self):
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        interval = env_int(
+            "CHECKPOINT_COMPACTION_INTERVAL", DEFAULT_COMPACTION_INTERVAL
+        )
+        if interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run(interval))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run_once(self) -> Dict[str, Any]:
+        result = await compact_checkpoints(live_threads=await _live_thread_ids())
+        result["finished"] = time.time()
+        self.last_run = result
+        logger.info(f"Compacted chat checkpoints: {result}")
+        return result
+
+    async def _run(self, interval: int) -> None:
+        while True:
+            # Sleep first: right after startup the graphs are opening connections
+            await asyncio.sleep(interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Checkpoint compaction failed: {e}")
+
+
+checkpoint_compactor = CheckpointCompactor()
+
+
+async def checkpoint_stats() -> Dict[str, Any]:
+    """Size of the checkpoint file, its contents and checkpoint write latency."""
+    latencies = sorted(_write_latencies)
+
+    def percentile(p: float) -> Optional[float]:
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(p * len(latencies)))
+        return round(latencies[index] * 1000, 2)
+
+    stats: Dict[str, Any] = {
+        "file_bytes": _file_size(),
+        "threads": None,
+        "checkpoints": None,
+        "writes": None,
+        "write_samples": len(latencies),
+        "write_p50_ms": percentile(0.5),
+        "write_p99_ms": percentile(0.99),
+        "write_max_ms": percentile(1.0),
+        "keep_per_thread": env_int(
+            "CHECKPOINT_KEEP_PER_THREAD", DEFAULT_KEEP_PER_THREAD, minimum=1
+        ),
+        "last_compaction": checkpoint_compactor.last_run,
+    }
+    async with _connection() as conn:
+        if await _has_tables(conn):
+            cursor = await conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+            )
+            row = await cursor.fetchone()
+            if row:
+                stats["threads"], stats["checkpoints"] = row
+            cursor = await conn.execute("SELECT COUNT(*) FROM writes")
+            row = await cursor.fetchone()
+            stats["writes"] = row[0] if row else None
+    return stats
@@ -0,0 +1,82 @@
+"""
+Provider prompt caching for the chat graphs.
+
+Providers cache the longest prompt prefix they have seen recently and bill
+(and process) cached input tokens at a fraction of the cost, so the chat
+prompts are ordered from most to least stable: instructions, then the
+notebook or source context, then the rolling summary, then the messages.
+The first two only change when the user edits the context, and the history
+only grows at its end.
+
+OpenAI, Gemini and most OpenAI-compatible servers cache prefixes
+automatically. Anthropic caches only up to explicit cache_control breakpoints,
+which are set after the stable system prompt and after the last history
+message, so the next turn reads both from the cache.
+
+The cached token counts reported by the provider are added to the turn's
+usage (see token_accounting).
+"""
+
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def supports_cache_control(model: Any) -> bool:
+    """Whether the LangChain model accepts cache_control content blocks."""
+    return "anthropic" in str(getattr(model, "_llm_type", "")).lower()
+
+
+def system_message(stable: str, variable: str, cache: bool) -> SystemMessage:
+    """
+    System message of the stable prompt followed by its variable tail.
+
+    Args:
+        stable: Instructions and context, unchanged between most turns
+        variable: Parts that change from turn to turn (e.g. the summary)
+        cache: Whether to mark the end of the stable part as a cache breakpoint
+    """
+    if not cache:
+        return SystemMessage(content="\n\n".join(p for p in (stable, variable) if p))
+    blocks: List[Any] = [
+        {"type": "text", "text": stable, "cache_control": CACHE_CONTROL}
+    ]
+    if variable:
+        blocks.append({"type": "text", "text": variable})
+    return SystemMessage(content=blocks)
+
+
+def mark_history(messages: List[BaseMessage], cache: bool) -> List[BaseMessage]:
+    """
+    Messages with a cache breakpoint after the history, before the new message.
+
+    The state is not modified: the marked message is a copy with the same ID.
+    """
+    if not cache or len(messages) < 2:
+        return messages
+    last = messages[-2]
+    content = last.content
+    if isinstance(content, str):
+        if not content:
+            return messages
+        blocks: List[Any] = [{"type": "text", "text": content}]
+    elif content and isinstance(content[-1], dict):
+        blocks = list(content[:-1]) + [dict(content[-1])]
+    else:
+        return messages
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+    marked = last.model_copy(update={"content": blocks})
+    return messages[:-2] + [marked, messages[-1]]
+
+
+def cached_usage(reply: BaseMessage) -> Dict[str, Optional[int]]:
+    """Input token counts of a reply as reported by the provider."""
+    usage = getattr(reply, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "provider_input_tokens": usage.get("input_tokens"),
+        "cached_tokens": details.get("cache_read"),
+        "cache_creation_tokens": details.get("cache_creation"),
+    }
@@ -10,6 +10,7 @@ from loguru import logger
 from typing_extensions import Annotated, TypedDict
 
 from open_notebook.ai.models import Model, ModelManager
+from open_notebook.database.write_lock import record_write_lock
 from open_notebook.domain.content_settings import ContentSettings
 from open_notebook.domain.notebook import Asset, Source
 from open_notebook.domain.transformation import Transformation
@@ -95,7 +96,8 @@ async def save_source(state: SourceState) -> dict:
     if content_state.title:
         source.title = content_state.title
 
-    await source.save()
+    async with record_write_lock(state["source_id"]):
+        await source.save()
 
     # NOTE: Notebook associations are created by the API immediately for UI responsiveness
     # No need to create them here to avoid duplicate edges
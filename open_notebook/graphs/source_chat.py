@@ -1,21 +1,31 @@
 import asyncio
 import sqlite3
-from typing import Annotated, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional, Tuple
 
-import aiosqlite
 from ai_prompter import Prompter
-from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
 
 from open_notebook.ai.provision import provision_langchain_model
-from open_notebook.config import LANGGRAPH_CHECKPOINT_FILE
 from open_notebook.domain.notebook import Source, SourceInsight
+from open_notebook.graphs.chat_memory import (
+    current_summary,
+    schedule_summary,
+    select_messages,
+)
+from open_notebook.graphs.checkpoint_store import create_checkpointer
+from open_notebook.graphs.prompt_cache import (
+    mark_history,
+    supports_cache_control,
+    system_message,
+)
+from open_notebook.graphs.token_accounting import PromptTokens, merge_token_counts
 from open_notebook.utils import clean_thinking_content
 from open_notebook.utils.context_builder import ContextBuilder
+from open_notebook.utils.context_snapshot import item_version
 
 
 class SourceChatState(TypedDict):
@@ -26,6 +36,16 @@ class SourceChatState(TypedDict):
     context: Optional[str]
     model_override: Optional[str]
     context_indicators: Optional[Dict[str, List[str]]]
+    # "<source_id>@<version>" the source, insights and context above were built at
+    context_key: Optional[str]
+    # Tokens per message ID, and of the last system prompt ({"hash", "tokens"})
+    token_counts: Annotated[Dict[str, int], merge_token_counts]
+    system_tokens: Optional[dict]
+    # Prompt and completion tokens of the last turn
+    usage: Optional[dict]
+    # Rolling summary of messages[:summarized_count] (see chat_memory)
+    summary: Optional[str]
+    summarized_count: Optional[int]
 
 
 async def call_model_with_source_context(
@@ -35,7 +55,8 @@ async def call_model_with_source_context(
     Main function that builds source context and calls the model.
 
     This function:
-    1. Uses ContextBuilder to build source-specific context
+    1. Uses ContextBuilder to build source-specific context (reused by later
+       turns of the session until the source or its insights change)
     2. Applies the source_chat Jinja2 prompt template
     3. Handles model provisioning with override support
     4. Tracks context indicators for referenced insights/content
@@ -44,41 +65,22 @@ async def call_model_with_source_context(
     if not source_id:
         raise ValueError("source_id is required in state")
 
-    # Build source context using ContextBuilder
-    context_builder = ContextBuilder(
-        source_id=source_id,
-        include_insights=True,
-        include_notes=False,  # Focus on source-specific content
-        max_tokens=50000,  # Reasonable limit for source context
-    )
-    context_data = await context_builder.build()
-
-    # Extract source and insights from context
-    source = None
-    insights = []
-    context_indicators: dict[str, list[str | None]] = {
-        "sources": [],
-        "insights": [],
-        "notes": [],
-    }
-
-    if context_data.get("sources"):
-        source_info = context_data["sources"][0]  # First source
-        source = Source(**source_info) if isinstance(source_info, dict) else source_info
-        context_indicators["sources"].append(source.id)
-
-    if context_data.get("insights"):
-        for insight_data in context_data["insights"]:
-            insight = (
-                SourceInsight(**insight_data)
-                if isinstance(insight_data, dict)
-                else insight_data
-            )
-            insights.append(insight)
-            context_indicators["insights"].append(insight.id)
-
-    # Format context for the prompt
-    formatted_context = _format_source_context(context_data)
+    # Follow-up questions reuse the context while the source and its insights
+    # are unchanged (the version is bumped by database events, see migration 17)
+    version = await item_version(source_id)
+    context_key = f"{source_id}@{version}" if version is not None else None
+    if (
+        context_key
+        and state.get("context_key") == context_key
+        and state.get("context") is not None
+    ):
+        source = state.get("source")
+        insights = state.get("insights") or []
+        formatted_context = state["context"] or ""
+        context_indicators: Dict[str, Any] = state.get("context_indicators") or {}
+    else:
+        built = await _build_source_context(source_id)
+        source, insights, formatted_context, context_indicators = built
 
     # Build prompt data for the template
     prompt_data = {
@@ -88,21 +90,43 @@ async def call_model_with_source_context(
         "context_indicators": context_indicators,
     }
 
-    # Apply the source_chat prompt template
+    # Apply the source_chat prompt template; the summary goes last, since
+    # providers cache the prompt prefix up to the first change
     system_prompt = Prompter(prompt_template="source_chat/system").render(
         data=prompt_data
     )
-    payload = [SystemMessage(content=system_prompt)] + state.get("messages", [])
+    summary = current_summary(state)
+    earlier_conversation = (
+        Prompter(prompt_template="chat/earlier_conversation").render(
+            data={"summary": summary}
+        )
+        if summary
+        else ""
+    )
+    # Recent turns verbatim; older ones are covered by the summary
+    messages = select_messages(state)
+
+    # Only messages new since the last turn are tokenized
+    prompt_tokens = PromptTokens(
+        f"{system_prompt}\n\n{earlier_conversation}", messages, state
+    )
+    if prompt_tokens.needs_count():
+        await prompt_tokens.count()
 
     # Provision model asynchronously
     model = await provision_langchain_model(
-        str(payload),
+        None,
         config.get("configurable", {}).get("model_id")
         or state.get("model_override"),
         "chat",
+        tokens=prompt_tokens.tokens,
         max_tokens=8192,
         streaming=True,
     )
+    cache = supports_cache_control(model)
+    payload = [
+        system_message(system_prompt, earlier_conversation, cache)
+    ] + mark_history(messages, cache)
 
     # Use ainvoke with config to support streaming events
     ai_message = await model.ainvoke(payload, config=config)
@@ -116,6 +140,8 @@ async def call_model_with_source_context(
     cleaned_content = clean_thinking_content(content)
     cleaned_message = ai_message.model_copy(update={"content": cleaned_content})
 
+    schedule_summary(get_source_chat_graph, "source_chat_agent", state, config)
+
     # Update state with context information
     return {
         "messages": cleaned_message,
@@ -123,9 +149,54 @@ async def call_model_with_source_context(
         "insights": insights,
         "context": formatted_context,
         "context_indicators": context_indicators,
+        "context_key": context_key,
+        **(await prompt_tokens.state_update(cleaned_message)),
     }
 
 
+async def _build_source_context(
+    source_id: str,
+) -> Tuple[Optional[Source], List[SourceInsight], str, Dict[str, Any]]:
+    """Load a source and its insights and format them as the prompt context."""
+    # Build source context using ContextBuilder
+    context_builder = ContextBuilder(
+        source_id=source_id,
+        include_insights=True,
+        include_notes=False,  # Focus on source-specific content
+        max_tokens=50000,  # Reasonable limit for source context
+    )
+    context_data = await context_builder.build()
+
+    # Extract source and insights from context
+    source = None
+    insights = []
+    context_indicators: Dict[str, Any] = {
+        "sources": [],
+        "insights": [],
+        "notes": [],
+    }
+
+    if context_data.get("sources"):
+        source_info = context_data["sources"][0]  # First source
+        source = Source(**source_info) if isinstance(source_info, dict) else source_info
+        context_indicators["sources"].append(source.id)
+
+    if context_data.get("insights"):
+        for insight_data in context_data["insights"]:
+            insight = (
+                SourceInsight(**insight_data)
+                if isinstance(insight_data, dict)
+                else insight_data
+            )
+            insights.append(insight)
+            context_indicators["insights"].append(insight.id)
+
+    # Format context for the prompt
+    formatted_context = _format_source_context(context_data)
+
+    return source, insights, formatted_context, context_indicators
+
+
 def _format_source_context(context_data: Dict) -> str:
     """
     Format the context data into a readable string for the prompt.
@@ -182,10 +253,7 @@ def _format_source_context(context_data: Dict) -> str:
 # Create async SQLite checkpointer
 async def get_memory():
     """Get or create the async memory checkpointer"""
-    conn = await aiosqlite.connect(
-        LANGGRAPH_CHECKPOINT_FILE,
-    )
-    return AsyncSqliteSaver(conn)
+    return await create_checkpointer()
 
 
 # Lazy initialization of memory
@@ -0,0 +1,120 @@
+"""
+Incremental prompt token accounting for chat graphs.
+
+Chat turns used to tokenize the whole conversation (str() of every message)
+on each turn, only to decide whether the large context model is needed.
+Instead, each message is tokenized once and its count is kept in the thread
+state (token_counts, keyed by message ID), and the system prompt count is
+kept under the hash of its text. A turn then only has to account for the new
+user message and any changed system prompt.
+
+UTF-8 byte length bounds the token count from above (every token covers at
+least one byte), so when the bound for the uncounted parts is small and the
+total stays below the large context threshold, the model call starts without
+tokenizing anything; the exact counts are computed after the reply.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from open_notebook.ai.provision import LARGE_CONTEXT_TOKENS
+from open_notebook.graphs.prompt_cache import cached_usage
+from open_notebook.utils import atoken_count
+
+# Uncounted text up to this many bytes may be estimated by its byte length
+MAX_ESTIMATED_BYTES = 8192
+
+
+def merge_token_counts(
+    left: Optional[Dict[str, int]], right: Optional[Dict[str, int]]
+) -> Dict[str, int]:
+    """State reducer that adds new per-message token counts to the known ones."""
+    return {**(left or {}), **(right or {})}
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PromptTokens:
+    """Token count of one chat turn's prompt, built from cached counts."""
+
+    def __init__(
+        self, system_prompt: str, messages: List[BaseMessage], state: Mapping[str, Any]
+    ):
+        known_counts = state.get("token_counts") or {}
+        cached_system = state.get("system_tokens") or {}
+
+        self.system_hash = _hash(system_prompt)
+        self.known = 0
+        # (is system prompt, message ID, text) still to be counted
+        self.pending: List[Tuple[bool, Optional[str], str]] = []
+
+        if cached_system.get("hash") == self.system_hash:
+            self.system_tokens: Optional[int] = cached_system.get("tokens")
+            self.known += self.system_tokens or 0
+        else:
+            self.system_tokens = None
+            self.pending.append((True, None, system_prompt))
+
+        for message in messages:
+            if message.id and message.id in known_counts:
+                self.known += known_counts[message.id]
+            else:
+                self.pending.append((False, message.id, _text(message)))
+
+        self.pending_bytes = sum(
+            len(text.encode("utf-8")) for _, _, text in self.pending
+        )
+        self.new_counts: Dict[str, int] = {}
+        self.exact = not self.pending
+
+    @property
+    def tokens(self) -> int:
+        """Exact prompt tokens, or an upper bound until count() has run."""
+        return self.known + (0 if self.exact else self.pending_bytes)
+
+    def needs_count(self) -> bool:
+        """Whether the bound is too loose to select the model or reserve budget."""
+        return not self.exact and (
+            self.pending_bytes > MAX_ESTIMATED_BYTES
+            or self.tokens > LARGE_CONTEXT_TOKENS
+        )
+
+    async def count(self) -> int:
+        """Tokenize the uncounted parts and return the exact prompt tokens."""
+        if not self.exact:
+            for is_system, message_id, text in self.pending:
+                tokens = await atoken_count(text)
+                self.known += tokens
+                if is_system:
+                    self.system_tokens = tokens
+                elif message_id:
+                    self.new_counts[message_id] = tokens
+            self.pending = []
+            self.exact = True
+        return self.known
+
+    async def state_update(self, reply: BaseMessage) -> Dict[str, Any]:
+        """Counts to store in the thread state after the turn, plus its usage."""
+        prompt_tokens = await self.count()
+        completion_tokens = await atoken_count(_text(reply))
+        if reply.id:
+            self.new_counts[reply.id] = completion_tokens
+        return {
+            "token_counts": self.new_counts,
+            "system_tokens": {"hash": self.system_hash, "tokens": self.system_tokens},
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                # Provider-reported input tokens, of which read from its cache
+                **cached_usage(reply),
+            },
+        }
@@ -1,13 +1,29 @@
+import asyncio
+from typing import List, Optional
+
 from ai_prompter import Prompter
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
+from loguru import logger
 from typing_extensions import TypedDict
 
+from open_notebook.ai.models import model_manager
 from open_notebook.ai.provision import provision_langchain_model
+from open_notebook.config import env_int
+from open_notebook.database.transformation_cache import cached_transformation
 from open_notebook.domain.notebook import Source
 from open_notebook.domain.transformation import DefaultPrompts, Transformation
-from open_notebook.utils import clean_thinking_content
+from open_notebook.utils import atoken_count, clean_thinking_content, token_count
+from open_notebook.utils.chunking import ChunkingConfig, ContentType, achunk_text
+
+# Content above this many tokens is transformed section by section (map) and
+# the partial results are combined (reduce), instead of in one call that would
+# need the large context model. Matches the threshold in provision_langchain_model.
+MAP_REDUCE_THRESHOLD = 105_000
+DEFAULT_SEGMENT_TOKENS = 30_000
+DEFAULT_MAP_CONCURRENCY = 4
+MAX_OUTPUT_TOKENS = 5055
 
 
 class TransformationState(TypedDict):
@@ -15,6 +31,103 @@ class TransformationState(TypedDict):
     source: Source
     transformation: Transformation
     output: str
+    cached: bool
+
+
+async def _invoke(system_prompt: str, content: str, model_id: Optional[str]) -> str:
+    payload = [SystemMessage(content=system_prompt), HumanMessage(content=content)]
+    chain = await provision_langchain_model(
+        str(payload),
+        model_id,
+        "transformation",
+        max_tokens=MAX_OUTPUT_TOKENS,
+    )
+
+    response = await chain.ainvoke(payload)
+
+    # Clean thinking content from the response
+    response_content = (
+        response.content if isinstance(response.content, str) else str(response.content)
+    )
+    return clean_thinking_content(response_content)
+
+
+def _group_by_tokens(parts: List[str], max_tokens: int) -> List[List[str]]:
+    """Group consecutive parts into batches of at most max_tokens (one part minimum)."""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for part in parts:
+        tokens = token_count(part)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(part)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _map_reduce(system_prompt: str, content: str, model_id: Optional[str]) -> str:
+    """
+    Transform content that does not fit a regular context window.
+
+    The content is split at paragraph (or line, sentence) boundaries into
+    non-overlapping segments of at most TRANSFORMATION_SEGMENT_TOKENS, every segment is transformed with the same
+    prompt (at most TRANSFORMATION_MAP_CONCURRENCY at a time), and the partial
+    results are combined with the transformation/reduce prompt. If the partial
+    results are themselves too large, they are reduced in groups first.
+    """
+    segment_tokens = env_int(
+        "TRANSFORMATION_SEGMENT_TOKENS", DEFAULT_SEGMENT_TOKENS, minimum=1
+    )
+    semaphore = asyncio.Semaphore(
+        env_int("TRANSFORMATION_MAP_CONCURRENCY", DEFAULT_MAP_CONCURRENCY, minimum=1)
+    )
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    # No overlap: every part of the content is transformed exactly once
+    segments = await achunk_text(
+        content,
+        ContentType.PLAIN,
+        config=ChunkingConfig(
+            mode="tokens", chunk_size=segment_tokens, chunk_overlap=0
+        ),
+    )
+    logger.info(
+        f"Transforming {len(segments)} segments of up to {segment_tokens} tokens "
+        f"with map-reduce"
+    )
+    partials = await asyncio.gather(
+        *(bounded(_invoke(system_prompt, segment, model_id)) for segment in segments)
+    )
+    partials = [partial for partial in partials if partial.strip()]
+
+    while len(partials) > 1:
+        groups = _group_by_tokens(partials, segment_tokens)
+        if len(groups) == len(partials):
+            # Every partial fills a group on its own - pair them up to converge
+            groups = [partials[i : i + 2] for i in range(0, len(partials), 2)]
+        reduce_prompts = [
+            Prompter(prompt_template="transformation/reduce").render(
+                data={"instructions": system_prompt, "partials": group}
+            )
+            for group in groups
+        ]
+        partials = await asyncio.gather(
+            *(
+                bounded(
+                    _invoke(reduce_prompt, "Combine the partial results.", model_id)
+                )
+                for reduce_prompt in reduce_prompts
+            )
+        )
+
+    return partials[0] if partials else ""
 
 
 async def run_transformation(state: dict, config: RunnableConfig) -> dict:
@@ -36,27 +149,35 @@ async def run_transformation(state: dict, config: RunnableConfig) -> dict:
         data=state
     )
     content_str = str(content) if content else ""
-    payload = [SystemMessage(content=system_prompt), HumanMessage(content=content_str)]
-    chain = await provision_langchain_model(
-        str(payload),
-        config.get("configurable", {}).get("model_id"),
-        "transformation",
-        max_tokens=5055,
-    )
+    configurable = config.get("configurable", {})
+    model_id = configurable.get("model_id")
 
-    response = await chain.ainvoke(payload)
+    async def compute() -> str:
+        if await atoken_count(content_str) > MAP_REDUCE_THRESHOLD:
+            return await _map_reduce(system_prompt, content_str, model_id)
+        return await _invoke(system_prompt, content_str, model_id)
 
-    # Clean thinking content from the response
-    response_content = (
-        response.content if isinstance(response.content, str) else str(response.content)
+    # Key the cache by the model that will actually run, not "default"
+    effective_model_id = model_id
+    if not effective_model_id:
+        defaults = await model_manager.get_defaults()
+        effective_model_id = (
+            defaults.default_transformation_model or defaults.default_chat_model
+        )
+    cleaned_content, cached = await cached_transformation(
+        system_prompt,
+        content_str,
+        str(effective_model_id),
+        compute,
+        bypass_cache=bool(configurable.get("bypass_cache")),
     )
-    cleaned_content = clean_thinking_content(response_content)
 
     if source:
         await source.add_insight(transformation.title, cleaned_content)
 
     return {
         "output": cleaned_content,
+        "cached": cached,
     }
 
 
@@ -5,16 +5,21 @@ To avoid circular imports, import functions directly:
 - from open_notebook.utils.context_builder import ContextBuilder
 - from open_notebook.utils import token_count, compare_versions
 - from open_notebook.utils.chunking import chunk_text, detect_content_type, ContentType
+- from open_notebook.utils.offload import run_offloaded, loop_lag_monitor
 - from open_notebook.utils.embedding import generate_embedding, generate_embeddings
 """
 
 from .chunking import (
     CHUNK_SIZE,
+    ChunkingConfig,
     ContentType,
+    achunk_text,
+    aiter_chunks,
     chunk_text,
     detect_content_type,
     detect_content_type_from_extension,
     detect_content_type_from_heuristics,
+    iter_chunks,
 )
 from .embedding import (
     generate_embedding,
@@ -27,7 +32,7 @@ from .text_utils import (
     remove_non_ascii,
     remove_non_printable,
 )
-from .token_utils import token_cost, token_count
+from .token_utils import atoken_count, token_cost, token_count
 from .version_utils import (
     compare_versions,
     get_installed_version,
@@ -37,8 +42,12 @@ from .version_utils import (
 __all__ = [
     # Chunking
     "CHUNK_SIZE",
+    "ChunkingConfig",
     "ContentType",
+    "achunk_text",
+    "aiter_chunks",
     "chunk_text",
+    "iter_chunks",
     "detect_content_type",
     "detect_content_type_from_extension",
     "detect_content_type_from_heuristics",
@@ -53,6 +62,7 @@ __all__ = [
     "clean_thinking_content",
     # Token utils
     "token_count",
+    "atoken_count",
     "token_cost",
     # Version utils
     "compare_versions",
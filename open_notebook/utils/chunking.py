@@ -7,12 +7,19 @@ Supports HTML, Markdown, and plain text with appropriate splitters for each type
 Key functions:
 - detect_content_type(): Detects content type from file extension or content heuristics
 - chunk_text(): Splits text into chunks using appropriate splitter for content type
+- achunk_text(): chunk_text() off the event loop for large inputs
+- iter_chunks() / aiter_chunks(): Stream chunks of very large texts section by section
+
+Chunk sizes default to CHUNK_SIZE/CHUNK_OVERLAP characters. A ChunkingConfig in
+"tokens" mode packs chunks up to a token budget instead (see
+open_notebook.utils.embedding.get_chunking_config for the per-model settings).
 """
 
 import re
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Iterator, List, Literal, Optional, Tuple
 
 from langchain_text_splitters import (
     HTMLHeaderTextSplitter,
@@ -21,10 +28,39 @@ from langchain_text_splitters import (
 )
 from loguru import logger
 
+from .offload import run_offloaded
+from .token_utils import token_count
+
 # Constants
 CHUNK_SIZE = 1200  # characters
 CHUNK_OVERLAP = 180  # 15% of chunk size
 HIGH_CONFIDENCE_THRESHOLD = 0.8  # Threshold for heuristics to override extension
+STREAM_SECTION_SIZE = (
+    100_000  # characters handed to the splitters at once when streaming
+)
+
+
+@dataclass(frozen=True)
+class ChunkingConfig:
+    """Chunk size and overlap, measured in characters or in tokens."""
+
+    mode: Literal["characters", "tokens"] = "characters"
+    chunk_size: int = CHUNK_SIZE
+    chunk_overlap: int = CHUNK_OVERLAP
+
+    def length(self, text: str) -> int:
+        return token_count(text) if self.mode == "tokens" else len(text)
+
+    def fits(self, text: str) -> bool:
+        """True if text fits in a single chunk."""
+        if self.mode == "characters":
+            return len(text) <= self.chunk_size
+        # Tokens are almost never longer than 8 characters, so skip counting
+        # texts that are far too long anyway
+        return len(text) <= self.chunk_size * 8 and token_count(text) <= self.chunk_size
+
+
+DEFAULT_CHUNKING = ChunkingConfig()
 
 
 class ContentType(Enum):
@@ -288,27 +324,31 @@ def _get_markdown_splitter() -> MarkdownHeaderTextSplitter:
     )
 
 
-def _get_plain_splitter() -> RecursiveCharacterTextSplitter:
-    """Get plain text splitter using CHUNK_SIZE and CHUNK_OVERLAP constants."""
+def _get_plain_splitter(
+    config: ChunkingConfig = DEFAULT_CHUNKING,
+) -> RecursiveCharacterTextSplitter:
+    """Get plain text splitter using the configured chunk size and overlap."""
     return RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        length_function=len,
+        chunk_size=config.chunk_size,
+        chunk_overlap=config.chunk_overlap,
+        length_function=config.length,
         separators=["\n\n", "\n", ". ", ", ", " ", ""],
     )
 
 
-def _apply_secondary_chunking(chunks: List[str]) -> List[str]:
+def _apply_secondary_chunking(
+    chunks: List[str], config: ChunkingConfig = DEFAULT_CHUNKING
+) -> List[str]:
     """
-    Apply secondary chunking to ensure no chunk exceeds CHUNK_SIZE.
+    Apply secondary chunking to ensure no chunk exceeds the chunk size.
 
     Used when primary splitters (HTML/Markdown) produce oversized chunks.
     """
     result = []
-    secondary_splitter = _get_plain_splitter()
+    secondary_splitter = _get_plain_splitter(config)
 
     for chunk in chunks:
-        if len(chunk) > CHUNK_SIZE:
+        if not config.fits(chunk):
             # Split oversized chunk
             sub_chunks = secondary_splitter.split_text(chunk)
             result.extend(sub_chunks)
@@ -322,6 +362,7 @@ def chunk_text(
     text: str,
     content_type: Optional[ContentType] = None,
     file_path: Optional[str] = None,
+    config: Optional[ChunkingConfig] = None,
 ) -> List[str]:
     """
     Split text into chunks using appropriate splitter for content type.
@@ -330,15 +371,18 @@ def chunk_text(
         text: The text to chunk
         content_type: Optional explicit content type (auto-detected if not provided)
         file_path: Optional file path for content type detection
+        config: Chunk size and overlap (CHUNK_SIZE/CHUNK_OVERLAP characters if None)
 
     Returns:
-        List of text chunks, each <= CHUNK_SIZE characters
+        List of text chunks, each within the configured chunk size
     """
     if not text or not text.strip():
         return []
 
+    config = config or DEFAULT_CHUNKING
+
     # Short text doesn't need chunking
-    if len(text) <= CHUNK_SIZE:
+    if config.fits(text):
         return [text]
 
     # Detect content type if not provided
@@ -366,15 +410,117 @@ def chunk_text(
         ]
     else:
         # Plain text - use recursive splitter directly
-        splitter = _get_plain_splitter()
+        splitter = _get_plain_splitter(config)
         chunks = splitter.split_text(text)
 
     # Apply secondary chunking if needed (for HTML/Markdown that may produce large chunks)
     if content_type in (ContentType.HTML, ContentType.MARKDOWN):
-        chunks = _apply_secondary_chunking(chunks)
+        chunks = _apply_secondary_chunking(chunks, config)
 
     # Filter out empty chunks
     chunks = [c.strip() for c in chunks if c and c.strip()]
 
     logger.debug(f"Created {len(chunks)} chunks from {len(text)} characters")
     return chunks
+
+
+async def achunk_text(
+    text: str,
+    content_type: Optional[ContentType] = None,
+    file_path: Optional[str] = None,
+    config: Optional[ChunkingConfig] = None,
+) -> List[str]:
+    """chunk_text() that runs off the event loop for large inputs."""
+    return await run_offloaded(
+        chunk_text, text, content_type, file_path, config, size=len(text or "")
+    )
+
+
+# Section boundaries for streaming, by preference: (separator, cut offset within it)
+_SECTION_BOUNDARIES = {
+    ContentType.MARKDOWN: [
+        ("\n# ", 1),
+        ("\n## ", 1),
+        ("\n### ", 1),
+        ("\n\n", 2),
+        ("\n", 1),
+    ],
+    ContentType.HTML: [("<h1", 0), ("<h2", 0), ("<h3", 0), ("\n<", 1), ("><", 1)],
+    ContentType.PLAIN: [("\n\n", 2), ("\n", 1), (". ", 2), (" ", 1)],
+}
+
+
+def _iter_sections(
+    text: str, content_type: ContentType, section_size: int
+) -> Iterator[str]:
+    """
+    Cut text into sections of at most section_size characters.
+
+    Each section ends at the strongest boundary (header, paragraph, line, ...)
+    found in its second half, so the splitters see whole structural units.
+    """
+    start = 0
+    while start < len(text):
+        end = min(start + section_size, len(text))
+        if end < len(text):
+            for separator, offset in _SECTION_BOUNDARIES[content_type]:
+                pos = text.rfind(separator, start + section_size // 2, end)
+                if pos != -1:
+                    end = pos + offset
+                    break
+        yield text[start:end]
+        start = end
+
+
+def iter_chunks(
+    text: str,
+    content_type: Optional[ContentType] = None,
+    file_path: Optional[str] = None,
+    section_size: int = STREAM_SECTION_SIZE,
+    config: Optional[ChunkingConfig] = None,
+) -> Iterator[str]:
+    """
+    Yield the chunks of a text without materializing them all.
+
+    Unlike chunk_text(), the splitters only ever see one section of at most
+    section_size characters, so memory held besides the text itself is bounded
+    by the section size. Texts shorter than a section produce exactly the
+    chunks chunk_text() would.
+
+    Args:
+        text: The text to chunk
+        content_type: Optional explicit content type (detected from the first
+            section if not provided)
+        file_path: Optional file path for content type detection
+        section_size: Lookahead in characters
+        config: Chunk size and overlap (CHUNK_SIZE/CHUNK_OVERLAP characters if None)
+    """
+    if not text or not text.strip():
+        return
+    if content_type is None:
+        content_type = detect_content_type(text[:section_size], file_path)
+    for section in _iter_sections(text, content_type, section_size):
+        yield from chunk_text(section, content_type=content_type, config=config)
+
+
+async def aiter_chunks(
+    text: str,
+    content_type: Optional[ContentType] = None,
+    file_path: Optional[str] = None,
+    section_size: int = STREAM_SECTION_SIZE,
+    config: Optional[ChunkingConfig] = None,
+) -> AsyncIterator[str]:
+    """iter_chunks() with each section split off the event loop."""
+    if not text or not text.strip():
+        return
+    if content_type is None:
+        sample = text[:section_size]
+        content_type = await run_offloaded(
+            detect_content_type, sample, file_path, size=len(sample)
+        )
+    for section in _iter_sections(text, content_type, section_size):
+        chunks = await run_offloaded(
+            chunk_text, section, content_type, None, config, size=len(section)
+        )
+        for chunk in chunks:
+            yield chunk
@@ -0,0 +1,230 @@
+"""
+Materialized notebook context for chat.
+
+Building the chat context used to load every selected source (with its
+insights) and note and tokenize the result on each message, although the
+notebook rarely changes between turns. The rendered context of each item is
+now kept in a context_snapshot record together with its token count, so a
+request reads all of them in one query and only renders items that changed.
+
+Database events (migration 17) bump a snapshot's version when its source, one
+of the source's insights or its note changes, and delete it when the item is
+deleted. A snapshot is fresh while its rendered_version equals its version;
+since the version is read before rendering, an edit made during rendering
+leaves the new snapshot stale rather than hiding the edit.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from loguru import logger
+from surrealdb import RecordID
+
+from open_notebook.database.repository import ensure_record_id, repo_query
+from open_notebook.domain.notebook import Note, Source
+
+from .token_utils import atoken_count
+
+ContextSize = Literal["short", "long"]
+
+
+@dataclass
+class NotebookContext:
+    """Context items of a notebook for one context configuration."""
+
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    notes: List[Dict[str, Any]] = field(default_factory=list)
+    total_tokens: int = 0
+    char_count: int = 0
+    # Changes whenever any included item's context changes
+    version: str = ""
+    # Items rendered because their snapshot was missing or stale
+    rendered: int = 0
+
+
+def _selection(context_config: Dict[str, Any]) -> List[Tuple[str, ContextSize]]:
+    """(item ID, context size) pairs selected by a context configuration."""
+    selected: List[Tuple[str, ContextSize]] = []
+    for source_id, status in (context_config.get("sources") or {}).items():
+        if "not in" in status:
+            continue
+        item_id = (
+            source_id if source_id.startswith("source:") else f"source:{source_id}"
+        )
+        if "insights" in status:
+            selected.append((item_id, "short"))
+        elif "full content" in status:
+            selected.append((item_id, "long"))
+    for note_id, status in (context_config.get("notes") or {}).items():
+        if "not in" in status:
+            continue
+        item_id = note_id if note_id.startswith("note:") else f"note:{note_id}"
+        if "full content" in status:
+            selected.append((item_id, "long"))
+    return selected
+
+
+async def _read_notebook(
+    notebook_id: str,
+) -> Tuple[List[Tuple[str, ContextSize]], Dict[str, Dict[str, Any]]]:
+    """All items of a notebook (newest first, short context) and their snapshots."""
+    result = await repo_query(
+        """
+        RETURN {
+            sources: (
+                SELECT in AS item, in.updated AS updated,
+                    (SELECT * FROM type::thing("context_snapshot", <string> $parent.in))[0]
+                        AS snapshot
+                FROM reference WHERE out = $notebook ORDER BY updated DESC
+            ),
+            notes: (
+                SELECT in AS item, in.updated AS updated,
+                    (SELECT * FROM type::thing("context_snapshot", <string> $parent.in))[0]
+                        AS snapshot
+                FROM artifact WHERE out = $notebook ORDER BY updated DESC
+            )
+        }
+        """,
+        {"notebook": ensure_record_id(notebook_id)},
+    )
+    # RETURN yields the object itself rather than a list of rows
+    data: Dict[str, Any] = (
+        result if isinstance(result, dict) else result[0] if result else {}
+    )
+    selected: List[Tuple[str, ContextSize]] = []
+    snapshots: Dict[str, Dict[str, Any]] = {}
+    for row in (data.get("sources") or []) + (data.get("notes") or []):
+        item_id = str(row["item"])
+        selected.append((item_id, "short"))
+        if row.get("snapshot"):
+            snapshots[item_id] = row["snapshot"]
+    return selected, snapshots
+
+
+async def _read_snapshots(item_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    rows = await repo_query(
+        "SELECT * FROM $ids",
+        {"ids": [RecordID("context_snapshot", item_id) for item_id in item_ids]},
+    )
+    return {str(row["item"]): row for row in rows or [] if row.get("item")}
+
+
+async def item_version(item_id: str) -> Optional[int]:
+    """
+    Version of a source's or note's context, changed by every edit of the item
+    (or of a source's insights); None if it could not be read.
+    """
+    try:
+        versions = await repo_query(
+            'SELECT VALUE version FROM type::thing("context_snapshot", $key)',
+            {"key": item_id},
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read context version of {item_id}: {e}")
+        return None
+    version: Any = versions[0] if versions else None
+    # No snapshot yet: the item has not changed since migration 17
+    return int(version or 0)
+
+
+async def _render(item_id: str, size: ContextSize) -> Dict[str, Any]:
+    if item_id.startswith("source:"):
+        source = await Source.get(item_id)
+        return await source.get_context(context_size=size)
+    note = await Note.get(item_id)
+    return note.get_context(context_size=size)
+
+
+async def _store(
+    item_id: str,
+    size: ContextSize,
+    context: Dict[str, Any],
+    tokens: int,
+    version: int,
+    snapshot: Optional[Dict[str, Any]],
+) -> None:
+    other: ContextSize = "long" if size == "short" else "short"
+    data: Dict[str, Any] = {
+        "item": ensure_record_id(item_id),
+        "rendered_version": version,
+        size: context,
+        f"{size}_tokens": tokens,
+    }
+    # The other size was rendered at another version, so it is stale now
+    if snapshot is None or snapshot.get("rendered_version") != version:
+        data[other] = None
+        data[f"{other}_tokens"] = None
+    await repo_query(
+        'UPSERT type::thing("context_snapshot", $key) MERGE $data',
+        {"key": item_id, "data": data},
+    )
+
+
+async def build_notebook_context(
+    notebook_id: str, context_config: Optional[Dict[str, Any]] = None
+) -> NotebookContext:
+    """
+    Context of a notebook for a context configuration, from snapshots.
+
+    Args:
+        notebook_id: Notebook the context is for
+        context_config: {"sources": {id: status}, "notes": {id: status}}; if None,
+            all sources and notes of the notebook with short context
+
+    Returns:
+        NotebookContext: Source and note contexts with their total token count
+    """
+    if context_config is None:
+        selected, snapshots = await _read_notebook(notebook_id)
+    else:
+        selected = _selection(context_config)
+        snapshots = (
+            await _read_snapshots(list({item_id for item_id, _ in selected}))
+            if selected
+            else {}
+        )
+
+    context = NotebookContext()
+    stamps = []
+    for item_id, size in selected:
+        snapshot = snapshots.get(item_id)
+        version = (snapshot or {}).get("version") or 0
+        stamps.append(f"{item_id}@{version}")
+
+        if (
+            snapshot
+            and snapshot.get("rendered_version") == version
+            and snapshot.get(size) is not None
+        ):
+            item_context = snapshot[size]
+            tokens = snapshot.get(f"{size}_tokens") or 0
+        else:
+            try:
+                item_context = await _render(item_id, size)
+            except Exception as e:
+                logger.warning(f"Error processing {item_id}: {str(e)}")
+                continue
+            tokens = await atoken_count(str(item_context))
+            try:
+                await _store(item_id, size, item_context, tokens, version, snapshot)
+            except Exception as e:
+                # The snapshot is an optimization only - the context is still valid
+                logger.warning(f"Failed to store context snapshot of {item_id}: {e}")
+            context.rendered += 1
+
+        if item_id.startswith("source:"):
+            context.sources.append(item_context)
+        else:
+            context.notes.append(item_context)
+        context.total_tokens += tokens
+        context.char_count += len(str(item_context))
+
+    stamp = hashlib.sha256("|".join(stamps).encode("utf-8")).hexdigest()
+    context.version = stamp[:16]
+    if context.rendered:
+        logger.debug(
+            f"Rendered {context.rendered} of {len(selected)} context items "
+            f"for {notebook_id}"
+        )
+    return context
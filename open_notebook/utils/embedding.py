@@ -5,19 +5,31 @@ Provides centralized embedding generation with support for:
 - Single text embedding (with automatic chunking and mean pooling for large texts)
 - Batch text embedding (multiple texts in a single API call)
 - Mean pooling for combining multiple embeddings into one
+- Per-model chunking settings (character or token budgets)
 
 All embedding operations in the application should use these functions
 to ensure consistent behavior and proper handling of large content.
 """
 
-from typing import List, Optional
+import json
+import os
+from typing import Any, Dict, List, Optional
 
 import numpy as np
+from esperanto import EmbeddingModel
 from loguru import logger
 
-from open_notebook.ai.models import model_manager
+from open_notebook.ai.models import Model, model_manager
+from open_notebook.ai.rate_limit import acquire_for_model
 
-from .chunking import CHUNK_SIZE, ContentType, chunk_text
+from .chunking import (
+    CHUNK_SIZE,
+    DEFAULT_CHUNKING,
+    ChunkingConfig,
+    ContentType,
+    achunk_text,
+)
+from .offload import run_offloaded
 
 
 async def mean_pool_embeddings(embeddings: List[List[float]]) -> List[float]:
@@ -41,6 +53,12 @@ async def mean_pool_embeddings(embeddings: List[List[float]]) -> List[float]:
     Raises:
         ValueError: If embeddings list is empty or embeddings have different dimensions
     """
+    return await run_offloaded(
+        _mean_pool, embeddings, size=sum(len(e) for e in embeddings)
+    )
+
+
+def _mean_pool(embeddings: List[List[float]]) -> List[float]:
     if not embeddings:
         raise ValueError("Cannot mean pool empty list of embeddings")
 
@@ -76,7 +94,145 @@ async def mean_pool_embeddings(embeddings: List[List[float]]) -> List[float]:
     return mean.tolist()
 
 
-async def generate_embeddings(texts: List[str]) -> List[List[float]]:
+DEFAULT_CHUNK_TOKENS = 512
+DEFAULT_CHUNK_OVERLAP_TOKENS = 64
+
+# Longest input (in tokens) of common embedding models, matched as a substring of
+# the lower-cased model name. Token budgets are capped to it.
+EMBEDDING_MODEL_MAX_TOKENS = {
+    "text-embedding-3": 8191,
+    "text-embedding-ada-002": 8191,
+    "text-embedding-004": 2048,
+    "gemini-embedding": 2048,
+    "text-embedding-v": 8192,
+    "mistral-embed": 8192,
+    "voyage": 32000,
+    "nomic-embed-text": 8192,
+    "bge-m3": 8192,
+    "bge-": 512,
+    "mxbai-embed-large": 512,
+    "all-minilm": 256,
+    "embed-english": 512,
+    "embed-multilingual": 512,
+}
+
+
+def _model_max_tokens(model_name: str) -> Optional[int]:
+    name = model_name.lower()
+    for key in sorted(EMBEDDING_MODEL_MAX_TOKENS, key=len, reverse=True):
+        if key in name:
+            return EMBEDDING_MODEL_MAX_TOKENS[key]
+    return None
+
+
+def _setting_int(
+    settings: Dict[str, Any],
+    key: str,
+    env_name: Optional[str],
+    default: int,
+    minimum: int = 0,
+) -> int:
+    """Integer chunking setting: per-model value, then environment, then default."""
+    name, value = f"EMBEDDING_CHUNKING {key}", settings.get(key)
+    if value is None and env_name:
+        name, value = env_name, os.environ.get(env_name)
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = minimum - 1
+    if number < minimum:
+        logger.warning(f"Ignoring invalid {name} value {value!r}")
+        return default
+    return number
+
+
+def resolve_chunking_config(provider: str, model_name: str) -> ChunkingConfig:
+    """
+    Chunking settings for an embedding model.
+
+    Configuration (environment variables):
+    - EMBEDDING_CHUNK_MODE: "characters" (default, CHUNK_SIZE/CHUNK_OVERLAP) or
+      "tokens" to pack chunks up to a token budget
+    - EMBEDDING_CHUNK_TOKENS / EMBEDDING_CHUNK_OVERLAP_TOKENS: the token budget
+      and overlap in "tokens" mode (default 512 / 64)
+    - EMBEDDING_CHUNKING: JSON with per-model settings keyed by "provider/model"
+      or "provider", e.g. {"openai/text-embedding-3-small": {"mode": "tokens",
+      "chunk_size": 1024, "chunk_overlap": 128}}
+
+    Token budgets never exceed the model's input limit when it is known.
+    """
+    settings: Dict[str, Any] = {}
+    raw = os.environ.get("EMBEDDING_CHUNKING")
+    if raw:
+        try:
+            overrides = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Ignoring invalid EMBEDDING_CHUNKING JSON: {e}")
+            overrides = {}
+        for key in (f"{provider}/{model_name}", provider):
+            if isinstance(overrides.get(key), dict):
+                settings = overrides[key]
+                break
+
+    mode = settings.get("mode") or os.environ.get("EMBEDDING_CHUNK_MODE", "characters")
+    if mode != "tokens":
+        return ChunkingConfig(
+            mode="characters",
+            chunk_size=_setting_int(settings, "chunk_size", None, CHUNK_SIZE, 1),
+            chunk_overlap=_setting_int(
+                settings, "chunk_overlap", None, DEFAULT_CHUNKING.chunk_overlap
+            ),
+        )
+
+    chunk_size = _setting_int(
+        settings, "chunk_size", "EMBEDDING_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS, 1
+    )
+    chunk_overlap = _setting_int(
+        settings,
+        "chunk_overlap",
+        "EMBEDDING_CHUNK_OVERLAP_TOKENS",
+        DEFAULT_CHUNK_OVERLAP_TOKENS,
+    )
+    max_tokens = _model_max_tokens(model_name)
+    if max_tokens and chunk_size > max_tokens:
+        chunk_size = max_tokens
+    return ChunkingConfig(
+        mode="tokens",
+        chunk_size=chunk_size,
+        chunk_overlap=min(chunk_overlap, chunk_size // 2),
+    )
+
+
+async def get_chunking_config(model_id: Optional[str] = None) -> ChunkingConfig:
+    """Chunking settings for an embedding model (the configured default if None)."""
+    try:
+        if not model_id:
+            model_id = (await model_manager.get_defaults()).default_embedding_model
+        if not model_id:
+            return DEFAULT_CHUNKING
+        model = await Model.get(model_id)
+        return resolve_chunking_config(model.provider, model.name)
+    except Exception as e:
+        logger.warning(f"Falling back to default chunking for model {model_id}: {e}")
+        return DEFAULT_CHUNKING
+
+
+async def _get_embedding_model(model_id: Optional[str] = None):
+    """Resolve an explicit embedding model, falling back to the configured default."""
+    if not model_id:
+        return await model_manager.get_embedding_model()
+
+    model = await model_manager.get_model(model_id)
+    if model is not None and not isinstance(model, EmbeddingModel):
+        raise ValueError(f"Model '{model_id}' is not an embedding model")
+    return model
+
+
+async def generate_embeddings(
+    texts: List[str], model_id: Optional[str] = None
+) -> List[List[float]]:
     """
     Generate embeddings for multiple texts in a single API call.
 
@@ -85,6 +241,9 @@ async def generate_embeddings(texts: List[str]) -> List[List[float]]:
 
     Args:
         texts: List of text strings to embed
+        model_id: Optional embedding model ID. Defaults to the configured
+            default embedding model (used by shadow re-indexing to embed
+            with the migration target model).
 
     Returns:
         List of embedding vectors, one per input text
@@ -96,7 +255,7 @@ async def generate_embeddings(texts: List[str]) -> List[List[float]]:
     if not texts:
         return []
 
-    embedding_model = await model_manager.get_embedding_model()
+    embedding_model = await _get_embedding_model(model_id)
     if not embedding_model:
         raise ValueError(
             "No embedding model configured. Please configure one in the Models section."
@@ -110,6 +269,9 @@ async def generate_embeddings(texts: List[str]) -> List[List[float]]:
         f"total={sum(text_sizes)} chars)"
     )
 
+    # Queue behind the shared provider budget (~4 characters per token)
+    await acquire_for_model(embedding_model, sum(text_sizes) // 4 + 1)
+
     try:
         # Single API call for all texts
         embeddings = await embedding_model.aembed(texts)
@@ -127,14 +289,15 @@ async def generate_embedding(
     text: str,
     content_type: Optional[ContentType] = None,
     file_path: Optional[str] = None,
+    model_id: Optional[str] = None,
 ) -> List[float]:
     """
     Generate a single embedding for text, handling large content via chunking and mean pooling.
 
-    For short text (<= CHUNK_SIZE):
+    For short text (fits one chunk of the model's chunking config):
         - Embeds directly and returns the embedding
 
-    For long text (> CHUNK_SIZE):
+    For long text:
         - Chunks the text using appropriate splitter for content type
         - Embeds all chunks in a single API call
         - Combines embeddings via mean pooling
@@ -143,6 +306,7 @@ async def generate_embedding(
         text: The text to embed
         content_type: Optional explicit content type for chunking
         file_path: Optional file path for content type detection
+        model_id: Optional embedding model ID (defaults to the configured model)
 
     Returns:
         Single embedding vector (list of floats)
@@ -155,31 +319,34 @@ async def generate_embedding(
         raise ValueError("Cannot generate embedding for empty text")
 
     text = text.strip()
+    config = await get_chunking_config(model_id)
 
     # Check if chunking is needed
-    if len(text) <= CHUNK_SIZE:
+    if await run_offloaded(config.fits, text, size=len(text)):
         # Short text - embed directly
         logger.debug(f"Embedding short text ({len(text)} chars) directly")
-        embeddings = await generate_embeddings([text])
+        embeddings = await generate_embeddings([text], model_id=model_id)
         return embeddings[0]
 
     # Long text - chunk and mean pool
     logger.debug(f"Text exceeds chunk size ({len(text)} chars), chunking...")
 
-    chunks = chunk_text(text, content_type=content_type, file_path=file_path)
+    chunks = await achunk_text(
+        text, content_type=content_type, file_path=file_path, config=config
+    )
 
     if not chunks:
         raise ValueError("Text chunking produced no chunks")
 
     if len(chunks) == 1:
         # Single chunk after splitting
-        embeddings = await generate_embeddings(chunks)
+        embeddings = await generate_embeddings(chunks, model_id=model_id)
         return embeddings[0]
 
     logger.debug(f"Embedding {len(chunks)} chunks and mean pooling")
 
     # Embed all chunks in single API call
-    embeddings = await generate_embeddings(chunks)
+    embeddings = await generate_embeddings(chunks, model_id=model_id)
 
     # Mean pool to get single embedding
     pooled = await mean_pool_embeddings(embeddings)
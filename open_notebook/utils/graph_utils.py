@@ -1,18 +1,38 @@
 from langchain_core.runnables import RunnableConfig
 from loguru import logger
 
-async def get_session_message_count(graph, session_id: str) -> int:
-    """Get message count from LangGraph state, returns 0 on error."""
+
+async def backfill_session_activity(graph, session) -> None:
+    """
+    Fill in message_count/last_message_preview for a session created before
+    they were tracked, from its LangGraph state. Runs once per session.
+    """
+    if session.message_count is not None:
+        return
     try:
-        thread_state = await graph.aget_state( # async version
-            config=RunnableConfig(configurable={"thread_id": session_id})
+        thread_state = await graph.aget_state(
+            config=RunnableConfig(configurable={"thread_id": str(session.id)})
+        )
+        messages = (
+            (thread_state.values or {}).get("messages", []) if thread_state else []
         )
-        if (
-            thread_state
-            and thread_state.values
-            and "messages" in thread_state.values
-        ):
-            return len(thread_state.values["messages"])
+        last_message = messages[-1].content if messages else None
+        await session.record_activity(
+            len(messages),
+            last_message if isinstance(last_message, str) else None,
+            at=session.updated,
+        )
+    except Exception as e:
+        logger.warning(f"Could not backfill activity for session {session.id}: {e}")
+        session.message_count = 0
+
+
+async def delete_session_history(session_id: str) -> None:
+    """Remove the LangGraph checkpoints of a deleted session, logging failures."""
+    from open_notebook.graphs.checkpoint_store import delete_thread
+
+    try:
+        await delete_thread(session_id)
     except Exception as e:
-        logger.warning(f"Could not fetch message count for session {session_id}: {e}")
-    return 0
+        # Leftovers are removed by the next checkpoint compaction
+        logger.warning(f"Could not delete chat history of session {session_id}: {e}")
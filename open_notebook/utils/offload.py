@@ -0,0 +1,141 @@
+"""
+Run CPU-bound text work off the asyncio event loop.
+
+Chunking, tokenizing and cleaning a large document takes long enough to
+stall every other request served by the same event loop (API) or every
+other command running in the same worker. run_offloaded() sends such work to
+a shared executor once the input is larger than OFFLOAD_MIN_SIZE (characters,
+or floats for embeddings), and runs small inputs inline where the executor
+round trip would cost more than the work itself.
+
+Configuration (environment variables):
+- OFFLOAD_MIN_SIZE: inputs at least this large are offloaded (default 20000)
+- OFFLOAD_EXECUTOR: "thread" (default) or "process". tiktoken and numpy
+  release the GIL, so threads suffice for them; "process" also takes the
+  pure-Python splitters off the GIL at the cost of pickling the input.
+- OFFLOAD_WORKERS: executor size (default: CPU count, at most 4)
+
+LoopLagMonitor measures how late the event loop wakes up from a short sleep,
+which is the delay any other coroutine would have seen at that moment.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from loguru import logger
+
+from open_notebook.config import env_int
+
+T = TypeVar("T")
+
+DEFAULT_OFFLOAD_MIN_SIZE = 20_000
+DEFAULT_MAX_WORKERS = 4
+
+_executor: Optional[Executor] = None
+_offloaded = 0
+_inline = 0
+
+
+def get_offload_min_size() -> int:
+    return env_int("OFFLOAD_MIN_SIZE", DEFAULT_OFFLOAD_MIN_SIZE)
+
+
+def get_executor() -> Executor:
+    """Shared executor for offloaded work, created on first use."""
+    global _executor
+    if _executor is None:
+        workers = env_int(
+            "OFFLOAD_WORKERS",
+            min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS),
+            minimum=1,
+        )
+        if os.environ.get("OFFLOAD_EXECUTOR", "thread").lower() == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="offload"
+            )
+        logger.debug(f"Created offload executor {type(_executor).__name__}({workers})")
+    return _executor
+
+
+async def run_offloaded(
+    func: Callable[..., T], *args: Any, size: int, **kwargs: Any
+) -> T:
+    """
+    Call func(*args, **kwargs), in the shared executor if the input is large.
+
+    Args:
+        func: Module-level function (it must be picklable for the process executor)
+        size: Input size in characters (or floats) compared to OFFLOAD_MIN_SIZE
+    """
+    global _offloaded, _inline
+    if size < get_offload_min_size():
+        _inline += 1
+        return func(*args, **kwargs)
+    _offloaded += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+class LoopLagMonitor:
+    """Samples event loop lag in the background and keeps recent statistics."""
+
+    def __init__(self, interval: float = 0.1, window: int = 3000):
+        self.interval = interval
+        # Lag in seconds of the most recent samples (5 minutes at the defaults)
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self._samples.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            if lag > 1.0:
+                logger.warning(f"Event loop was blocked for {lag:.2f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            index = min(len(samples) - 1, int(p * len(samples)))
+            return round(samples[index] * 1000, 1)
+
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "samples": len(samples),
+            "interval_ms": self.interval * 1000,
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 1)
+            if samples
+            else None,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+            "window_max_ms": percentile(1.0),
+            "max_ms": round(self._max_lag * 1000, 1),
+            "offloaded_calls": _offloaded,
+            "inline_calls": _inline,
+            "offload_min_size": get_offload_min_size(),
+        }
+
+
+loop_lag_monitor = LoopLagMonitor()
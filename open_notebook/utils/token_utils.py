@@ -7,6 +7,8 @@ import os
 
 from open_notebook.config import TIKTOKEN_CACHE_DIR
 
+from .offload import run_offloaded
+
 # Set tiktoken cache directory before importing tiktoken to ensure
 # tokenizer encodings are cached persistently in the data folder
 os.environ["TIKTOKEN_CACHE_DIR"] = TIKTOKEN_CACHE_DIR
@@ -33,6 +35,11 @@ def token_count(input_string: str) -> int:
         return int(len(input_string.split()) * 1.3)
 
 
+async def atoken_count(input_string: str) -> int:
+    """token_count() that runs off the event loop for large inputs."""
+    return await run_offloaded(token_count, input_string, size=len(input_string))
+
+
 def token_cost(token_count: int, cost_per_million: float = 0.150) -> float:
     """
     Calculate the cost of tokens based on the token count and cost per million tokens.
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Measure chat time-to-first-token with and without the memory policy.
+
+For synthetic conversations of the given lengths (5 and 200 turns by default),
+this script sends the next question to the configured chat model twice:
+1. full: the whole history, as when CHAT_MEMORY_KEEP_TURNS is unset
+2. policy: the last --keep-turns turns plus a rolling summary, as with
+   CHAT_MEMORY_KEEP_TURNS set (the summary is a fixed-size stand-in, since
+   summaries are generated in the background and are not on the hot path)
+and reports prompt tokens and the median time to the first streamed token.
+Needs the database to be reachable for the model configuration.
+
+Usage:
+    uv run python scripts/benchmark_chat_memory.py
+    uv run python scripts/benchmark_chat_memory.py --turns 5,50,200 \\
+        --keep-turns 10 --runs 5 --model-id model:abc
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.messages import (  # noqa: E402
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
+
+from open_notebook.ai.provision import provision_langchain_model  # noqa: E402
+from open_notebook.graphs.chat_memory import MemoryPolicy, select_messages  # noqa: E402
+from open_notebook.utils.token_utils import token_count  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "model data source note insight context answer question research paper "
+    "method result evidence claim argument chapter section figure table study "
+    "analysis experiment summary review theory sample measure effect"
+).split()
+
+SYSTEM_PROMPT = (
+    "You are a research assistant that answers questions about the user's "
+    "documents. Be concise and cite document IDs in brackets."
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--turns",
+        default="5,200",
+        help="Comma-separated conversation lengths in turns (default: 5,200)",
+    )
+    parser.add_argument(
+        "--keep-turns", type=int, default=10, help="Turns kept verbatim (default: 10)"
+    )
+    parser.add_argument(
+        "--turn-words",
+        type=int,
+        default=150,
+        help="Words per assistant reply in the synthetic history (default: 150)",
+    )
+    parser.add_argument(
+        "--summary-words",
+        type=int,
+        default=400,
+        help="Words of the stand-in summary (default: 400)",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Calls per measurement")
+    parser.add_argument("--model-id", help="Chat model ID (default: configured)")
+    parser.add_argument("--seed", type=int, default=42, help="Text generation seed")
+    return parser.parse_args()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def build_history(turns: int, turn_words: int, seed: int) -> List[BaseMessage]:
+    rng = random.Random(seed)
+    messages: List[BaseMessage] = []
+    for turn in range(turns):
+        messages.append(
+            HumanMessage(
+                content=f"Question {turn}: {_sentence(rng, 20)}", id=f"h{turn}"
+            )
+        )
+        messages.append(AIMessage(content=_sentence(rng, turn_words), id=f"a{turn}"))
+    messages.append(
+        HumanMessage(content="What did we conclude about the method?", id="question")
+    )
+    return messages
+
+
+async def time_to_first_token(
+    payload: List[BaseMessage], model_id: Optional[str], runs: int
+) -> float:
+    tokens = token_count(" ".join(str(m.content) for m in payload))
+    samples = []
+    for _ in range(runs):
+        model = await provision_langchain_model(
+            None, model_id, "chat", tokens=tokens, max_tokens=64, streaming=True
+        )
+        started = time.perf_counter()
+        async for chunk in model.astream(payload):
+            if chunk.content:
+                break
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def run(args: argparse.Namespace) -> None:
+    policy = MemoryPolicy(keep_turns=args.keep_turns)
+    summary = _sentence(random.Random(args.seed), args.summary_words)
+
+    print()
+    header = f"{'turns':>6}{'mode':>8}{'messages':>10}{'prompt tok':>12}{'TTFT s':>9}"
+    rows = []
+    for turns in [int(t) for t in args.turns.split(",") if t.strip()]:
+        history = build_history(turns, args.turn_words, args.seed)
+        # Everything outside the window is covered by the (stand-in) summary
+        state = {"messages": history, "summarized_count": len(history)}
+        pruned = select_messages(state, policy)
+
+        variants = [("full", SYSTEM_PROMPT, history)]
+        if len(pruned) < len(history):
+            variants.append(
+                (
+                    "policy",
+                    f"{SYSTEM_PROMPT}\n\n# EARLIER CONVERSATION\n\n{summary}",
+                    pruned,
+                )
+            )
+        for mode, system_prompt, messages in variants:
+            payload: List[BaseMessage] = [SystemMessage(content=system_prompt)]
+            payload += messages
+            logger.info(f"Measuring {turns} turns ({mode})")
+            ttft = await time_to_first_token(payload, args.model_id, args.runs)
+            prompt_tokens = token_count(" ".join(str(m.content) for m in payload))
+            rows.append(
+                f"{turns:>6}{mode:>8}{len(messages):>10}{prompt_tokens:>12}{ttft:>9.2f}"
+            )
+
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(row)
+
+
+def main():
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
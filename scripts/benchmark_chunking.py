@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Compare chunking configurations on your own documents.
+
+For the current character constants (CHUNK_SIZE/CHUNK_OVERLAP) and one or
+more token budgets, this script reports:
+1. Rows: number of chunks (= source_embedding records and embedded inputs)
+2. Tokens per chunk (min/avg/max/stdev) and total embedded tokens, which
+   determine the embedding cost (overlap is paid for twice)
+3. Optionally, retrieval recall@k: sentences sampled from the documents are
+   used as queries, and a query is a hit if a top-k chunk contains it.
+   This embeds every chunk with the configured (or given) embedding model and
+   needs the database to be reachable.
+
+Usage:
+    uv run python scripts/benchmark_chunking.py docs/*.md transcript.txt
+    uv run python scripts/benchmark_chunking.py big.html --token-sizes 256,512,1024 \\
+        --recall --queries 200 --top-k 5
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from open_notebook.utils.chunking import (  # noqa: E402
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    ChunkingConfig,
+    chunk_text,
+    detect_content_type,
+)
+from open_notebook.utils.token_utils import token_cost, token_count  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+SENTENCE_PATTERN = re.compile(r"[^.!?。！？\n]{40,300}[.!?。！？]")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("files", nargs="+", type=Path, help="Documents to chunk")
+    parser.add_argument(
+        "--token-sizes",
+        default="256,512,1024",
+        help="Comma-separated token budgets to compare (default: 256,512,1024)",
+    )
+    parser.add_argument(
+        "--overlap-ratio",
+        type=float,
+        default=0.125,
+        help="Token overlap as a fraction of the budget (default: 0.125)",
+    )
+    parser.add_argument(
+        "--cost-per-million",
+        type=float,
+        default=0.02,
+        help="Embedding price in USD per million tokens (default: 0.02)",
+    )
+    parser.add_argument("--recall", action="store_true", help="Measure recall@k")
+    parser.add_argument("--queries", type=int, default=100, help="Sampled queries")
+    parser.add_argument("--top-k", type=int, default=5, help="k for recall@k")
+    parser.add_argument("--model-id", help="Embedding model ID (default: configured)")
+    parser.add_argument("--seed", type=int, default=42, help="Query sampling seed")
+    return parser.parse_args()
+
+
+def load_documents(files: List[Path]) -> List[Tuple[str, str]]:
+    documents = []
+    for path in files:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        if text.strip():
+            documents.append((str(path), text))
+        else:
+            logger.warning(f"Skipping empty file {path}")
+    return documents
+
+
+def chunk_documents(
+    documents: List[Tuple[str, str]], config: ChunkingConfig
+) -> List[List[str]]:
+    return [
+        chunk_text(text, content_type=detect_content_type(text, path), config=config)
+        for path, text in documents
+    ]
+
+
+def sample_queries(
+    documents: List[Tuple[str, str]], count: int, seed: int
+) -> List[Tuple[int, str]]:
+    """Sample (document index, sentence) pairs to use as retrieval queries."""
+    candidates = [
+        (index, match.group(0).strip())
+        for index, (_, text) in enumerate(documents)
+        for match in SENTENCE_PATTERN.finditer(text)
+    ]
+    random.Random(seed).shuffle(candidates)
+    return candidates[:count]
+
+
+async def embed(texts: List[str], model_id: Optional[str]) -> np.ndarray:
+    from open_notebook.utils.embedding import generate_embeddings
+
+    vectors = []
+    for start in range(0, len(texts), 64):
+        vectors.extend(await generate_embeddings(texts[start : start + 64], model_id))
+    matrix = np.array(vectors, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+async def measure_recall(
+    chunks_per_doc: List[List[str]],
+    queries: List[Tuple[int, str]],
+    query_vectors: np.ndarray,
+    top_k: int,
+    model_id: Optional[str],
+) -> float:
+    chunks = [chunk for doc_chunks in chunks_per_doc for chunk in doc_chunks]
+    chunk_vectors = await embed(chunks, model_id)
+    scores = query_vectors @ chunk_vectors.T
+
+    hits = 0
+    for row, (_, sentence) in enumerate(queries):
+        top = np.argsort(-scores[row])[:top_k]
+        # Whitespace may differ after splitting, so compare a normalized prefix
+        needle = " ".join(sentence.split())[:80]
+        if any(needle in " ".join(chunks[i].split()) for i in top):
+            hits += 1
+    return hits / len(queries) if queries else 0.0
+
+
+def describe(config: ChunkingConfig) -> str:
+    unit = "chars" if config.mode == "characters" else "tokens"
+    return f"{config.chunk_size}/{config.chunk_overlap} {unit}"
+
+
+async def run(args: argparse.Namespace) -> None:
+    documents = load_documents(args.files)
+    if not documents:
+        logger.error("No documents to benchmark")
+        sys.exit(1)
+
+    configs = [ChunkingConfig("characters", CHUNK_SIZE, CHUNK_OVERLAP)]
+    for size in [int(s) for s in args.token_sizes.split(",") if s.strip()]:
+        configs.append(ChunkingConfig("tokens", size, int(size * args.overlap_ratio)))
+
+    total_chars = sum(len(text) for _, text in documents)
+    total_tokens = sum(token_count(text) for _, text in documents)
+    logger.info(
+        f"{len(documents)} documents, {total_chars} characters, {total_tokens} tokens"
+    )
+
+    queries: List[Tuple[int, str]] = []
+    query_vectors = None
+    if args.recall:
+        queries = sample_queries(documents, args.queries, args.seed)
+        logger.info(f"Embedding {len(queries)} sampled queries")
+        query_vectors = await embed([q for _, q in queries], args.model_id)
+
+    results: List[Dict] = []
+    for config in configs:
+        logger.info(f"Chunking with {describe(config)}")
+        chunks_per_doc = chunk_documents(documents, config)
+        token_sizes = [token_count(c) for doc in chunks_per_doc for c in doc]
+        embedded = sum(token_sizes)
+        result = {
+            "config": describe(config),
+            "rows": len(token_sizes),
+            "min": min(token_sizes, default=0),
+            "avg": round(statistics.mean(token_sizes)) if token_sizes else 0,
+            "max": max(token_sizes, default=0),
+            "stdev": round(statistics.pstdev(token_sizes)) if token_sizes else 0,
+            "tokens": embedded,
+            "cost": token_cost(embedded, args.cost_per_million),
+            "recall": None,
+        }
+        if args.recall and query_vectors is not None:
+            result["recall"] = await measure_recall(
+                chunks_per_doc, queries, query_vectors, args.top_k, args.model_id
+            )
+        results.append(result)
+
+    baseline = results[0]
+    header = (
+        f"{'config':<22}{'rows':>8}{'tok min/avg/max (sd)':>26}"
+        f"{'tokens':>12}{'cost $':>10}{'vs base':>9}"
+    )
+    if args.recall:
+        header += f"{f'recall@{args.top_k}':>11}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        sizes = f"{r['min']}/{r['avg']}/{r['max']} ({r['stdev']})"
+        ratio = r["rows"] / baseline["rows"] if baseline["rows"] else 0
+        line = (
+            f"{r['config']:<22}{r['rows']:>8}{sizes:>26}"
+            f"{r['tokens']:>12}{r['cost']:>10.4f}{ratio:>8.2f}x"
+        )
+        if args.recall:
+            line += f"{r['recall']:>11.3f}"
+        print(line)
+
+
+def main():
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()